@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark template token substitution on the largest rc templates.
+
+Compares the previous approach (one ``str.replace`` pass per token) with the
+single-pass :class:`xcookie.staging.TokenSubstituter`, and with rendering a
+precompiled :class:`xcookie.staging.CompiledTemplate`.
+
+Usage:
+    python dev/bench/bench_template_substitution.py
+"""
+
+from __future__ import annotations
+
+import timeit
+from pathlib import Path
+
+import xcookie
+from xcookie.staging import CompiledTemplate, TokenSubstituter
+from xcookie.template_registry import TemplateContext
+
+CONTEXT = TemplateContext(
+    repo_name='demo_repo',
+    mod_name='demo_mod',
+    rel_mod_dpath='src/demo_mod',
+    rel_mod_dpath_posix='src/demo_mod',
+    author='Example Author',
+    author_email='author@example.com',
+)
+
+
+def sequential_replace(text: str, replacements: dict[str, str]) -> str:
+    for old, new in replacements.items():
+        text = text.replace(old, new)
+    return text
+
+
+def main() -> None:
+    rc_dpath = Path(xcookie.__file__).parent / 'rc'
+    fpaths = sorted(rc_dpath.glob('*.in'), key=lambda p: -p.stat().st_size)[:5]
+    replacements = CONTEXT.replacements()
+    substitute = TokenSubstituter(replacements)
+    number = 200
+    print(f'{"template":<28} {"lines":>6} {"sequential":>11} {"single":>9} {"compiled":>9}')
+    for fpath in fpaths:
+        text = fpath.read_text()
+        compiled = CompiledTemplate.compile(text, replacements)
+        assert substitute(text) == sequential_replace(text, replacements)
+        assert compiled.render(set(), replacements) == substitute(text)
+        times = [
+            timeit.timeit(func, number=number) / number * 1e6
+            for func in [
+                lambda: sequential_replace(text, replacements),
+                lambda: substitute(text),
+                lambda: compiled.render(set(), replacements),
+            ]
+        ]
+        nlines = text.count('\n') + 1
+        print(
+            f'{fpath.name:<28} {nlines:>6} '
+            + ' '.join(f'{t:>8.1f}us' for t in times)
+        )
+
+
+if __name__ == '__main__':
+    main()
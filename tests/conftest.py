@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import http.server
+import json
+import threading
+import urllib.parse
+
+import pytest
+
+
+class FakeGitLab:
+    """
+    In-memory stand-in for the parts of the GitLab REST API that
+    :class:`xcookie.vcs.gitlab.GitlabRemote` uses. Every request is recorded
+    in :attr:`requests` as ``(method, path)``.
+    """
+
+    def __init__(self):
+        self.groups = []
+        self.projects = []
+        self.protected_branches = {}
+        self.requests = []
+        #: ``(method, path prefix) -> [status, ...]`` responses to return
+        #: instead of handling the next matching requests.
+        self.failures = {}
+        self.lock = threading.Lock()
+        self.url = None
+
+    def add_group(self, name, path=None):
+        path = path or name.lower().replace(' ', '-')
+        group = {
+            'id': len(self.groups) + 1,
+            'name': name,
+            'path': path,
+            'full_path': path,
+        }
+        self.groups.append(group)
+        return group
+
+    def count(self, method=None, prefix=''):
+        return sum(
+            (method is None or m == method) and p.startswith(prefix)
+            for m, p in self.requests
+        )
+
+    def _find(self, items, ident, path_key):
+        for item in items:
+            if (
+                str(item['id']) == ident
+                or item[path_key].lower() == ident.lower()
+            ):
+                return item
+        return None
+
+    def handle(self, method, path, query, body):
+        parts = [urllib.parse.unquote(p) for p in path.split('/')[3:]]
+        for (fail_method, prefix), statuses in self.failures.items():
+            if fail_method == method and path.startswith(prefix) and statuses:
+                return statuses.pop(0), {'message': 'injected failure'}
+        if parts == ['user']:
+            return 200, {'id': 1, 'username': 'fake'}
+        if parts == ['groups']:
+            search = query.get('search', [''])[0].lower()
+            return 200, [
+                g
+                for g in self.groups
+                if search in g['name'].lower() or search in g['path'].lower()
+            ]
+        if parts[:1] == ['groups'] and len(parts) >= 2:
+            group = self._find(self.groups, parts[1], 'full_path')
+            if group is None:
+                return 404, {'message': '404 Group Not Found'}
+            if parts[2:] == ['projects']:
+                return 200, [
+                    p for p in self.projects if p['namespace_id'] == group['id']
+                ]
+            return 200, group
+        if parts == ['projects'] and method == 'POST':
+            group = self._find(
+                self.groups, str(body['namespace_id']), 'full_path'
+            )
+            full_path = f'{group["full_path"]}/{body["path"]}'
+            if self._find(self.projects, full_path, 'path_with_namespace'):
+                return 400, {'message': {'path': ['has already been taken']}}
+            project = {
+                'id': 1000 + len(self.projects),
+                'name': body['name'],
+                'path': body['path'],
+                'namespace_id': group['id'],
+                'path_with_namespace': full_path,
+                'visibility': body.get('visibility', 'private'),
+            }
+            self.projects.append(project)
+            self.protected_branches[project['id']] = []
+            return 201, project
+        if parts[:1] == ['projects'] and len(parts) >= 2:
+            project = self._find(self.projects, parts[1], 'path_with_namespace')
+            if project is None:
+                return 404, {'message': '404 Project Not Found'}
+            if parts[2:] == ['protected_branches']:
+                branches = self.protected_branches[project['id']]
+                if method == 'GET':
+                    return 200, branches
+                if any(b['name'] == body['name'] for b in branches):
+                    return 409, {'message': 'Protected branch already exists'}
+                branch = {
+                    'id': len(branches) + 1,
+                    'name': body['name'],
+                    'allow_force_push': body.get('allow_force_push', False),
+                    'push_access_levels': [],
+                    'merge_access_levels': [],
+                }
+                branches.append(branch)
+                return 201, branch
+            return 200, project
+        return 404, {'message': '404 Not Found'}
+
+
+@pytest.fixture
+def fake_gitlab():
+    """Serve a :class:`FakeGitLab` on localhost for the duration of a test."""
+    fake = FakeGitLab()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def _respond(self, method):
+            url = urllib.parse.urlsplit(self.path)
+            length = int(self.headers.get('Content-Length') or 0)
+            body = json.loads(self.rfile.read(length) or b'{}')
+            with fake.lock:
+                fake.requests.append((method, url.path))
+                status, data = fake.handle(
+                    method, url.path, urllib.parse.parse_qs(url.query), body
+                )
+            payload = json.dumps(data).encode('utf8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            self._respond('GET')
+
+        def do_POST(self):
+            self._respond('POST')
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    fake.url = f'http://127.0.0.1:{server.server_port}'
+    try:
+        yield fake
+    finally:
+        server.shutdown()
+        server.server_close()
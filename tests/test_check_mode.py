@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+
+def _config(repodir, **kwargs):
+    from xcookie.main import XCookieConfig
+
+    return XCookieConfig(
+        repodir=repodir,
+        mod_name='demo_mod',
+        repo_name='demo_mod',
+        tags=['github', 'purepy'],
+        rotate_secrets=False,
+        init_new_remotes=False,
+        interactive=False,
+        yes=True,
+        use_vcs=False,
+        refresh_docs=False,
+        **kwargs,
+    )
+
+
+def _generate(repodir):
+    from xcookie.main import TemplateApplier
+
+    # The second pass picks up the settings written to pyproject.toml by the
+    # first, after which the repo is a fixed point.
+    for _ in range(2):
+        applier = TemplateApplier(_config(repodir))
+        applier.setup()
+        applier.gather_tasks().apply_all()
+
+
+def _staged_classification(repodir):
+    from xcookie.main import TemplateApplier
+
+    applier = TemplateApplier(_config(repodir))
+    applier.setup()
+    plan = applier.gather_tasks()
+    return {
+        key: [p.relative_to(repodir) for p in getattr(plan, key)]
+        for key in ['missing', 'dirty', 'modified']
+    }
+
+
+def test_check_drift_matches_staged_classification(tmp_path) -> None:
+    from xcookie.main import TemplateApplier
+
+    repodir = tmp_path / 'demo'
+    repodir.mkdir()
+    _generate(repodir)
+
+    checker = TemplateApplier(_config(repodir))
+    drift = checker.check_drift()
+    assert drift['missing'] == [] and drift['dirty'] == []
+    assert drift == _staged_classification(repodir)
+    # Nothing is staged on disk in check mode.
+    assert list(checker.staging_dpath.iterdir()) == []
+
+    tests_yml = repodir / '.github/workflows/tests.yml'
+    tests_yml.write_text(tests_yml.read_text() + '\n# drift\n')
+    (repodir / 'CHANGELOG.md').unlink()
+    run_tests = repodir / 'run_tests.py'
+    run_tests.write_text(run_tests.read_text() + '\n# local edit\n')
+
+    drift = TemplateApplier(_config(repodir)).check_drift()
+    assert drift == _staged_classification(repodir)
+    assert drift['missing'] == [Path('CHANGELOG.md')]
+    assert tests_yml.relative_to(repodir) in drift['dirty']
+    assert run_tests.relative_to(repodir) in drift['modified']
+
+
+def test_check_drift_respects_only_generate_and_regen(tmp_path) -> None:
+    from xcookie.main import TemplateApplier
+
+    repodir = tmp_path / 'demo'
+    repodir.mkdir()
+    _generate(repodir)
+    run_tests = repodir / 'run_tests.py'
+    run_tests.write_text(run_tests.read_text() + '\n# local edit\n')
+    (repodir / 'CHANGELOG.md').unlink()
+
+    drift = TemplateApplier(
+        _config(repodir, only_generate='run_tests')
+    ).check_drift()
+    assert drift == {
+        'missing': [],
+        'dirty': [],
+        'modified': [run_tests.relative_to(repodir)],
+    }
+
+    drift = TemplateApplier(
+        _config(repodir, only_generate='run_tests', regen='run_tests')
+    ).check_drift()
+    assert drift['dirty'] == [run_tests.relative_to(repodir)]
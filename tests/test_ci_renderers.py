@@ -202,3 +202,169 @@ def test_github_release_resolves_version_tag_before_tagging(tmp_path):
     assert release['with']['name'] == 'Release ${{ steps.release_meta.outputs.tag }}'
     assert release['with']['target_commitish'] == '${{ github.sha }}'
     assert '${{ github.ref }}' not in str(release['with'])
+
+
+def test_github_affected_test_selection_caches_map_and_schedules(tmp_path):
+    self = _make_applier(tmp_path, tags=['github', 'purepy'])
+    self.config['ci_test_selection'] = 'affected'
+    text = self.build_github_actions_tests()
+    assert "- cron: '0 6 * * 1'" in text
+    assert 'actions/cache/restore@' in text
+    assert 'actions/cache/save@' in text
+    # Re-runs save under a new key instead of colliding with the first one
+    assert '${{ github.run_id }}-${{ github.run_attempt }}' in text
+    assert "if: github.event_name != 'pull_request'" in text
+    assert '"${TEST_TARGETS[@]}"' in text
+    assert '--cov-context=test' in text
+
+
+def test_gitlab_affected_test_selection_caches_map_and_schedules(tmp_path):
+    self = _make_applier(tmp_path, tags=['gitlab', 'purepy'], min_python='3.10')
+    self.config['ci_test_selection'] = 'affected'
+    text = self.build_gitlab_ci()
+    assert '$CI_PIPELINE_SOURCE == "schedule"' in text
+    assert 'test-selection-$CI_JOB_NAME_SLUG' in text
+    assert 'merge_request_event' in text
+    assert '"${TEST_TARGETS[@]}"' in text
+
+
+def _run_test_selection(tmp_path, repo, edit):
+    """
+    Commit ``edit`` on top of a recorded map and return the ``TEST_TARGETS``
+    chosen by the generated select commands.
+    """
+    import json
+    import os
+    import subprocess
+    import sys
+
+    from xcookie.builders import common_ci
+
+    def git(*args):
+        return subprocess.run(
+            ['git', *args], cwd=repo, check=True, capture_output=True, text=True
+        ).stdout.strip()
+
+    commit = git('rev-parse', 'HEAD')
+    map_fpath = repo / '.cache' / 'test-selection' / 'map.json'
+    map_fpath.parent.mkdir(parents=True, exist_ok=True)
+    files = {'demo_pkg/core.py': {'5': ['tests/test_core.py']}}
+    map_fpath.write_text(
+        json.dumps({'version': 1, 'commit': commit, 'files': files})
+    )
+    edit()
+    git('commit', '-qam', 'edit')
+
+    self = _make_applier(tmp_path / 'applier', tags=['github', 'purepy'])
+    self.config['ci_test_selection'] = 'affected'
+    parts = common_ci.make_test_selection_parts(self)
+    script = '\n'.join(['set -e', 'TEST_SELECTION_RECORD=false']
+                       + parts['select_commands'])
+    env = dict(
+        os.environ,
+        PATH=os.path.dirname(sys.executable) + os.pathsep + os.environ['PATH'],
+        TEST_SELECTION_ROOT=str(repo),
+        TEST_SELECTION_MAP=str(map_fpath),
+        MOD_DPATH=str(repo / 'demo_pkg'),
+    )
+    out = subprocess.run(
+        ['bash', '-c', script], cwd=repo, env=env, check=True,
+        capture_output=True, text=True,
+    ).stdout
+    return out.strip().splitlines()[-1]
+
+
+def test_test_selection_script_selects_affected_tests(tmp_path):
+    import subprocess
+
+    repo = tmp_path / 'repo'
+    (repo / 'demo_pkg').mkdir(parents=True)
+    (repo / 'tests').mkdir()
+    (repo / 'demo_pkg' / '__init__.py').write_text('')
+    core_fpath = repo / 'demo_pkg' / 'core.py'
+    core_fpath.write_text('import os\n\n\ndef add(a, b):\n    return a + b\n')
+    (repo / 'tests' / 'test_core.py').write_text('def test_add():\n    pass\n')
+    for args in [
+        ['init', '-q'],
+        ['config', 'user.name', 'Test'],
+        ['config', 'user.email', 'test@example.com'],
+        ['config', 'commit.gpgsign', 'false'],
+        ['add', '.'],
+        ['commit', '-qm', 'init'],
+    ]:
+        subprocess.run(['git', *args], cwd=repo, check=True, capture_output=True)
+
+    # A change to a function body selects the tests that covered it
+    def edit_body():
+        core_fpath.write_text(core_fpath.read_text().replace('a + b', 'b + a'))
+
+    last = _run_test_selection(tmp_path, repo, edit_body)
+    assert last == f'TEST_TARGETS={repo}/tests/test_core.py'
+
+    # A change to import-time code falls back to the full run
+    def edit_import():
+        text = core_fpath.read_text()
+        core_fpath.write_text(text.replace('import os', 'import sys'))
+
+    last = _run_test_selection(tmp_path, repo, edit_import)
+    assert last == f'TEST_TARGETS={repo}/demo_pkg ../tests'
+
+
+def test_docs_job_caches_sphinx_env_and_builds_offline(tmp_path):
+    from xcookie.util_yaml import Yaml
+
+    self = _make_applier(tmp_path, tags=['github', 'purepy'])
+    text = self.build_github_actions_tests()
+    assert 'build_docs:' in text
+    assert "hashFiles('requirements/docs.txt')" in text
+    assert '${{ github.run_id }}-${{ github.run_attempt }}' in text
+    assert 'docs/build/doctrees' in text
+    assert '.cache/intersphinx' in text
+    assert 'XCOOKIE_DOCS_OFFLINE=1 python -m sphinx -j auto' in text
+    assert 'python docs/source/conf.py --fetch-intersphinx' in text
+
+    self = _make_applier(
+        tmp_path, tags=['gitlab', 'binpy'], min_python='3.10',
+        use_pyproject_requirements=True,
+    )
+    data = Yaml.loads(self.build_gitlab_ci())
+    docs = data['docs']
+    assert docs['needs'] == []
+    assert docs['cache'][1]['key']['files'] == ['pyproject.toml']
+    assert docs['cache'][1]['paths'] == ['docs/build/doctrees', '.cache/intersphinx']
+    assert 'PIP_CACHE_DIR' in docs['variables']
+    assert any('-e ".[docs]"' in line for line in docs['script'])
+
+
+def test_docs_job_absent_when_docs_disabled(tmp_path):
+    from xcookie.util_yaml import Yaml
+
+    self = _make_applier(tmp_path, tags=['github', 'purepy'])
+    self.config['docs_ci'] = False
+    assert 'build_docs:' not in self.build_github_actions_tests()
+
+    # "auto" leaves the job out of repos without a sphinx conf.py
+    self = _make_applier(tmp_path, tags=['gitlab', 'purepy'], min_python='3.10')
+    self.config['skip_autogen'] = ['docs/source/conf.py']
+    assert 'docs' not in Yaml.loads(self.build_gitlab_ci())
+    (tmp_path / 'docs' / 'source').mkdir(parents=True)
+    (tmp_path / 'docs' / 'source' / 'conf.py').write_text('')
+    assert 'docs' in Yaml.loads(self.build_gitlab_ci())
+
+
+def test_default_test_selection_runs_everything(tmp_path):
+    self = _make_applier(tmp_path, tags=['github', 'purepy'])
+    text = self.build_github_actions_tests()
+    assert 'schedule:' not in text
+    assert 'TEST_SELECTION' not in text
+    assert '"$MOD_DPATH" ../tests' in text
+
+
+def test_affected_test_selection_requires_auto_test_command(tmp_path):
+    import pytest
+
+    self = _make_applier(tmp_path, tags=['github', 'purepy'])
+    self.config['ci_test_selection'] = 'affected'
+    self.config['test_command'] = 'python -m pytest tests'
+    with pytest.raises(ValueError, match='test_command'):
+        self.build_github_actions_tests()
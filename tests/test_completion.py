@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from xcookie import completion
+
+
+def test_completion_table_matches_config() -> None:
+    """
+    The static table must be regenerated (``python -m xcookie.completion``)
+    whenever ``XCookieConfig`` options change.
+    """
+    assert completion.OPTIONS == completion.derive_options()
+
+
+def test_known_tags_match_config_and_templates(tmp_path) -> None:
+    from xcookie.main import TemplateApplier, XCookieConfig
+
+    assert completion.KNOWN_TAGS == completion.derive_known_tags()
+
+    config = XCookieConfig(
+        repodir=tmp_path / 'demo',
+        mod_name='demo',
+        tags=['github', 'purepy'],
+        rotate_secrets=False,
+        init_new_remotes=False,
+        interactive=False,
+        use_vcs=False,
+    )
+    applier = TemplateApplier(config)
+    applier._build_template_registry()
+    template_tags = set().union(*(info.tags for info in applier.template_infos))
+    assert template_tags <= set(completion.KNOWN_TAGS)
+
+
+def test_complete_tags() -> None:
+    assert completion._complete_tags('gi') == ['github', 'gitlab']
+    assert completion._complete_tags('purepy,win') == [
+        'purepy,win_smoke',
+        'purepy,windows_smoke',
+    ]
+
+
+def test_completion_does_not_import_main() -> None:
+    pytest.importorskip('argcomplete')
+    code = (
+        'import sys\n'
+        'from xcookie import __main__, completion\n'
+        'completion.build_parser()\n'
+        'assert "xcookie.main" not in sys.modules, "xcookie.main imported"\n'
+        'assert "kwconf" not in sys.modules, "kwconf imported"\n'
+    )
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
+def test_argcomplete_answers_from_table(tmp_path) -> None:
+    pytest.importorskip('argcomplete')
+    line = 'xcookie --tags erotemic,bi'
+    out_fpath = tmp_path / 'out'
+    env = dict(
+        os.environ,
+        _ARGCOMPLETE='1',
+        _ARGCOMPLETE_IFS='\n',
+        COMP_LINE=line,
+        COMP_POINT=str(len(line)),
+        _ARGCOMPLETE_STDOUT_FILENAME=str(out_fpath),
+    )
+    code = (
+        'import sys\n'
+        'from xcookie.__main__ import main\n'
+        'try:\n'
+        '    main()\n'
+        'finally:\n'
+        '    assert "xcookie.main" not in sys.modules\n'
+    )
+    proc = subprocess.run([sys.executable, '-c', code], env=env)
+    assert proc.returncode == 0
+    assert out_fpath.read_text().split() == ['erotemic,binpy']
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import warnings
+from pathlib import Path
+
+import pytest
+
+import xcookie
+from xcookie.directive import DirectiveExtractor
+
+RC_DPATH = Path(xcookie.__file__).parent / 'rc'
+COMMANDS = ['UNCOMMENT_IF', 'COMMENT_IF']
+
+
+def _summarize(extractor, method, line):
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        directives = getattr(extractor, method)(line)
+    return (
+        [(d.name, d.positive, d.args, d.inline) for d in directives],
+        [str(w.message) for w in caught],
+    )
+
+
+@pytest.mark.parametrize(
+    'fpath', sorted(RC_DPATH.glob('*.in')), ids=lambda p: p.name
+)
+def test_fast_scanner_matches_tokenizer_on_rc_templates(fpath):
+    extractor = DirectiveExtractor('xcookie', COMMANDS)
+    for line in fpath.read_text().split('\n'):
+        fast = _summarize(extractor, 'extract', line)
+        slow = _summarize(extractor, '_extract_tokenized', line)
+        assert fast == slow, line
+
+
+@pytest.mark.parametrize(
+    'line',
+    [
+        '   #- pip install GDAL  # xcookie: +UNCOMMENT_IF(gdal)',
+        'a = 1  # XCOOKIE: +comment_if(cv2,gdal)',
+        'a = 1  # xcookie: +COMMENT_IF(cv2), -UNCOMMENT_IF(gdal)',
+        'a = 1  # xcookie: COMMENT_IF',
+        'a = 1  # xcookie: +COMMENT_IF( cv2 )',
+        'a = "# xcookie: +COMMENT_IF(cv2)"',
+        'a = 1  # not a directive, xcookie: +COMMENT_IF(cv2)',
+        '### xcookie: -MAIN',
+        'xcookie: +COMMENT_IF(cv2)',
+        'a = 1  # xcookie:',
+    ],
+)
+def test_fast_scanner_matches_tokenizer_on_edge_cases(line):
+    extractor = DirectiveExtractor('xcookie', COMMANDS)
+    assert _summarize(extractor, 'extract', line) == _summarize(
+        extractor, '_extract_tokenized', line
+    )
@@ -57,3 +57,423 @@ def test_generated_conf_uses_modern_sphinx_defaults(tmp_path, monkeypatch):
     assert "'display_version'" not in text
     assert 'html_static_path = []' in text
     assert 'myst_heading_anchors = 3' in text
+
+
+def test_refresh_apidoc_stubs_is_incremental(tmp_path, monkeypatch):
+    """Only stubs for added or removed modules are rewritten or deleted."""
+    import shutil
+
+    import pytest
+
+    from xcookie.builders.docs import DocsBuilder
+
+    if shutil.which('sphinx-apidoc') is None:
+        pytest.skip('requires sphinx-apidoc')
+
+    config = _fake_builder_self(tmp_path).config
+    mod_dpath = ub.Path(tmp_path / 'src/demo_pkg').ensuredir()
+    (mod_dpath / '__init__.py').write_text('')
+    (mod_dpath / 'core.py').write_text('x = 1\n')
+    (mod_dpath / 'util.py').write_text('y = 1\n')
+    (tmp_path / 'docs').mkdir()
+    index_fpath = tmp_path / 'index.json'
+    builder = DocsBuilder(config)
+    outdir = builder.docs_auto_outdir
+
+    first = builder.refresh_apidoc_stubs(index_fpath=index_fpath)
+    names = sorted(p.name for p in first.written)
+    assert names == [
+        'demo_pkg.core.rst',
+        'demo_pkg.rst',
+        'demo_pkg.util.rst',
+        'modules.rst',
+    ]
+    assert not first.deleted
+
+    # Editing a module does not need new stubs, so apidoc is not run again.
+    (mod_dpath / 'core.py').write_text('x = 2\n')
+    calls = []
+    orig_cmd = ub.cmd
+    monkeypatch.setattr(
+        ub, 'cmd', lambda *a, **kw: calls.append(a) or orig_cmd(*a, **kw)
+    )
+    second = builder.refresh_apidoc_stubs(index_fpath=index_fpath)
+    assert not calls
+    assert not second.changed
+
+    # Renaming a module rewrites the package stub and swaps the module stub.
+    mtimes = {p.name: p.stat().st_mtime_ns for p in outdir.glob('*.rst')}
+    (mod_dpath / 'util.py').rename(mod_dpath / 'helpers.py')
+    third = builder.refresh_apidoc_stubs(index_fpath=index_fpath)
+    assert third.added_modules == ['demo_pkg/helpers.py']
+    assert third.removed_modules == ['demo_pkg/util.py']
+    assert sorted(p.name for p in third.written) == [
+        'demo_pkg.helpers.rst',
+        'demo_pkg.rst',
+    ]
+    assert [p.name for p in third.deleted] == ['demo_pkg.util.rst']
+    assert not (outdir / 'demo_pkg.util.rst').exists()
+    for name in ['demo_pkg.core.rst', 'modules.rst']:
+        assert (outdir / name).stat().st_mtime_ns == mtimes[name]
+
+
+def test_readthedocs_builds_html_in_parallel(tmp_path):
+    import kwutil
+
+    from xcookie.builders.readthedocs import build_readthedocs
+
+    self = _fake_builder_self(tmp_path)
+    self.config['use_pyproject_requirements'] = True
+    self.repo_name = 'demo_pkg'
+    self.tags = set(self.config['tags'])
+    data = kwutil.Yaml.loads(build_readthedocs(self))
+    (command,) = data['build']['jobs']['build']['html']
+    assert '-j auto' in command
+    assert command.endswith('docs/source $READTHEDOCS_OUTPUT/html')
+
+
+def test_conf_ext_builds_in_parallel(tmp_path):
+    """Sphinx keeps the parallel build when conf_ext is loaded."""
+    import io
+    import sys
+
+    import pytest
+
+    pytest.importorskip('sphinx')
+    from sphinx.application import Sphinx
+
+    from xcookie import rc
+
+    srcdir = ub.Path(tmp_path / 'source').ensuredir()
+    rc.resource_fpath('conf_ext.py').copy(srcdir / 'demo_conf_ext.py')
+    pkg_dpath = ub.Path(tmp_path / 'pkg').ensuredir()
+    for idx in range(4):
+        (pkg_dpath / f'demo_mod{idx}.py').write_text(
+            ub.codeblock(
+                f'''
+                def func{idx}():
+                    """
+                    Docs for func{idx}
+
+                    CommandLine:
+                        echo {idx}
+
+                    Ignore:
+                        hidden_{idx}
+                    """
+                '''
+            )
+        )
+    (srcdir / 'conf.py').write_text(
+        "extensions = ['sphinx.ext.autodoc', 'sphinx.ext.napoleon', 'demo_conf_ext']\n"
+        "conf_ext_timing_json = 'timings.json'\n"
+    )
+    (srcdir / 'index.rst').write_text(
+        'Demo\n====\n\n.. toctree::\n\n'
+        + ''.join(f'   mod{idx}\n' for idx in range(4))
+    )
+    for idx in range(4):
+        (srcdir / f'mod{idx}.rst').write_text(
+            f'mod{idx}\n====\n\n.. automodule:: demo_mod{idx}\n   :members:\n'
+        )
+
+    warnings = io.StringIO()
+    sys.path[0:0] = [str(srcdir), str(pkg_dpath)]
+    try:
+        app = Sphinx(
+            srcdir,
+            srcdir,
+            tmp_path / 'build',
+            tmp_path / 'doctrees',
+            'html',
+            status=None,
+            warning=warnings,
+            parallel=2,
+        )
+        assert app.is_parallel_allowed('read')
+        assert app.is_parallel_allowed('write')
+        app.build()
+    finally:
+        del sys.path[0:2]
+        for idx in range(4):
+            sys.modules.pop(f'demo_mod{idx}', None)
+        sys.modules.pop('demo_conf_ext', None)
+
+    assert 'parallel' not in warnings.getvalue()
+    html = (tmp_path / 'build/mod2.html').read_text()
+    assert 'CommandLine' in html
+    assert 'hidden_2' not in html
+
+    # Timings recorded by the parallel workers are merged into one report.
+    import json
+
+    summary = json.loads((tmp_path / 'timings.json').read_text())
+    assert summary['counts']['hyperlinks'] == 5
+    assert summary['counts']['docstring'] >= 4
+    documents = {docname for docname, _ in summary['documents']}
+    assert {f'mod{idx}' for idx in range(4)} <= documents
+
+
+def _load_conf_ext():
+    """Load conf_ext the way the generated conf.py includes it."""
+    import types
+
+    from xcookie import rc
+
+    text = '\n'.join(
+        rc.resource_fpath(fname).read_text()
+        for fname in ['intersphinx_mirror.py', 'conf_ext.py']
+    )
+    module = types.ModuleType('xcookie_conf_ext')
+    exec(compile(text, 'conf_ext.py', 'exec'), module.__dict__)
+    return module
+
+
+def test_intersphinx_mapping_uses_local_mirror(tmp_path):
+    conf_ext = _load_conf_ext()
+    (tmp_path / 'python.inv').write_bytes(b'inv')
+    mapping = {
+        'python': ('https://docs.python.org/3', None),
+        'numpy': ('https://numpy.org/doc/stable/', None),
+    }
+
+    def resolve(offline):
+        config = SimpleNamespace(
+            intersphinx_mapping=dict(mapping),
+            intersphinx_mirror=str(tmp_path),
+            intersphinx_mirror_ttl=None,
+            intersphinx_mirror_refresh=False,
+            intersphinx_offline=offline,
+        )
+        conf_ext._use_intersphinx_mirror(None, config)
+        return config.intersphinx_mapping
+
+    local = str(tmp_path / 'python.inv')
+    assert resolve(offline=False) == {
+        'python': ('https://docs.python.org/3', (local, None)),
+        'numpy': ('https://numpy.org/doc/stable/', None),
+    }
+    assert resolve(offline=True) == {
+        'python': ('https://docs.python.org/3', (local,)),
+    }
+
+
+def test_doctest_figures_are_cached(tmp_path, monkeypatch):
+    """Unchanged figure doctests reuse cached images without running."""
+    import sys
+
+    import pytest
+
+    pytest.importorskip('sphinx')
+    pytest.importorskip('xdoctest')
+    conf_ext = _load_conf_ext()
+
+    mod_fpath = tmp_path / 'figmod.py'
+    mod_fpath.write_text('def draw():\n    pass\n')
+    module = SimpleNamespace(__file__=str(mod_fpath))
+    monkeypatch.setitem(sys.modules, 'figmod', module)
+    monkeypatch.setattr(sys, 'argv', list(sys.argv))
+    obj = SimpleNamespace(__module__='figmod')
+    app = SimpleNamespace(
+        srcdir=tmp_path / 'docs/source',
+        outdir=tmp_path / 'docs/build/html',
+        doctreedir=tmp_path / 'docs/build/doctrees',
+        env=SimpleNamespace(docname='auto/figmod'),
+        config=SimpleNamespace(doctest_figure_workers=0, doctest_figure_budget=None),
+    )
+    docstring = [
+        'Draw a thing',
+        '',
+        'Example:',
+        '    >>> # xdoctest: +REQUIRES(--show)',
+        '    >>> draw()',
+        '',
+    ]
+
+    runs = []
+
+    def fake_run(doctest, figure_cache, key):
+        runs.append(doctest.docsrc)
+        savers = [lambda fpath: fpath.write_bytes(b'jpeg')]
+        return figure_cache.store(key, savers)
+
+    monkeypatch.setattr(conf_ext, '_run_figure_doctest', fake_run)
+
+    def build():
+        conf_ext._before_read_docs(app, app.env, [])
+        lines = list(docstring)
+        conf_ext.create_doctest_figure(app, obj, 'figmod.draw', lines)
+        return lines, conf_ext._figure_cache_stats(app.env)['auto/figmod']
+
+    lines1, stats1 = build()
+    assert len(runs) == 1 and stats1 == {'hit': 0, 'miss': 1}
+    lines2, stats2 = build()
+    assert len(runs) == 1 and stats2 == {'hit': 1, 'miss': 0}
+    assert lines1 == lines2
+    assert any(line.startswith('.. image:: ') for line in lines2)
+    assert (tmp_path / 'docs/build/doctest_figures').is_dir()
+
+    # Editing the module invalidates the entry.
+    mod_fpath.write_text('def draw():\n    return 1\n')
+    build()
+    assert len(runs) == 2
+
+    # Once the figure budget is spent, doctests are skipped.
+    app.config.doctest_figure_budget = 1
+    app.doctest_figure_seconds = 2.0
+    mod_fpath.write_text('def draw():\n    return 2\n')
+    lines, _ = build()
+    assert len(runs) == 2
+    assert not any(line.startswith('.. image:: ') for line in lines)
+
+
+_FAKE_FIGURE_WORKER = '''
+import json, pathlib, sys, time
+job = json.loads(sys.argv[1])
+if job['callname'] == 'slow':
+    time.sleep(60)
+pathlib.Path(job['dpath'], 'fig_001.jpeg').write_bytes(b'jpeg')
+pathlib.Path(job['dpath'], 'figures.json').write_text('["fig_001.jpeg"]')
+'''
+
+
+def test_doctest_figures_prerender_in_pool(tmp_path, monkeypatch, capsys):
+    """
+    Figure doctests are rendered by worker processes before Sphinx reads the
+    documents, and autodoc only inserts the resulting images.
+    """
+    import sys
+
+    import pytest
+
+    pytest.importorskip('sphinx')
+    pytest.importorskip('xdoctest')
+    from sphinx.application import Sphinx
+
+    from xcookie import rc
+
+    srcdir = ub.Path(tmp_path / 'source').ensuredir()
+    text = rc.resource_fpath('conf_ext.py').read_text()
+    text = text.replace('RENDER_DOC_IMAGES = 0', 'RENDER_DOC_IMAGES = 1')
+    (srcdir / 'figs_conf_ext.py').write_text(text)
+    pkg_dpath = ub.Path(tmp_path / 'pkg').ensuredir()
+    for callname in ['fast', 'slow']:
+        (pkg_dpath / f'figs_{callname}.py').write_text(
+            ub.codeblock(
+                f'''
+                def {callname}():
+                    """
+                    Example:
+                        >>> # xdoctest: +REQUIRES(--show)
+                        >>> {callname}()
+                    """
+                '''
+            )
+        )
+    (srcdir / 'conf.py').write_text(
+        ub.codeblock(
+            """
+            extensions = ['sphinx.ext.autodoc', 'sphinx.ext.napoleon', 'figs_conf_ext']
+            doctest_figure_workers = 2
+            doctest_figure_timeout = 2
+            """
+        )
+    )
+    (srcdir / 'index.rst').write_text(
+        'Demo\n====\n\n.. toctree::\n\n   fast\n   slow\n'
+    )
+    for callname in ['fast', 'slow']:
+        (srcdir / f'{callname}.rst').write_text(
+            f'{callname}\n====\n\n.. automodule:: figs_{callname}\n   :members:\n'
+        )
+
+    monkeypatch.setattr(sys, 'argv', list(sys.argv))
+    monkeypatch.syspath_prepend(str(pkg_dpath))
+    monkeypatch.syspath_prepend(str(srcdir))
+    import figs_conf_ext
+
+    monkeypatch.setattr(figs_conf_ext, '_FIGURE_WORKER_CODE', _FAKE_FIGURE_WORKER)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('doctest ran inside the Sphinx process')
+
+    monkeypatch.setattr(figs_conf_ext, '_run_figure_doctest', fail)
+    try:
+        app = Sphinx(
+            srcdir,
+            srcdir,
+            tmp_path / 'build/html',
+            tmp_path / 'build/doctrees',
+            'html',
+            status=None,
+        )
+        app.build()
+    finally:
+        for modname in ['figs_conf_ext', 'figs_fast', 'figs_slow']:
+            sys.modules.pop(modname, None)
+
+    out = capsys.readouterr().out
+    assert 'Rendered doctest figures: 1 ok, 0 failed, 1 timed out' in out
+    assert 'Doctest figure cache: 1 hits, 1 misses' in out
+    assert '<img' in (tmp_path / 'build/html/fast.html').read_text()
+    assert '<img' not in (tmp_path / 'build/html/slow.html').read_text()
+
+
+def test_docstring_memo_survives_incremental_builds(tmp_path, monkeypatch, capsys):
+    """A reread document reuses processed docstrings from the pickled env."""
+    import re
+    import sys
+
+    import pytest
+
+    pytest.importorskip('sphinx')
+    from sphinx.application import Sphinx
+
+    from xcookie import rc
+
+    srcdir = ub.Path(tmp_path / 'source').ensuredir()
+    rc.resource_fpath('conf_ext.py').copy(srcdir / 'memo_conf_ext.py')
+    (tmp_path / 'memo_mod.py').write_text(
+        ub.codeblock(
+            '''
+            def func():
+                """
+                Docs
+
+                CommandLine:
+                    echo hi
+                """
+            '''
+        )
+    )
+    (srcdir / 'conf.py').write_text(
+        "extensions = ['sphinx.ext.autodoc', 'sphinx.ext.napoleon', 'memo_conf_ext']\n"
+        'docstring_memo_debug = True\n'
+    )
+    index_fpath = srcdir / 'index.rst'
+    index_fpath.write_text('Demo\n====\n\n.. automodule:: memo_mod\n   :members:\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.syspath_prepend(str(srcdir))
+
+    def build():
+        try:
+            app = Sphinx(
+                srcdir,
+                srcdir,
+                tmp_path / 'build/html',
+                tmp_path / 'build/doctrees',
+                'html',
+                status=None,
+            )
+            app.build()
+        finally:
+            sys.modules.pop('memo_conf_ext', None)
+        out = capsys.readouterr().out
+        return re.search(r'Docstring memo: (\d+) hits, (\d+) misses', out)
+
+    first = build()
+    assert first.group(1) == '0' and int(first.group(2)) > 0
+    index_fpath.write_text(index_fpath.read_text() + '\nMore text.\n')
+    second = build()
+    assert second.groups() == (first.group(2), '0')
+    assert 'CommandLine' in (tmp_path / 'build/html/index.html').read_text()
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import subprocess
+
+from xcookie.vcs.git_index import GitIndex, git_blob_hash
+
+
+def _git(cwd, *args):
+    return subprocess.run(
+        ['git', *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout
+
+
+def test_git_blob_hash_matches_git_hash_object(tmp_path):
+    fpath = tmp_path / 'file.bin'
+    data = b'some\x00binary\ncontent'
+    fpath.write_bytes(data)
+    expected = _git(tmp_path, 'hash-object', str(fpath)).strip()
+    assert git_blob_hash(data) == expected
+
+
+def test_git_index_tracks_files_and_worktree_edits(tmp_path):
+    repo = tmp_path / 'repo'
+    (repo / 'pkg').mkdir(parents=True)
+    (repo / 'pkg' / 'mod.py').write_text('x = 1\n')
+    (repo / 'top.txt').write_text('top\n')
+    _git(repo, 'init', '-q')
+    _git(repo, 'add', '.')
+    (repo / 'top.txt').write_text('changed\n')
+    (repo / 'untracked.txt').write_text('new\n')
+
+    index = GitIndex.read(repo)
+    assert index is not None
+    assert index.is_tracked(repo / 'pkg' / 'mod.py')
+    assert index.is_tracked(repo / 'pkg')
+    assert not index.is_tracked(repo / 'untracked.txt')
+    assert not index.is_tracked(repo / 'pk')
+
+    assert index.known_identical(repo / 'pkg' / 'mod.py', b'x = 1\n')
+    assert not index.known_identical(repo / 'pkg' / 'mod.py', b'x = 2\n')
+    # The index is stale for edited files, so they are never reported equal.
+    assert not index.known_identical(repo / 'top.txt', b'top\n')
+    assert not index.known_identical(repo / 'top.txt', b'changed\n')
+    assert not index.known_identical(repo / 'untracked.txt', b'new\n')
+
+
+def test_git_index_read_outside_repo_returns_none(tmp_path):
+    assert GitIndex.read(tmp_path) is None
+
+
+def test_git_index_read_below_repo_toplevel(tmp_path):
+    repo = tmp_path / 'repo'
+    sub = repo / 'sub'
+    (sub / 'pkg').mkdir(parents=True)
+    (sub / 'pkg' / 'mod.py').write_text('x = 1\n')
+    (repo / 'other.txt').write_text('other\n')
+    _git(repo, 'init', '-q')
+    _git(repo, 'add', '.')
+    (sub / 'pkg' / 'mod.py').write_text('x = 2\n')
+
+    index = GitIndex.read(sub)
+    assert index is not None
+    assert index.is_tracked(sub)
+    assert index.is_tracked(sub / 'pkg')
+    assert not index.is_tracked(sub / 'missing')
+    # Paths from ls-files and diff-files are both relative to ``sub``, so
+    # the edit is seen and the stale index hash is not trusted.
+    assert index.worktree_dirty == {'pkg/mod.py'}
+    assert not index.known_identical(sub / 'pkg' / 'mod.py', b'x = 1\n')
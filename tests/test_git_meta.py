@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import subprocess
+
+import pytest
+import ubelt as ub
+
+from xcookie.vcs import git_meta
+from xcookie.vcs.git_meta import GitConfig, find_git_root, read_git_metadata
+
+
+def _git(cwd, *args):
+    return subprocess.run(
+        ['git', *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout
+
+
+@pytest.fixture
+def isolated_git(tmp_path, monkeypatch):
+    """Point the global and system git config at files under ``tmp_path``."""
+    global_fpath = tmp_path / 'gitconfig'
+    global_fpath.write_text('[user]\n\tname = Global Name\n\temail = g@example.com\n')
+    monkeypatch.setenv('GIT_CONFIG_GLOBAL', str(global_fpath))
+    monkeypatch.setenv('GIT_CONFIG_NOSYSTEM', '1')
+    for key in git_meta._CLI_ONLY_ENVIRON:
+        monkeypatch.delenv(key, raising=False)
+    return global_fpath
+
+
+@pytest.fixture
+def no_subprocess(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError(f'unexpected subprocess: {args}')
+
+    monkeypatch.setattr(ub, 'cmd', fail)
+
+
+def _make_repo(path):
+    path.mkdir(parents=True)
+    _git(path, 'init', '-q', '-b', 'main')
+    _git(path, 'remote', 'add', 'origin', 'git@github.com:Org/Repo.git')
+    _git(path, 'config', 'user.name', 'Local "Quoted" Name')
+    (path / 'file.txt').write_text('x\n')
+    _git(path, 'add', 'file.txt')
+    _git(path, '-c', 'commit.gpgsign=false', 'commit', '-q', '-m', 'init')
+    return path
+
+
+def test_read_git_metadata_matches_git(tmp_path, isolated_git, no_subprocess):
+    repo = _make_repo(tmp_path / 'repo')
+    expected_user = 'Local "Quoted" Name'
+    (repo / 'sub').mkdir()
+
+    metadata = read_git_metadata(repo / 'sub')
+    assert metadata.root == repo.resolve()
+    assert metadata.git_dir == metadata.common_dir == repo.resolve() / '.git'
+    assert metadata.branch == 'main'
+    assert metadata.remote_url() == 'git@github.com:Org/Repo.git'
+    assert metadata.remote_url('upstream') is None
+    assert metadata.config.get('user.name') == expected_user
+    assert metadata.config.get('user.email') == 'g@example.com'
+    assert read_git_metadata(repo) is metadata
+    assert read_git_metadata(tmp_path) is None
+
+
+def test_read_git_metadata_follows_worktrees(tmp_path, isolated_git):
+    repo = _make_repo(tmp_path / 'repo')
+    worktree = tmp_path / 'wt'
+    _git(repo, 'worktree', 'add', '-q', '-b', 'feature', str(worktree))
+    _git(repo, 'config', 'url.https://github.com/.insteadOf', 'git@github.com:')
+
+    metadata = read_git_metadata(worktree)
+    assert metadata.root == worktree.resolve()
+    assert metadata.git_dir == repo.resolve() / '.git' / 'worktrees' / 'wt'
+    assert metadata.common_dir == repo.resolve() / '.git'
+    assert metadata.branch == 'feature'
+    # insteadOf rules apply like they do for ``git remote get-url``
+    expected = _git(worktree, 'remote', 'get-url', 'origin').strip()
+    assert metadata.remote_url() == expected == 'https://github.com/Org/Repo.git'
+
+
+def test_config_includes_fall_back_to_git(tmp_path, isolated_git, monkeypatch):
+    repo = _make_repo(tmp_path / 'repo')
+    extra = tmp_path / 'extra.gitconfig'
+    extra.write_text('[remote "mirror"]\n\turl = https://example.com/mirror.git\n')
+    _git(repo, 'config', 'include.path', str(extra))
+
+    calls = []
+    orig_cmd = ub.cmd
+    monkeypatch.setattr(
+        ub, 'cmd', lambda *a, **kw: calls.append(a) or orig_cmd(*a, **kw)
+    )
+    metadata = read_git_metadata(repo)
+    assert calls
+    assert metadata.remote_url('mirror') == 'https://example.com/mirror.git'
+    assert metadata.branch == 'main'
+
+    # The CLI result is cached until the config or an included file changes
+    calls.clear()
+    assert read_git_metadata(repo) is metadata
+    assert not calls
+    extra.write_text(
+        '[remote "mirror"]\n\turl = https://example.com/moved.git\n'
+    )
+    metadata = read_git_metadata(repo)
+    assert calls
+    assert metadata.remote_url('mirror') == 'https://example.com/moved.git'
+
+
+def test_user_config_includes_are_cached(tmp_path, isolated_git, monkeypatch):
+    nested = tmp_path / 'nested.gitconfig'
+    nested.write_text('[user]\n\tname = Nested\n')
+    extra = tmp_path / 'extra.gitconfig'
+    extra.write_text('[include]\n\tpath = nested.gitconfig\n')
+    # extra.gitconfig includes nested.gitconfig relative to itself
+    isolated_git.write_text('[include]\n\tpath = extra.gitconfig\n')
+
+    calls = []
+    orig_cmd = ub.cmd
+    monkeypatch.setattr(
+        ub, 'cmd', lambda *a, **kw: calls.append(a) or orig_cmd(*a, **kw)
+    )
+    assert git_meta.read_git_config().get('user.name') == 'Nested'
+    assert calls
+    calls.clear()
+    assert git_meta.read_git_config().get('user.name') == 'Nested'
+    assert not calls
+    nested.write_text('[user]\n\tname = Changed Nested\n')
+    assert git_meta.read_git_config().get('user.name') == 'Changed Nested'
+    assert calls
+
+
+def test_git_config_parser_matches_git(tmp_path):
+    fpath = tmp_path / 'config'
+    fpath.write_text(
+        '# comment\n'
+        '[core]  bare = false ; trailing comment\n'
+        '[Section "Sub \\"Quoted\\""]\n'
+        '    Key = "  spaced # not a comment "  # comment\n'
+        '    multi = one \\\n'
+        '        two\n'
+        '    escaped = tab\\there\n'
+        '    flag\n'
+        '[legacy.Dotted]\n'
+        '    empty =\n'
+    )
+    listing = _git(tmp_path, 'config', '--file', str(fpath), '--list', '-z')
+    expected = git_meta._parse_config_list(listing)
+    parsed = GitConfig.parse(fpath.read_text())
+    assert parsed == expected
+    assert parsed.get('section.Sub "Quoted".key') == '  spaced # not a comment '
+
+
+def test_find_git_root(tmp_path):
+    repo = tmp_path / 'repo'
+    (repo / 'a' / 'b').mkdir(parents=True)
+    found = find_git_root(repo / 'a' / 'b')
+    assert found is None or tmp_path.resolve() not in (found, *found.parents)
+    (repo / '.git').write_text('gitdir: elsewhere\n')
+    assert find_git_root(repo / 'a' / 'b') == repo.resolve()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip('gitlab')
+
+
+def _remote(fake_gitlab, proj_name='demo', proj_group='computer-vision'):
+    from xcookie.vcs.gitlab import GitlabRemote
+
+    return GitlabRemote(
+        proj_name, proj_group, fake_gitlab.url, private_token='fake-token'
+    )
+
+
+def test_group_and_project_are_looked_up_by_path(fake_gitlab):
+    from xcookie.vcs.gitlab import NotFound
+
+    for idx in range(200):
+        fake_gitlab.add_group(f'Other Group {idx}')
+    fake_gitlab.add_group('Computer Vision', path='computer-vision')
+
+    self = _remote(fake_gitlab)
+    assert self.group.name == 'Computer Vision'
+    assert self.group_id == self.group.id
+    assert fake_gitlab.requests == [('GET', '/api/v4/groups/computer-vision')]
+
+    with pytest.raises(NotFound):
+        self.project
+    self.new_project()
+    assert self.project.path_with_namespace == 'computer-vision/demo'
+    assert self.project_id == self.project.id
+    protected = fake_gitlab.protected_branches[self.project_id]
+    assert [b['name'] for b in protected] == ['release', 'main', 'master']
+
+    # The group is resolved once and never listed. A missing project is not
+    # memoized, so the check above and the one in new_project each ask once.
+    assert fake_gitlab.count('GET', '/api/v4/groups') == 1
+    assert fake_gitlab.count('GET', '/api/v4/projects/computer-vision') == 2
+    assert fake_gitlab.count('POST', '/api/v4/projects') == 4
+    assert len(fake_gitlab.requests) == 9
+
+
+def test_group_falls_back_to_name_search(fake_gitlab):
+    fake_gitlab.add_group('Computer Vision Extra')
+    fake_gitlab.add_group('Computer Vision', path='cv')
+
+    self = _remote(fake_gitlab, proj_group='Computer Vision')
+    assert self.group.path == 'cv'
+    assert self.group.id == self.group_id
+    assert fake_gitlab.requests == [
+        ('GET', '/api/v4/groups/Computer%20Vision'),
+        ('GET', '/api/v4/groups'),
+    ]
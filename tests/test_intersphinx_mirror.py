@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import http.server
+import threading
+
+import pytest
+
+from xcookie.rc.intersphinx_mirror import InventoryMirror
+
+
+@pytest.fixture
+def inventory_server():
+    """Serve ``/<name>/objects.inv`` with ETag revalidation."""
+    state = {'inventories': {'demo': b'v1'}, 'requests': []}
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            name = self.path.strip('/').split('/')[0]
+            state['requests'].append((name, self.headers.get('If-None-Match')))
+            data = state['inventories'].get(name)
+            if data is None:
+                self.send_error(404)
+                return
+            etag = f'"{hash(data)}"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state['url'] = f'http://127.0.0.1:{server.server_port}'
+    try:
+        yield state
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_mirror_revalidates_with_etag_after_ttl(tmp_path, inventory_server):
+    url = inventory_server['url']
+    mapping = {
+        'demo': (f'{url}/demo/', None),
+        'gone': (f'{url}/gone/', None),
+    }
+    mirror = InventoryMirror(tmp_path, ttl=3600)
+    assert mirror.refresh_all(mapping) == {'demo': 'fetched', 'gone': 'failed'}
+    assert 'gone' in mirror.errors
+    assert mirror.local_fpath('demo', mapping['demo'][0]).read_bytes() == b'v1'
+
+    # Within the ttl nothing is requested
+    requests = inventory_server['requests']
+    requests.clear()
+    assert mirror.refresh('demo', mapping['demo'][0]) == 'fresh'
+    assert requests == []
+
+    # After the ttl the copy is revalidated with its ETag
+    mirror = InventoryMirror(tmp_path, ttl=0)
+    assert mirror.refresh('demo', mapping['demo'][0]) == 'not-modified'
+    assert requests[0][1] is not None
+    inventory_server['inventories']['demo'] = b'v2'
+    assert mirror.refresh('demo', mapping['demo'][0]) == 'fetched'
+    assert mirror.local_fpath('demo', mapping['demo'][0]).read_bytes() == b'v2'
+
+
+def test_docs_inventories_cli_reads_conf(tmp_path, inventory_server, capsys):
+    from xcookie.docs_inventories import DocsInventoriesConfig
+
+    url = inventory_server['url']
+    conf_fpath = tmp_path / 'repo' / 'docs' / 'source' / 'conf.py'
+    conf_fpath.parent.mkdir(parents=True)
+    conf_fpath.write_text(
+        'import os\n'
+        'intersphinx_mapping = {\n'
+        f"    'demo': ('{url}/demo/', None),\n"
+        '}\n'
+    )
+    mirror_dpath = tmp_path / 'mirror'
+    argv = [str(tmp_path / 'repo'), '--dpath', str(mirror_dpath)]
+    statuses, mirror = DocsInventoriesConfig.main(argv=argv)
+    assert statuses == {'demo': 'fetched'}
+    statuses, mirror = DocsInventoriesConfig.main(argv=argv)
+    assert statuses == {'demo': 'fresh'}
+    statuses, mirror = DocsInventoriesConfig.main(argv=argv + ['--force'])
+    assert statuses == {'demo': 'not-modified'}
+    assert (mirror_dpath / 'demo.inv').read_bytes() == b'v1'
+    assert 'not-modified' in capsys.readouterr().out
@@ -107,3 +107,158 @@ def test_render_patch_plan_is_separate_from_gathering(tmp_path, capsys):
     assert '<NEW FPATH=' in captured.out
     assert '<DIFF FOR repo_fpath=' in captured.out
     assert 'stats = ' in captured.out
+
+
+def test_render_patch_plan_renders_diff_sources_lazily(tmp_path, capsys):
+    stage = tmp_path / 'stage.txt'
+    repo = tmp_path / 'repo.txt'
+    stage.write_text('new line\n')
+    repo.write_text('old line\n')
+    plan = PatchPlan(dirty=[repo])
+    plan.add_diff('dirty', stage, repo)
+
+    assert plan.diff_texts == {}
+    render_patch_plan(plan)
+
+    captured = capsys.readouterr()
+    assert f'<DIFF FOR repo_fpath={repo}>' in captured.out
+    assert 'new line' in captured.out
+
+
+def test_render_patch_plan_caps_total_diff_size(tmp_path, capsys):
+    paths = [tmp_path / f'file{idx}.txt' for idx in range(3)]
+    plan = PatchPlan(missing=paths)
+    for fpath in paths:
+        plan.diff_texts[fpath] = 'x' * 10
+
+    render_patch_plan(plan, max_chars=15)
+
+    captured = capsys.readouterr()
+    assert captured.out.count('<NEW FPATH=') == 2
+    assert '<DIFFS OMITTED count=1' in captured.out
+    assert str(paths[2]) in captured.out
+
+
+def test_patch_plan_transactional_apply_all_in_parallel(tmp_path):
+    stage = tmp_path / 'stage'
+    repo = tmp_path / 'repo'
+    stage.mkdir()
+    plan = PatchPlan()
+    for idx in range(20):
+        src = stage / f'file{idx}.txt'
+        src.write_text(f'text {idx}')
+        plan.add_copy(src, repo / 'sub' / f'file{idx}.txt')
+
+    plan.apply_all(transactional=True, workers=4)
+
+    for idx in range(20):
+        assert (repo / 'sub' / f'file{idx}.txt').read_text() == f'text {idx}'
+    assert sorted(p.name for p in (repo / 'sub').iterdir()) == sorted(
+        f'file{idx}.txt' for idx in range(20)
+    )
+
+
+def test_patch_plan_transactional_apply_rolls_back_on_failure(tmp_path):
+    import os
+    import stat
+
+    import pytest
+
+    stage = tmp_path / 'stage'
+    repo = tmp_path / 'repo'
+    stage.mkdir()
+    repo.mkdir()
+    existing = repo / 'existing.sh'
+    existing.write_text('original')
+    existing.chmod(0o644)
+    (stage / 'existing.sh').write_text('replacement')
+    (stage / 'new.txt').write_text('new')
+
+    plan = PatchPlan()
+    plan.add_copy(stage / 'existing.sh', existing)
+    plan.add_copy(stage / 'new.txt', repo / 'newdir' / 'new.txt')
+    # Missing source makes the last copy fail after the others succeeded.
+    plan.add_copy(stage / 'does_not_exist.txt', repo / 'broken.txt')
+    plan.add_perm(existing, 0o755)
+
+    with pytest.raises(FileNotFoundError):
+        plan.apply_all(transactional=True)
+
+    assert existing.read_text() == 'original'
+    assert stat.S_IMODE(os.stat(existing).st_mode) == 0o644
+    assert not (repo / 'newdir').exists()
+    assert not (repo / 'broken.txt').exists()
+    assert sorted(p.name for p in repo.iterdir()) == ['existing.sh']
+
+
+def test_patch_plan_dump_and_load_roundtrip(tmp_path):
+    stage = tmp_path / 'stage'
+    repo = tmp_path / 'repo'
+    stage.mkdir()
+    repo.mkdir()
+    (repo / 'run.sh').write_text('old script')
+    (stage / 'run.sh').write_text('new script')
+    (stage / 'new.txt').write_text('new')
+
+    plan = PatchPlan()
+    plan.missing.append(repo / 'pkg' / 'new.txt')
+    plan.dirty.append(repo / 'run.sh')
+    plan.add_copy(stage / 'new.txt', repo / 'pkg' / 'new.txt')
+    plan.add_copy(stage / 'run.sh', repo / 'run.sh')
+    plan.add_diff('new', stage / 'new.txt', repo / 'pkg' / 'new.txt')
+    plan.add_diff('dirty', stage / 'run.sh', repo / 'run.sh')
+    plan.add_perm(repo / 'run.sh', 0o755)
+    plan.add_mkdir(repo / 'empty')
+    artifact = plan.dump(tmp_path / 'plan.tar.gz', repo)
+
+    # Apply to a copy of the repo on "another machine".
+    other = tmp_path / 'other'
+    other.mkdir()
+    (other / 'run.sh').write_text('old script')
+    loaded = PatchPlan.load(artifact, other, tmp_path / 'extracted')
+
+    assert loaded.task_summary == plan.task_summary
+    assert loaded.missing == [other / 'pkg' / 'new.txt']
+    assert loaded.dirty == [other / 'run.sh']
+    assert loaded.diff_sources[other / 'run.sh'].kind == 'dirty'
+    assert loaded.stale_paths() == []
+
+    loaded.apply_all(transactional=True)
+    assert (other / 'pkg' / 'new.txt').read_text() == 'new'
+    assert (other / 'run.sh').read_text() == 'new script'
+    assert (other / 'run.sh').stat().st_mode & 0o777 == 0o755
+    assert (other / 'empty').is_dir()
+
+
+def test_patch_plan_load_detects_stale_targets(tmp_path):
+    stage = tmp_path / 'stage'
+    repo = tmp_path / 'repo'
+    stage.mkdir()
+    repo.mkdir()
+    (repo / 'a.txt').write_text('planned against this')
+    (stage / 'a.txt').write_text('replacement')
+
+    plan = PatchPlan()
+    plan.add_copy(stage / 'a.txt', repo / 'a.txt')
+    artifact = plan.dump(tmp_path / 'plan.tar.gz', repo)
+
+    (repo / 'a.txt').write_text('edited after planning')
+    loaded = PatchPlan.load(artifact, repo, tmp_path / 'extracted')
+    assert loaded.stale_paths() == [repo / 'a.txt']
+
+
+def test_patch_plan_load_rejects_unsafe_members(tmp_path):
+    import io
+    import tarfile
+
+    import pytest
+
+    artifact = tmp_path / 'evil.tar.gz'
+    with tarfile.open(artifact, 'w:gz') as tar:
+        info = tarfile.TarInfo('../escape.txt')
+        info.size = 1
+        tar.addfile(info, io.BytesIO(b'x'))
+
+    with pytest.raises(ValueError, match='Unsafe path'):
+        PatchPlan.load(artifact, tmp_path / 'repo', tmp_path / 'extracted')
+    assert not (tmp_path / 'escape.txt').exists()
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from xcookie.vcs.provision import (
+    ProvisionConfig,
+    RateLimiter,
+    provision_one,
+)
+
+pytest.importorskip('gitlab')
+
+
+def _argv(fake_gitlab, *names):
+    return list(names) + [
+        '--remote_host',
+        fake_gitlab.url,
+        '--remote_group',
+        'computer-vision',
+        '--private_token',
+        'fake-token',
+        '--backoff',
+        '0',
+        '--rate',
+        '0',
+        '--yes',
+    ]
+
+
+def test_provision_creates_projects_concurrently(fake_gitlab, capsys):
+    fake_gitlab.add_group('Computer Vision', path='computer-vision')
+    # The first create request fails with a transient error and is retried
+    fake_gitlab.failures[('POST', '/api/v4/projects')] = [503]
+
+    names = ['whodat', 'whatdat', 'whendat', 'whydat', 'howdat']
+    results = ProvisionConfig.main(argv=_argv(fake_gitlab, *names))
+    assert [r.name for r in results] == names
+    assert [r.status for r in results] == ['created'] * len(names)
+    assert sorted(r.attempts for r in results) == [1, 1, 1, 1, 2]
+    assert len(fake_gitlab.projects) == len(names)
+    for project in fake_gitlab.projects:
+        protected = fake_gitlab.protected_branches[project['id']]
+        assert [b['name'] for b in protected] == ['release', 'main', 'master']
+    assert 'howdat   created' in capsys.readouterr().out
+
+    # Running again changes nothing
+    results = ProvisionConfig.main(argv=_argv(fake_gitlab, *names))
+    assert [r.status for r in results] == ['exists'] * len(names)
+    assert len(fake_gitlab.projects) == len(names)
+
+
+def test_provision_retry_accepts_existing_project(fake_gitlab):
+    from xcookie.vcs.gitlab import GitlabRemote
+
+    fake_gitlab.add_group('Computer Vision', path='computer-vision')
+    GitlabRemote(
+        'demo', 'computer-vision', fake_gitlab.url, private_token='fake'
+    ).ensure_project()
+
+    # A retry whose lookup missed the project (e.g. the earlier create
+    # response was lost) gets a 400 "has already been taken" and accepts it.
+    fake_gitlab.failures[('GET', '/api/v4/projects/computer-vision')] = [404]
+    remote = GitlabRemote(
+        'demo', 'computer-vision', fake_gitlab.url, private_token='fake'
+    )
+    assert remote.ensure_project() == 'exists'
+    # One project and three protected branches, then the rejected create
+    assert fake_gitlab.count('POST', '/api/v4/projects') == 5
+    assert len(fake_gitlab.projects) == 1
+
+
+def test_provision_reports_permanent_failures(fake_gitlab):
+    from xcookie.vcs.gitlab import GitlabRemote
+
+    fake_gitlab.add_group('Computer Vision', path='computer-vision')
+    fake_gitlab.failures[('POST', '/api/v4/projects')] = [403]
+    remote = GitlabRemote(
+        'demo', 'computer-vision', fake_gitlab.url, private_token='fake'
+    )
+    result = provision_one(remote, retries=3, backoff=0)
+    assert result.status == 'failed'
+    assert result.attempts == 1
+    assert '403' in result.error
+
+
+def test_rate_limiter_spaces_calls():
+    limiter = RateLimiter(rate=50)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.wait()
+    assert time.monotonic() - start >= 0.09
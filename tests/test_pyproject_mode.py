@@ -979,3 +979,150 @@ def test_explicit_packages_list_is_converted_to_find_dict(tmp_path) -> None:
     assert 'find' in packages
     assert 'where' in packages['find']
     assert 'include' in packages['find']
+
+
+def test_plan_out_then_plan_in_applies_without_rendering(tmp_path) -> None:
+    """
+    A plan written with ``plan_out`` can be applied to another checkout with
+    ``plan_in`` and produces the same files as a direct run.
+    """
+    from xcookie.main import TemplateApplier, XCookieConfig
+
+    common = dict(
+        mod_name='demo_mod',
+        repo_name='demo_mod',
+        tags=['github', 'purepy'],
+        rotate_secrets=False,
+        init_new_remotes=False,
+        interactive=False,
+        use_vcs=False,
+        refresh_docs=False,
+    )
+    repodir = tmp_path / 'demo'
+    repodir.mkdir()
+    artifact = tmp_path / 'plan.tar.gz'
+    applier = TemplateApplier(
+        XCookieConfig(repodir=repodir, plan_out=artifact, **common)
+    )
+    applier.setup()
+    applier.dump_patch_plan(artifact)
+    assert artifact.exists()
+    assert list(repodir.iterdir()) == []
+
+    other = tmp_path / 'other'
+    other.mkdir()
+    applier2 = TemplateApplier(
+        XCookieConfig(repodir=other, plan_in=artifact, **common)
+    )
+    plan = applier2.apply_plan_artifact(artifact)
+    assert plan.copy
+    for task in plan.copy:
+        assert task.dst.is_relative_to(other)
+    assert (other / 'pyproject.toml').read_text() == (
+        applier.staging_dpath / 'pyproject.toml'
+    ).read_text()
+
+
+def _write_layered_pyproject(repodir):
+    repodir.mkdir()
+    (repodir / 'pyproject.toml').write_text(
+        toml.dumps(
+            {
+                'project': {
+                    'name': 'inferred-pkg',
+                    'description': 'inferred description',
+                    'requires-python': '>=3.9',
+                },
+                'tool': {
+                    'xcookie': {
+                        'description': 'xcookie description',
+                        'tags': ['gitlab', 'purepy'],
+                        'min_python': '3.10',
+                    }
+                },
+            }
+        )
+    )
+
+
+def test_load_from_cli_and_pyproject_layers(tmp_path, monkeypatch) -> None:
+    """
+    Defaults < inferred pyproject metadata < ``[tool.xcookie]`` < CLI, with
+    the command line parsed and the config resolved exactly once.
+    """
+    from xcookie.main import XCookieConfig
+    from xcookie.resolved_config import ResolvedXCookieConfig
+
+    repodir = tmp_path / 'demo'
+    _write_layered_pyproject(repodir)
+
+    calls = {'load': 0, 'resolve': 0}
+    orig_load = XCookieConfig.load
+    orig_from_config = ResolvedXCookieConfig.from_config.__func__
+
+    def counting_load(self, *args, **kwargs):
+        calls['load'] += 1
+        return orig_load(self, *args, **kwargs)
+
+    def counting_from_config(cls, config):
+        calls['resolve'] += 1
+        return orig_from_config(cls, config)
+
+    monkeypatch.setattr(XCookieConfig, 'load', counting_load)
+    monkeypatch.setattr(
+        ResolvedXCookieConfig, 'from_config', classmethod(counting_from_config)
+    )
+
+    config = XCookieConfig.load_from_cli_and_pyproject(
+        argv=[str(repodir), '--tags', 'github,purepy', '--interactive=True'],
+        author='Author',
+        author_email='a@b.c',
+        interactive=False,
+    )
+    assert calls == {'load': 1, 'resolve': 1}
+
+    # inferred metadata fills keys the xcookie table does not set
+    assert config['pkg_name'] == 'inferred-pkg'
+    # the xcookie table wins over inferred metadata
+    assert config['description'] == 'xcookie description'
+    assert config['min_python'] == '3.10'
+    # the command line wins over kwargs and the pyproject layers
+    assert config['tags'] == ['github', 'purepy']
+    assert config['interactive'] is True
+
+    resolved = config.resolved
+    assert isinstance(resolved, ResolvedXCookieConfig)
+    assert resolved.tags == ('github', 'purepy')
+    assert resolved.supported_python_versions[0] == '3.10'
+
+
+def test_resolved_config_is_reused_until_config_changes(tmp_path) -> None:
+    import pytest
+
+    from xcookie.main import TemplateApplier, XCookieConfig
+
+    repodir = tmp_path / 'demo'
+    _write_layered_pyproject(repodir)
+    config = XCookieConfig.load_from_cli_and_pyproject(
+        argv=0,
+        repodir=repodir,
+        author='Author',
+        author_email='a@b.c',
+        interactive=False,
+    )
+    resolved = config.resolved
+    # changes before the applier takes its snapshot are resolved again
+    config['tags'] = ['gitlab', 'binpy']
+    applier = TemplateApplier(config)
+    assert applier.resolved is not resolved
+    assert applier.resolved.tags == ('gitlab', 'binpy')
+    assert config.resolved is applier.resolved
+    assert applier.tags == frozenset({'gitlab', 'binpy'})
+
+    # afterwards the snapshot keys are read-only, other keys are not
+    with pytest.raises(TypeError):
+        config['tags'] = ['github']
+    with pytest.raises(TypeError):
+        config.update({'min_python': '3.12'})
+    config['ci_test_selection'] = 'affected'
+    assert TemplateApplier(config).resolved is applier.resolved
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+import xcookie
+from xcookie.directive import DirectiveExtractor
+from xcookie.staging import (
+    CompiledTemplate,
+    TokenSubstituter,
+    apply_template_context,
+    comment_line,
+    load_compiled_template,
+    uncomment_line,
+)
+from xcookie.template_registry import TemplateContext
+
+RC_DPATH = Path(xcookie.__file__).parent / 'rc'
+
+CONTEXT = TemplateContext(
+    repo_name='demo_repo',
+    mod_name='demo_mod',
+    rel_mod_dpath='src/demo_mod',
+    rel_mod_dpath_posix='src/demo_mod',
+    author='Example Author',
+    author_email='author@example.com',
+)
+
+
+def _reference_render(text, tags, context):
+    """The line-by-line tokenizer pipeline compiled templates replace."""
+    extractor = DirectiveExtractor('xcookie', ['UNCOMMENT_IF', 'COMMENT_IF'])
+    new_lines = []
+    for line in text.split('\n'):
+        for directive in extractor._extract_tokenized(line):
+            if tags.issuperset(directive.args):
+                if directive.name == 'COMMENT_IF':
+                    line = comment_line(line)
+                elif directive.name == 'UNCOMMENT_IF':
+                    line = uncomment_line(line)
+        new_lines.append(line)
+    text = '\n'.join(new_lines)
+    if context is not None:
+        text = apply_template_context(text, context)
+    return text
+
+
+@pytest.mark.parametrize(
+    'fpath', sorted(RC_DPATH.glob('*.in')), ids=lambda p: p.name
+)
+def test_compiled_template_matches_reference_pipeline(fpath):
+    text = fpath.read_text()
+    compiled = CompiledTemplate.compile(text, CONTEXT.replacements())
+    for tags in [set(), {'cv2'}, {'gdal'}, {'cv2', 'gdal', 'binpy'}]:
+        for context in [None, CONTEXT]:
+            replacements = None if context is None else context.replacements()
+            got = compiled.render(tags, replacements)
+            assert got == _reference_render(text, tags, context)
+            if context is not None:
+                substitute = TokenSubstituter.for_context(context)
+                assert compiled.render(tags, substitute) == got
+
+
+def test_render_reuses_context_substituter(monkeypatch):
+    substitute = TokenSubstituter.for_context(CONTEXT)
+    assert TokenSubstituter.for_context(CONTEXT) is substitute
+    templates = [
+        CompiledTemplate.compile(text, substitute.replacements)
+        for text in [
+            'xcookie <mod_name>\n',
+            '- xcookie  # xcookie: +COMMENT_IF(cv2)\n',
+        ]
+    ]
+
+    def fail(*args, **kwargs):
+        raise AssertionError('render should not build a substituter')
+
+    monkeypatch.setattr(TokenSubstituter, '__init__', fail)
+    rendered = [compiled.render({'cv2'}, substitute) for compiled in templates]
+    assert rendered == [
+        'demo_repo demo_mod\n',
+        '# - demo_repo  # demo_repo: +COMMENT_IF(cv2)\n',
+    ]
+
+
+def test_load_compiled_template_uses_disk_cache(tmp_path, monkeypatch):
+    import xcookie.staging
+
+    fpath = tmp_path / 'demo.yml.in'
+    fpath.write_text('name: xcookie\n- run  # xcookie: +COMMENT_IF(cv2)\n')
+    cache_dpath = tmp_path / 'cache'
+    tokens = list(CONTEXT.replacements())
+
+    monkeypatch.setattr(xcookie.staging, '_COMPILED_MEMO', {})
+    compiled = load_compiled_template(fpath, tokens, cache_dpath=cache_dpath)
+    [cache_fpath] = cache_dpath.glob('*.json')
+    assert json.loads(cache_fpath.read_text()) == compiled.to_json()
+
+    # A fresh process reads the cache instead of compiling again.
+    monkeypatch.setattr(xcookie.staging, '_COMPILED_MEMO', {})
+
+    def fail(*args, **kwargs):
+        raise AssertionError('should have used the cache')
+
+    with monkeypatch.context() as m:
+        m.setattr(CompiledTemplate, 'compile', fail)
+        cached = load_compiled_template(fpath, tokens, cache_dpath=cache_dpath)
+    assert cached == compiled
+
+    # Editing the template changes its hash, so it is compiled again.
+    fpath.write_text('other: xcookie\n')
+    monkeypatch.setattr(xcookie.staging, '_COMPILED_MEMO', {})
+    updated = load_compiled_template(fpath, tokens, cache_dpath=cache_dpath)
+    assert updated.render(set(), CONTEXT.replacements()) == 'other: demo_repo\n'
+    assert len(list(cache_dpath.glob('*.json'))) == 2
+
+
+def test_load_compiled_template_recovers_from_corrupt_cache(tmp_path, monkeypatch):
+    import xcookie.staging
+
+    fpath = tmp_path / 'demo.txt.in'
+    fpath.write_text('hello xcookie')
+    cache_dpath = tmp_path / 'cache'
+    monkeypatch.setattr(xcookie.staging, '_COMPILED_MEMO', {})
+    load_compiled_template(fpath, ['xcookie'], cache_dpath=cache_dpath)
+    [cache_fpath] = cache_dpath.glob('*.json')
+    cache_fpath.write_text('{not json')
+
+    monkeypatch.setattr(xcookie.staging, '_COMPILED_MEMO', {})
+    compiled = load_compiled_template(fpath, ['xcookie'], cache_dpath=cache_dpath)
+    assert compiled.render(set(), {'xcookie': 'x'}) == 'hello x'
+    assert json.loads(cache_fpath.read_text()) == compiled.to_json()
+
+
+def test_apply_template_context_is_single_pass():
+    from xcookie.staging import TokenSubstituter
+
+    context = TemplateContext(
+        repo_name='xcookie_demo',
+        mod_name='<AUTHOR>_mod',
+        rel_mod_dpath='xcookie',
+        rel_mod_dpath_posix='xcookie',
+        author='<mod_name>',
+        author_email='a@b.c',
+    )
+    text = 'xcookie <mod_name> <rel_mod_dpath> <AUTHOR> <AUTHOR_EMAIL> <AUTHOR'
+    expected = 'xcookie_demo <AUTHOR>_mod xcookie <mod_name> a@b.c <AUTHOR'
+    assert apply_template_context(text, context) == expected
+
+    # The result does not depend on the order of the mapping.
+    reversed_mapping = dict(reversed(list(context.replacements().items())))
+    assert TokenSubstituter(reversed_mapping)(text) == expected
+    assert TokenSubstituter({})(text) == text
@@ -12,8 +12,9 @@ class MinimalConfig(dict):
     pass
 
 
-def _make_applier(staging_infos, *, regen=None, only_generate=None):
+def _make_applier(staging_infos, *, regen=None, only_generate=None, repodir=None):
     applier = TemplateApplier.__new__(TemplateApplier)
+    applier.repodir = repodir
     applier.config = MinimalConfig(
         regen=regen,
         only_generate=only_generate,
@@ -158,3 +159,70 @@ def test_gather_tasks_records_missing_dirs_and_permissions(tmp_path):
     # Preserve the historical behavior from TemplateApplier: adding ``x``
     # means owner-executable, not necessarily executable for every class.
     assert plan.perms[0].mode & stat.S_IXUSR
+
+
+def test_gather_tasks_defers_diff_rendering(tmp_path):
+    stage = tmp_path / 'stage'
+    repo = tmp_path / 'repo'
+    stage.mkdir()
+    repo.mkdir()
+    (stage / 'new.txt').write_text('new')
+    (stage / 'dirty.txt').write_text('new dirty')
+    (repo / 'dirty.txt').write_text('old dirty')
+
+    applier = _make_applier(
+        [
+            _info('new.txt', stage / 'new.txt', repo / 'new.txt'),
+            _info(
+                'dirty.txt', stage / 'dirty.txt', repo / 'dirty.txt', overwrite=True
+            ),
+        ]
+    )
+    plan = applier.gather_tasks()
+
+    assert plan.diff_texts == {}
+    assert set(plan.diff_sources) == {repo / 'new.txt', repo / 'dirty.txt'}
+    assert plan.diff_sources[repo / 'new.txt'].kind == 'new'
+    assert 'old dirty' in plan.diff_text(repo / 'dirty.txt')
+
+
+def test_gather_tasks_uses_git_index_for_tracked_files(tmp_path, monkeypatch):
+    import subprocess
+
+    import xcookie.main
+
+    stage = tmp_path / 'stage'
+    repo = tmp_path / 'repo'
+    stage.mkdir()
+    repo.mkdir()
+    for name in ['same.txt', 'edited.txt']:
+        (repo / name).write_text('committed\n')
+        (stage / name).write_text('committed\n')
+    subprocess.run(['git', 'init', '-q'], cwd=repo, check=True)
+    subprocess.run(['git', 'add', '.'], cwd=repo, check=True)
+    # Unstaged edit: the index still has the old blob for this file.
+    (repo / 'edited.txt').write_text('edited in the working tree\n')
+
+    seen = []
+    original = xcookie.main.content_matches_repo
+
+    def spy(data, repo_fpath):
+        seen.append(repo_fpath)
+        return original(data, repo_fpath)
+
+    monkeypatch.setattr(xcookie.main, 'content_matches_repo', spy)
+    applier = _make_applier(
+        [
+            _info('same.txt', stage / 'same.txt', repo / 'same.txt', overwrite=True),
+            _info(
+                'edited.txt', stage / 'edited.txt', repo / 'edited.txt', overwrite=True
+            ),
+        ],
+        repodir=repo,
+    )
+    plan = applier.gather_tasks()
+
+    assert plan.clean == [repo / 'same.txt']
+    assert plan.dirty == [repo / 'edited.txt']
+    # Only the file that is not clean in the index was read from disk.
+    assert seen == [repo / 'edited.txt']
@@ -1,5 +1,10 @@
 from xcookie.resolved_config import ResolvedXCookieConfig
-from xcookie.template_registry import TemplateContext, TemplateInfo
+from xcookie.template_registry import (
+    TemplateContext,
+    TemplateInfo,
+    TemplateRegistry,
+    coerce_template_infos,
+)
 from xcookie.staging import apply_template_context
 
 
@@ -17,6 +22,48 @@ def test_template_info_normalizes_tags():
 
 
 
+def test_template_info_uses_slots():
+    import pytest
+
+    info = TemplateInfo.coerce({'fname': 'demo.txt', 'custom': 1})
+    assert not hasattr(info, '__dict__')
+    assert info['custom'] == 1
+    with pytest.raises(AttributeError):
+        info.custom = 2  # type: ignore[attr-defined]
+
+
+def test_template_registry_indexes_tags_and_caches_enabled_sets():
+    registry = TemplateRegistry(coerce_template_infos([
+        {'fname': 'always.txt'},
+        {'fname': 'binpy.txt', 'tags': 'binpy'},
+        {'fname': 'gitlab_binpy.txt', 'tags': 'gitlab,binpy'},
+        {'fname': 'github.txt', 'tags': 'github'},
+        {'fname': 'disabled.txt', 'enabled': False},
+    ]))
+    assert len(registry) == 5
+    assert [str(i.fname) for i in registry.with_tag('gitlab')] == ['gitlab_binpy.txt']
+
+    enabled = registry.enabled({'gitlab', 'binpy'})
+    assert [str(i.fname) for i in enabled] == [
+        'always.txt', 'binpy.txt', 'gitlab_binpy.txt',
+    ]
+    # The same tag set, in any container, hits the cache.
+    assert registry.enabled(['binpy', 'gitlab']) is enabled
+
+    # Every tag set agrees with filtering records one by one.
+    for tags in [set(), {'github'}, {'binpy'}, {'github', 'gitlab', 'binpy'}]:
+        expected = [
+            info for info in registry
+            if info.enabled and info.tag_requirements_met(tags)
+        ]
+        assert list(registry.enabled(tags)) == expected
+
+    registry[4].enabled = False
+    registry[0].enabled = False
+    registry.invalidate()
+    assert [str(i.fname) for i in registry.enabled(set())] == []
+
+
 def test_template_info_bool_strings_are_coerced():
     info = TemplateInfo.coerce({
         'fname': 'demo.txt',
@@ -104,6 +151,30 @@ def test_resolved_config_apply_to_config(tmp_path):
     assert config['ci_pypy_versions'] == ['3.11']
 
 
+def test_resolved_config_caches_derived_values(tmp_path):
+    import dataclasses
+
+    import pytest
+
+    resolved = _resolve_pypy(
+        tmp_path, tags='github,purepy', min_python='3.10', max_python='3.11'
+    )
+    assert resolved.tag_set == frozenset({'github', 'purepy'})
+    assert resolved.tag_set is resolved.tag_set
+    assert resolved.cpython_wheel_tags == ('cp310', 'cp311')
+    assert str(resolved.min_python_version) == '3.10'
+    assert str(resolved.max_python_version) == '3.11'
+    context = resolved.template_context
+    assert context is resolved.template_context
+    assert context.rel_mod_dpath_posix == f'src/{resolved.mod_name}'
+    info = resolved.platform_info
+    assert info is resolved.platform_info
+    assert info['main_python_version'] == '3.11'
+    assert info['install_extra_versions']['minimal-strict'] == ['3.10']
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        resolved.tags = ('gitlab',)
+
+
 def _resolve_pypy(tmp_path, *, tags, min_python, max_python=None,
                   ci_pypy_versions='auto'):
     config = {
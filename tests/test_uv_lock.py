@@ -141,3 +141,83 @@ def test_refresh_locks_sh_disabled_for_legacy_setup_py_repos(tmp_path) -> None:
     ]
     assert len(infos) == 1
     assert infos[0].enabled is False
+
+
+def _make_lockfile_applier(tmp_path, **kwargs):
+    from xcookie.main import TemplateApplier, XCookieConfig
+
+    cfg = XCookieConfig(
+        repodir=tmp_path,
+        repo_name='demo_pkg',
+        mod_name='demo_pkg',
+        interactive=False,
+        rotate_secrets=False,
+        refresh_docs=False,
+        use_setup_py=False,
+        use_pyproject_requirements=False,
+        min_python='3.10',
+        test_variants=['minimal-strict', 'full-strict', 'full-loose'],
+        **kwargs,
+    )
+    cfg['enable_gpg'] = False
+    cfg['deploy'] = False
+    self = TemplateApplier(cfg)
+    self._presetup()
+    return self
+
+
+def test_uv_sync_install_engine_applies_to_strict_variants(tmp_path) -> None:
+    from xcookie.builders import ci_model, ci_plan
+
+    self = _make_lockfile_applier(
+        tmp_path, tags=['github', 'purepy'], ci_install_engine='uv-sync'
+    )
+    plan = ci_plan.make_ci_plan(self)
+    engines = {v.key: v.install_engine for v in plan.test_variants}
+    assert engines['full-strict'] == engines['minimal-strict'] == 'uv-sync'
+    assert engines['full-loose'] == engines['minimal-loose'] == 'pip'
+    cases = ci_model.make_artifact_test_cases(self, plan=plan)
+    assert {c.install_engine for c in cases if c.variant.is_strict} == {'uv-sync'}
+    assert {c.install_engine for c in cases if c.variant.is_loose} == {'pip'}
+
+    text = self.build_github_actions_tests()
+    assert 'install-engine: uv-sync' in text
+    assert 'INSTALL_ENGINE: ${{ matrix.install-engine }}' in text
+    assert 'python -m uv sync --frozen --inexact --no-install-project' in text
+    assert 'python -m uv pip install --no-deps "$WHEEL_FPATH"' in text
+    assert "hashFiles('uv.lock')" in text
+    assert 'INSTALL_START=$(date +%s)' in text
+
+
+def test_uv_sync_install_engine_per_variant_mapping(tmp_path) -> None:
+    from xcookie.builders import ci_plan
+
+    self = _make_lockfile_applier(
+        tmp_path,
+        tags=['gitlab', 'purepy'],
+        ci_install_engine='full-strict: uv-sync',
+    )
+    plan = ci_plan.make_ci_plan(self)
+    engines = {v.key: v.install_engine for v in plan.test_variants}
+    assert engines['full-strict'] == 'uv-sync'
+    assert engines['minimal-strict'] == 'pip'
+    text = self.build_gitlab_ci()
+    assert text.count('export INSTALL_ENGINE="uv-sync"') == 1
+
+
+def test_uv_sync_install_engine_rejects_loose_variants(tmp_path) -> None:
+    from xcookie.builders import ci_plan
+
+    self = _make_lockfile_applier(
+        tmp_path, tags=['github', 'purepy'], ci_install_engine='loose: uv-sync'
+    )
+    with pytest.raises(ValueError, match='strict'):
+        ci_plan.make_ci_plan(self)
+
+
+def test_default_install_engine_keeps_pip_install_path(tmp_path) -> None:
+    self = _make_lockfile_applier(tmp_path, tags=['github', 'purepy'])
+    text = self.build_github_actions_tests()
+    assert 'install-engine' not in text
+    assert 'uv sync' not in text
+    assert 'Using checked-in lock requirements' in text
@@ -2,7 +2,17 @@
 # PYTHON_ARGCOMPLETE_OK
 from __future__ import annotations
 
-from xcookie.main import main
+
+def main():
+    # Answer shell completion from the static table before importing the
+    # generator stack; this exits when a completion was requested.
+    from xcookie import completion
+
+    completion.autocomplete()
+    from xcookie.main import main as _main
+
+    _main()
+
 
 if __name__ == '__main__':
     """
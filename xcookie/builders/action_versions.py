@@ -9,6 +9,7 @@
 from __future__ import annotations
 
 ACTION_VERSIONS = {
+    'actions/cache': 'v4.3.0',
     'actions/checkout': 'v6.0.2',
     'actions/download-artifact': 'v7.0.0',
     'actions/setup-python': 'v6.2.0',
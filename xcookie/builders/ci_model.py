@@ -8,7 +8,7 @@ and leaves provider-specific syntax to the provider renderers.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from fnmatch import translate as glob_to_re
 import re
 from typing import Any, Literal, Mapping
@@ -50,9 +50,12 @@ class ArtifactTestCase:
     use_lockfile: bool = False
     lock_requirements: str | None = None
     gdal_requirement_txt: str | None = None
+    install_engine: ci_plan.InstallEngine = 'pip'
 
     @property
-    def key(self) -> tuple[str, str, str, str, str, str | None, str | None]:
+    def key(
+        self,
+    ) -> tuple[str, str, str, str, str, str | None, str | None, str]:
         return (
             self.variant.key,
             self.python_version,
@@ -61,6 +64,7 @@ class ArtifactTestCase:
             self.install_extras,
             self.lock_requirements if self.use_lockfile else None,
             self.gdal_requirement_txt,
+            self.install_engine,
         )
 
     @property
@@ -86,6 +90,8 @@ class ArtifactTestCase:
             item['lock-requirements'] = self.lock_requirements
         if self.gdal_requirement_txt is not None:
             item['gdal-requirement-txt'] = self.gdal_requirement_txt
+        if self.install_engine != 'pip':
+            item['install-engine'] = self.install_engine
         return item
 
     def gitlab_special_install_lines(self, pip_install: str) -> list[str]:
@@ -214,14 +220,7 @@ def _github_case_for_python(case: ArtifactTestCase) -> ArtifactTestCase | None:
             gitlab_os=case.platform.gitlab_os,
             gitlab_arch=case.platform.gitlab_arch,
         )
-        case = ArtifactTestCase(
-            variant=case.variant,
-            python_version=case.python_version,
-            platform=platform,
-            install_extras=case.install_extras,
-            use_lockfile=case.use_lockfile,
-            gdal_requirement_txt=case.gdal_requirement_txt,
-        )
+        case = replace(case, platform=platform)
     return case
 
 
@@ -300,12 +299,14 @@ def make_artifact_test_cases(
                 for pyver in python_versions:
                     use_lockfile = False
                     lock_requirements = None
+                    install_engine: ci_plan.InstallEngine = 'pip'
                     if common_ci.ci_plan.uses_lockfile_ci(self):
                         use_lockfile = variant.use_lockfile
                         if use_lockfile:
                             lock_requirements = ci_plan.lock_requirements_path(
                                 variant.extras
                             )
+                            install_engine = variant.install_engine
                     base_case = ArtifactTestCase(
                         variant=variant,
                         python_version=str(pyver),
@@ -316,6 +317,7 @@ def make_artifact_test_cases(
                         gdal_requirement_txt=_variant_gdal_requirement(
                             self, variant
                         ),
+                        install_engine=install_engine,
                     )
                     if provider == 'github':
                         github_case = _github_case_for_python(base_case)
@@ -363,6 +365,12 @@ def any_test_case_needs_qemu(
     return any(case.platform.arch != 'auto' for case in cases)
 
 
+def any_test_case_uses_uv_sync(
+    cases: list[ArtifactTestCase] | tuple[ArtifactTestCase, ...]
+) -> bool:
+    return any(case.install_engine == 'uv-sync' for case in cases)
+
+
 def make_purepy_workflow_plan(
     self: Any,
     plan: CIPlan | None = None,
@@ -20,6 +20,12 @@ VariantKey = Literal[
 ]
 DependencyMode = Literal['loose', 'strict']
 TestScope = Literal['minimal', 'full']
+TestSelection = Literal['all', 'affected']
+InstallEngine = Literal['pip', 'uv-sync']
+
+INSTALL_ENGINES: tuple[InstallEngine, ...] = ('pip', 'uv-sync')
+
+TEST_SELECTION_MODES: tuple[TestSelection, ...] = ('all', 'affected')
 
 VARIANT_KEYS: tuple[VariantKey, ...] = (
     'minimal-loose',
@@ -37,6 +43,7 @@ class TestVariant:
     scope: TestScope
     dependency_mode: DependencyMode
     extras: tuple[str, ...]
+    install_engine: InstallEngine = 'pip'
 
     @property
     def is_strict(self) -> bool:
@@ -71,6 +78,7 @@ class CIPlan:
     active_test_variants: tuple[TestVariant, ...]
     typecheck_extras: tuple[str, ...]
     sdist_test_extras: tuple[str, ...]
+    test_selection: TestSelection = 'all'
 
     def variants_by_key(self) -> dict[VariantKey, TestVariant]:
         return {variant.key: variant for variant in self.test_variants}
@@ -119,6 +127,42 @@ def uses_lockfile_ci(self: Any) -> bool:
     return bool(uses_pyproject_dependency_mode(self) and self.config.get('use_uv'))
 
 
+def resolve_test_selection(self: Any) -> TestSelection:
+    """Return the validated ``ci_test_selection`` mode.
+
+    In ``affected`` mode, pull / merge request jobs only run the tests that
+    touched the changed files according to a per-test coverage map recorded
+    by full runs. The map is built from the generated ``auto`` pytest command,
+    so custom test commands are rejected.
+
+    Example:
+        >>> from xcookie.builders.ci_plan import resolve_test_selection
+        >>> class Applier:
+        >>>     config = {'ci_test_selection': 'affected', 'test_command': 'auto'}
+        >>> resolve_test_selection(Applier())
+        'affected'
+        >>> Applier.config = {}
+        >>> resolve_test_selection(Applier())
+        'all'
+    """
+    mode = self.config.get('ci_test_selection', None) or 'all'
+    if mode not in TEST_SELECTION_MODES:
+        raise ValueError(
+            f'Unknown ci_test_selection={mode!r}, '
+            f'expected one of {TEST_SELECTION_MODES}'
+        )
+    if mode != 'all' and self.config.get('test_command', 'auto') != 'auto':
+        raise ValueError(
+            f'ci_test_selection={mode!r} requires test_command="auto"'
+        )
+    return mode
+
+
+def uses_test_selection(self: Any) -> bool:
+    """Return True when CI should run only tests affected by a change."""
+    return resolve_test_selection(self) != 'all'
+
+
 LOCK_REQUIREMENTS_DPATH = 'requirements/locks'
 
 
@@ -170,6 +214,62 @@ def _load_ci_extras(config: Mapping[str, Any]) -> dict[str, list[str]]:
     return {str(key): _as_list(value) for key, value in ci_extras.items()}
 
 
+def _load_install_engines(self: Any) -> dict[VariantKey, InstallEngine]:
+    """Resolve ``ci_install_engine`` into a per-variant install engine.
+
+    A plain engine name applies to the strict (lockfile) variants. A mapping
+    uses the same keys as ``ci_extras``. The ``uv-sync`` engine installs from
+    ``uv.lock`` and is only valid for strict variants in lockfile CI mode.
+    """
+    engines: dict[VariantKey, InstallEngine] = {key: 'pip' for key in VARIANT_KEYS}
+    value = self.config.get('ci_install_engine', None)
+    if not value:
+        return engines
+    if isinstance(value, str):
+        if value in INSTALL_ENGINES:
+            value = {'strict': value}
+        else:
+            from xcookie.util_yaml import Yaml
+
+            value = Yaml.loads(value)
+    if not isinstance(value, Mapping):
+        raise TypeError(
+            f'ci_install_engine must be an engine name or a mapping, got {value!r}'
+        )
+    for variant_key, engine in value.items():
+        if engine not in INSTALL_ENGINES:
+            raise ValueError(
+                f'Unknown ci_install_engine {engine!r} for {variant_key!r}, '
+                f'expected one of {INSTALL_ENGINES}'
+            )
+        target_keys = _CI_EXTRAS_TARGETS.get(str(variant_key))
+        if target_keys is None:
+            raise KeyError(f'Unknown ci_install_engine variant {variant_key!r}')
+        for key in target_keys:
+            engines[key] = engine
+    for key, engine in engines.items():
+        if engine == 'uv-sync':
+            if not uses_lockfile_ci(self):
+                raise ValueError(
+                    'ci_install_engine=uv-sync requires lockfile CI '
+                    '(use_uv with pyproject-only dependencies)'
+                )
+            if _variant_parts(key)[1] != 'strict':
+                raise ValueError(
+                    f'ci_install_engine=uv-sync is only valid for strict '
+                    f'variants, not {key!r}'
+                )
+    return engines
+
+
+def uses_uv_sync_ci(self: Any) -> bool:
+    """Return True when any requested variant installs with ``uv sync``."""
+    engines = _load_install_engines(self)
+    return any(
+        engines.get(key) == 'uv-sync' for key in self.config['test_variants']
+    )
+
+
 def get_pyproject_optional_dependency_keys(self: Any) -> set[str]:
     """Return static and setuptools-dynamic optional dependency keys."""
     pyproj_config = self.config._load_pyproject_config() or {}
@@ -292,6 +392,7 @@ def make_ci_plan(self: Any) -> CIPlan:
             for key, extras in variant_extras.items()
         }
 
+    install_engines = _load_install_engines(self)
     variants: list[TestVariant] = []
     for key in VARIANT_KEYS:
         scope, dependency_mode = _variant_parts(key)
@@ -301,6 +402,7 @@ def make_ci_plan(self: Any) -> CIPlan:
                 scope=scope,
                 dependency_mode=dependency_mode,
                 extras=_unique(variant_extras[key]),
+                install_engine=install_engines[key],
             )
         )
 
@@ -335,4 +437,5 @@ def make_ci_plan(self: Any) -> CIPlan:
         active_test_variants=active_variants,
         typecheck_extras=tuple(typecheck_extras),
         sdist_test_extras=tuple(sdist_test_extras),
+        test_selection=resolve_test_selection(self),
     )
@@ -4,6 +4,8 @@ from __future__ import annotations
 Common subroutines for consistency between gitlab-ci / github actions / etc...
 """
 
+import copy
+import os
 import shlex
 
 import ubelt as ub
@@ -240,6 +242,15 @@ def make_install_and_test_wheel_parts(
     get_modpath_bash = f'python -c "{get_modpath_python}"'
 
     test_command = self.config['test_command']
+    use_test_selection = ci_plan.uses_test_selection(self)
+    if use_test_selection:
+        selection_parts = make_test_selection_parts(self)
+    else:
+        selection_parts = {
+            'setup_commands': [],
+            'select_commands': [],
+            'record_commands': [],
+        }
 
     if test_command == 'auto':
         if 'ibeis' == self.mod_name:
@@ -248,9 +259,13 @@ def make_install_and_test_wheel_parts(
                 'echo "xdoctest command finished"',
             ]
         else:
+            test_targets = '"$MOD_DPATH" ../tests'
+            if use_test_selection:
+                test_targets = '"${TEST_TARGETS[@]}"'
             test_command = [
                 Yaml.CodeBlock(
-                    'python -m pytest --verbose -p pytester -p no:doctest --xdoctest --cov-config ../pyproject.toml --cov-report term --durations=100 --cov="$MOD_NAME" "$MOD_DPATH" ../tests'
+                    'python -m pytest --verbose -p pytester -p no:doctest --xdoctest --cov-config ../pyproject.toml --cov-report term --durations=100 --cov="$MOD_NAME" '
+                    + test_targets
                 ),
                 'echo "pytest command finished, moving the coverage file to the repo root"',
             ]
@@ -313,7 +328,7 @@ def make_install_and_test_wheel_parts(
     )
 
     if use_lockfile_ci:
-        install_wheel_commands += [
+        lock_install_commands = [
             'LOCK_ARGS=()',
             'if [[ "${USE_UV_LOCK:-false}" == "true" ]]; then',
             '    if [[ -z "${LOCK_REQUIREMENTS:-}" ]]; then',
@@ -333,6 +348,30 @@ def make_install_and_test_wheel_parts(
             # runtime, so omit it here.
             'python -m uv pip install --prerelease=allow "${LOCK_ARGS[@]}" "${INSTALL_TARGET}"',
         ]
+        if ci_plan.uses_uv_sync_ci(self):
+            # The uv-sync engine installs the locked dependencies straight
+            # from uv.lock into this interpreter and puts the built wheel on
+            # top of them without re-resolving.
+            lock_install_commands = [
+                'if [[ "${INSTALL_ENGINE:-pip}" == "uv-sync" ]]; then',
+                '    SYNC_ARGS=()',
+                '    IFS="," read -r -a SYNC_EXTRAS <<< "${INSTALL_EXTRAS:-}"',
+                '    for SYNC_EXTRA in "${SYNC_EXTRAS[@]}"; do',
+                '        SYNC_ARGS+=(--extra "$SYNC_EXTRA")',
+                '    done',
+                '    export UV_PROJECT_ENVIRONMENT="$(python -c "import sys; print(sys.prefix)")"',
+                '    python -m uv sync --frozen --inexact --no-install-project --no-default-groups "${SYNC_ARGS[@]}"',
+                '    python -m uv pip install --no-deps "$WHEEL_FPATH"',
+                'else',
+                *['    ' + line for line in lock_install_commands],
+                'fi',
+            ]
+        install_wheel_commands += [
+            'echo "INSTALL_ENGINE=${INSTALL_ENGINE:-pip}"',
+            'INSTALL_START=$(date +%s)',
+            *lock_install_commands,
+            'echo "Install (${INSTALL_ENGINE:-pip}) took $(( $(date +%s) - INSTALL_START ))s"',
+        ]
     else:
         install_wheel_commands += [
             f'{self.PIP_INSTALL_PREFER_BINARY} "${{INSTALL_TARGET}}"',
@@ -343,7 +382,8 @@ def make_install_and_test_wheel_parts(
     ]
 
     test_wheel_commands = (
-        [
+        selection_parts['setup_commands']
+        + [
             'echo "Creating test sandbox directory"',
             f'export WORKSPACE_DNAME="{workspace_dname}"',
             'echo "WORKSPACE_DNAME=$WORKSPACE_DNAME"',
@@ -368,8 +408,10 @@ def make_install_and_test_wheel_parts(
             """
             ),
         ]
+        + selection_parts['select_commands']
         + custom_before_test_lines
         + test_command
+        + selection_parts['record_commands']
         + custom_after_test_commands
     )
 
@@ -380,6 +422,313 @@ def make_install_and_test_wheel_parts(
     return install_and_test_wheel_parts
 
 
+def make_test_selection_parts(self):
+    """
+    Shell snippets for ``ci_test_selection='affected'``.
+
+    Full runs (anything that is not a pull / merge request) record which tests
+    executed each line of the package, using pytest-cov test contexts, into
+    the JSON map at ``$TEST_SELECTION_MAP`` together with the recorded commit.
+    Pull / merge request runs diff that commit against ``HEAD`` and narrow
+    ``TEST_TARGETS`` to the tests covering the changed lines plus the doctests
+    of the changed modules. Anything the map cannot account for falls back to
+    a full run: non-python files, new or deleted modules, test helpers, and
+    changes to import-time code (module or class level statements and def
+    headers).
+
+    The providers are responsible for caching ``.cache/test-selection``
+    between runs.
+
+    Returns:
+        Dict[str, List[str]]: setup commands to run from the repo root,
+        select commands to run after ``MOD_DPATH`` is known, and record
+        commands to run after the test command.
+
+    Example:
+        >>> from xcookie.builders.common_ci import *  # NOQA
+        >>> from xcookie.main import XCookieConfig, TemplateApplier
+        >>> config = XCookieConfig(tags=['purepy'], repo_name='demo', ci_test_selection='affected')
+        >>> self = TemplateApplier(config)
+        >>> parts = make_test_selection_parts(self)
+        >>> assert 'TEST_TARGETS=("$MOD_DPATH" ../tests)' in parts['select_commands']
+    """
+    rel_mod_parent = str(self.config.get('rel_mod_parent_dpath', '.') or '.')
+    src_prefix = '' if rel_mod_parent in {'', '.'} else rel_mod_parent.strip('/') + '/'
+
+    select_python = ub.codeblock(
+        f"""
+        python -c "if 1:
+            import ast, json, os, pathlib, subprocess, sys
+            map_fpath = pathlib.Path(os.environ['TEST_SELECTION_MAP'])
+            if not map_fpath.exists():
+                sys.exit(0)
+            recorded = json.loads(map_fpath.read_text())
+            commit, mapping = recorded['commit'], recorded['files']
+            def git(*args):
+                return subprocess.run(['git', *args], capture_output=True, text=True)
+            git('fetch', '--quiet', '--depth=1', 'origin', commit)
+            diff = git('diff', '-U0', '--no-color', '--no-renames', commit, 'HEAD')
+            if diff.returncode != 0:
+                sys.exit(0)
+            hunks = {{}}
+            for line in diff.stdout.splitlines():
+                if line.startswith('diff --git a/'):
+                    path = line.split(' b/')[-1]
+                    hunks[path] = []
+                elif line.startswith('@@ '):
+                    old, new = [(part[1:] + ',1').split(',')[:2] for part in line.split()[1:3]]
+                    hunks[path].append(tuple(map(int, old + new)))
+            def import_lines(text):
+                lines = {{0}}
+                def visit(body):
+                    for node in body:
+                        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                            start = min([d.lineno for d in node.decorator_list] + [node.lineno])
+                            lines.update(range(start, max(node.body[0].lineno, node.lineno + 1)))
+                            if isinstance(node, ast.ClassDef):
+                                visit(node.body)
+                        else:
+                            lines.update(range(node.lineno, node.end_lineno + 1))
+                visit(ast.parse(text).body)
+                return lines
+            prefix = '{src_prefix}'
+            root = pathlib.Path(os.environ['TEST_SELECTION_ROOT'])
+            selected = set()
+            for path, path_hunks in hunks.items():
+                if path.startswith('docs/') or path.endswith(('.md', '.rst')):
+                    continue
+                if not path.endswith('.py'):
+                    sys.exit(0)
+                key = path[len(prefix):] if prefix and path.startswith(prefix) else path
+                if key.startswith('tests/') and key.rsplit('/', 1)[-1].startswith('test_'):
+                    selected.add(key)
+                    continue
+                if key not in mapping or not (root / path).exists():
+                    sys.exit(0)
+                new_text = (root / path).read_text()
+                try:
+                    old_import = import_lines(git('show', commit + ':' + path).stdout)
+                    new_import = import_lines(new_text)
+                except SyntaxError:
+                    sys.exit(0)
+                if '>>>' in new_text:
+                    selected.add(key)
+                for a, b, c, d in path_hunks:
+                    old_lines = range(a, a + b) if b else range(a, a + 2)
+                    new_lines = range(c, c + d) if d else range(c, c + 2)
+                    if old_import.intersection(old_lines) or new_import.intersection(new_lines):
+                        sys.exit(0)
+                    for lineno in old_lines:
+                        selected.update(mapping[key].get(str(lineno), []))
+            mod_parent = pathlib.Path(os.environ['MOD_DPATH']).parent
+            for key in sorted(selected):
+                target = (root if key.startswith('tests/') else mod_parent) / key
+                if target.exists():
+                    print(target)
+        "
+        """
+    )
+
+    record_python = ub.codeblock(
+        """
+        python -c "if 1:
+            import json, os, pathlib, subprocess
+            import coverage
+            if not pathlib.Path('.coverage').exists():
+                print('No .coverage file, skipping the test selection map')
+                raise SystemExit(0)
+            data = coverage.CoverageData('.coverage')
+            data.read()
+            root = pathlib.Path(os.environ['TEST_SELECTION_ROOT']).resolve()
+            mod_dpath = pathlib.Path(os.environ['MOD_DPATH']).resolve()
+            cwd = pathlib.Path.cwd()
+            def to_key(fpath):
+                fpath = pathlib.Path(fpath).resolve()
+                for base in (mod_dpath.parent, root):
+                    try:
+                        return fpath.relative_to(base).as_posix()
+                    except ValueError:
+                        pass
+            context_keys = {'': None}
+            def context_key(context):
+                if context not in context_keys:
+                    key = None
+                    nodeid = context.split('|')[0].split('::')[0]
+                    for base in (mod_dpath, root, cwd, pathlib.Path(cwd.anchor)):
+                        if (base / nodeid).is_file():
+                            key = to_key(base / nodeid)
+                            break
+                    context_keys[context] = key
+                return context_keys[context]
+            files = {}
+            for fpath in data.measured_files():
+                key = to_key(fpath)
+                if key is None:
+                    continue
+                files[key] = {}
+                for lineno, contexts in data.contexts_by_lineno(fpath).items():
+                    targets = sorted(set(filter(None, map(context_key, contexts))))
+                    if targets:
+                        files[key][str(lineno)] = targets
+            commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                                    text=True, check=True).stdout.strip()
+            map_fpath = pathlib.Path(os.environ['TEST_SELECTION_MAP'])
+            map_fpath.parent.mkdir(parents=True, exist_ok=True)
+            map_fpath.write_text(json.dumps({'version': 1, 'commit': commit, 'files': files}))
+            print('Wrote test selection map for', len(files), 'files to', map_fpath)
+        "
+        """
+    )
+
+    setup_commands = [
+        'export TEST_SELECTION_ROOT="$(pwd)"',
+        'export TEST_SELECTION_MAP="$TEST_SELECTION_ROOT/.cache/test-selection/map.json"',
+        'if [[ "${GITHUB_EVENT_NAME:-}" == "pull_request" || "${CI_PIPELINE_SOURCE:-}" == "merge_request_event" ]]; then',
+        '    TEST_SELECTION_RECORD=false',
+        'else',
+        '    # Full runs record per-test coverage contexts to rebuild the map',
+        '    TEST_SELECTION_RECORD=true',
+        '    export PYTEST_ADDOPTS="${PYTEST_ADDOPTS:-} --cov-context=test"',
+        'fi',
+        'echo "TEST_SELECTION_RECORD=$TEST_SELECTION_RECORD"',
+    ]
+    select_commands = [
+        'TEST_TARGETS=("$MOD_DPATH" ../tests)',
+        'if [[ "$TEST_SELECTION_RECORD" == "false" ]]; then',
+        '    SELECTED_TARGETS=()',
+        '    while IFS= read -r target; do',
+        '        SELECTED_TARGETS+=("$target")',
+        '    done < <(' + select_python + ')',
+        '    if [[ ${#SELECTED_TARGETS[@]} -gt 0 ]]; then',
+        '        TEST_TARGETS=("${SELECTED_TARGETS[@]}")',
+        '    else',
+        '        echo "Changes are not covered by the test selection map, running all tests"',
+        '    fi',
+        'fi',
+        'echo "TEST_TARGETS=${TEST_TARGETS[*]}"',
+    ]
+    record_commands = [
+        'if [[ "$TEST_SELECTION_RECORD" == "true" ]]; then',
+        '    ' + record_python,
+        'fi',
+    ]
+    return {
+        'setup_commands': setup_commands,
+        'select_commands': select_commands,
+        'record_commands': record_commands,
+    }
+
+
+def docs_ci_enabled(self):
+    """
+    Resolve the ``docs_ci`` option. In "auto" mode the docs job is only
+    added when the repo has a sphinx ``conf.py`` and docs requirements,
+    either on disk or generated by xcookie (not listed in ``skip_autogen``).
+
+    Example:
+        >>> from xcookie.builders.common_ci import *  # NOQA
+        >>> from xcookie.main import XCookieConfig, TemplateApplier
+        >>> import tempfile
+        >>> repodir = tempfile.mkdtemp()
+        >>> config = XCookieConfig(tags=['purepy'], repo_name='demo', repodir=repodir)
+        >>> docs_ci_enabled(TemplateApplier(config))
+        True
+        >>> config['skip_autogen'] = ['docs/source/conf.py']
+        >>> docs_ci_enabled(TemplateApplier(config))
+        False
+    """
+    value = self.config['docs_ci']
+    if value != 'auto':
+        return bool(value)
+    skipped = {os.fspath(p) for p in (self.config['skip_autogen'] or [])}
+
+    def _present(rel_fpath):
+        return rel_fpath not in skipped or (self.repodir / rel_fpath).exists()
+
+    if not _present('docs/source/conf.py'):
+        return False
+    if self.config['use_pyproject_requirements']:
+        return True
+    return _present('requirements/docs.txt')
+
+
+def make_docs_build_parts(self):
+    """
+    Shell snippets for the docs job.
+
+    The providers cache the Sphinx environment (``docs/build/doctrees``)
+    and the intersphinx inventory mirror (``.cache/intersphinx``) keyed on
+    the docs requirements. A fresh checkout gives every file a new mtime, so
+    before building, sources that did not change since the commit recorded
+    in the cached environment are backdated and Sphinx only rereads the rest.
+    The build itself runs offline against the inventory mirror.
+
+    Returns:
+        Dict[str, Any]: ``requirement_fpaths`` to key the cache on,
+        ``cache_paths``, and the ``install_commands``, ``prepare_commands``,
+        ``build_commands`` to run from the repo root.
+
+    Example:
+        >>> from xcookie.builders.common_ci import *  # NOQA
+        >>> from xcookie.main import XCookieConfig, TemplateApplier
+        >>> config = XCookieConfig(tags=['purepy'], repo_name='demo')
+        >>> self = TemplateApplier(config)
+        >>> parts = make_docs_build_parts(self)
+        >>> parts['requirement_fpaths']
+        ['requirements/docs.txt']
+        >>> assert any('-d docs/build/doctrees' in c for c in parts['build_commands'])
+    """
+    source_paths = f'docs/source {self.rel_mod_dpath.as_posix()}'
+    commit_fpath = 'docs/build/doctrees/.source-commit'
+    if self.config['use_pyproject_requirements']:
+        requirement_fpaths = ['pyproject.toml']
+        install_commands = [
+            f'{self.UPDATE_PIP}',
+            f'{self.PIP_INSTALL} -e ".[docs]"',
+        ]
+    else:
+        requirement_fpaths = ['requirements/docs.txt']
+        if 'cv2' in self.tags:
+            requirement_fpaths.insert(0, 'requirements/headless.txt')
+        if 'gdal' in self.tags:
+            requirement_fpaths.insert(0, 'requirements/gdal.txt')
+        install_commands = [
+            f'{self.UPDATE_PIP}',
+            f'{self.PIP_INSTALL} '
+            + ' '.join(f'-r {fpath}' for fpath in requirement_fpaths),
+            f'{self.PIP_INSTALL} -e .',
+        ]
+    prepare_commands = [
+        ub.codeblock(
+            f"""
+            if [ -f {commit_fpath} ]; then
+                CACHED_COMMIT=$(cat {commit_fpath})
+                git fetch --quiet --depth=1 origin "$CACHED_COMMIT" || true
+                if git cat-file -e "$CACHED_COMMIT^{{commit}}"; then
+                    # Backdate sources unchanged since the cached build
+                    git ls-files -z -- {source_paths} | xargs -0 -r touch -t 200001010000
+                    git diff --name-only -z "$CACHED_COMMIT" HEAD -- {source_paths} | xargs -0 -r touch
+                fi
+            fi
+            """
+        ),
+        # A site that is down leaves its entry out of the offline build.
+        'python docs/source/conf.py --fetch-intersphinx || true',
+    ]
+    build_commands = [
+        'XCOOKIE_DOCS_OFFLINE=1 python -m sphinx -j auto -b html '
+        '-d docs/build/doctrees docs/source docs/build/html',
+        f'git rev-parse HEAD > {commit_fpath}',
+    ]
+    return {
+        'requirement_fpaths': requirement_fpaths,
+        'cache_paths': ['docs/build/doctrees', '.cache/intersphinx'],
+        'install_commands': install_commands,
+        'prepare_commands': prepare_commands,
+        'build_commands': build_commands,
+    }
+
+
 def get_supported_platform_info(self):
     """
     CommandLine:
@@ -396,32 +745,42 @@ def get_supported_platform_info(self):
         >>> supported_platform_info = get_supported_platform_info(self)
         >>> import ubelt as ub
         >>> print(f'supported_platform_info = {ub.urepr(supported_platform_info, nl=2)}')
+        >>> assert get_supported_platform_info(self) == supported_platform_info
+    """
+    # Computed once per resolved snapshot; callers get their own copy.
+    return copy.deepcopy(self.resolved.platform_info)
+
+
+def build_supported_platform_info(resolved):
+    """
+    Compute the CI platform info for a
+    :class:`xcookie.resolved_config.ResolvedXCookieConfig`.
     """
     os_list = []
 
     # TODO: maybe allow pinning, or list out what the options are
     # https://docs.github.com/en/actions/using-github-hosted-runners/about-github-hosted-runners/about-github-hosted-runners#standard-github-hosted-runners-for-public-repositories
     # I think this only matters for github?
-    if 'linux' in self.config['os']:
+    if 'linux' in resolved.os:
         os_list.append('ubuntu-latest')
-    if 'osx' in self.config['os']:
+    if 'osx' in resolved.os:
         os_list.append('macOS-latest')
-    if 'win' in self.config['os']:
+    if 'win' in resolved.os:
         os_list.append('windows-latest')
         # os_list.append('windows-11-arm')
 
-    if 'binpy-ubuntu-arm' in self.config['tags']:
+    if 'binpy-ubuntu-arm' in resolved.tag_set:
         # From TTsangSC:
         # Overhead of building ARM wheels on Intel Linux nodes is unreasonably high
         # (20s build time per wheel vs 3m); it's better to just spin another runner
         # up to build them natively
         os_list.append('ubuntu-24.04-arm')
 
-    cpython_versions = self.config['ci_cpython_versions']
-    pypy_versions = [f'pypy-{v}' for v in self.config['ci_pypy_versions']]
+    cpython_versions = resolved.ci_cpython_versions
+    pypy_versions = [f'pypy-{v}' for v in resolved.ci_pypy_versions]
     # 3.4 is broken on github actions it seems
     cpython_versions_non34 = [v for v in cpython_versions if v != '3.4']
-    supported_py_versions = self.config['supported_python_versions']
+    supported_py_versions = resolved.supported_python_versions
     if len(supported_py_versions) == 0:
         raise Exception('no supported python versions?')
 
@@ -435,8 +794,8 @@ def get_supported_platform_info(self):
         parts = [p for p in str(pyver).split('.') if p.isdigit()]
         return tuple(int(p) for p in parts[:2])
 
-    if 'binpy' in self.config['tags']:
-        min_py = _parse_pyver_tuple(self.config['min_python'])
+    if 'binpy' in resolved.tag_set:
+        min_py = _parse_pyver_tuple(resolved.min_python)
         if min_py < (3, 9):
             raise ValueError(
                 'xcookie does not support generating binpy workflows for Python < 3.9. '
@@ -455,7 +814,7 @@ def get_supported_platform_info(self):
 
     # Choose which Python version will be the "main" one we use for version
     # agnostic jobs.
-    main_python_version = self.config['main_python']
+    main_python_version = resolved.main_python
     if main_python_version == 'max':
         # import kwutil
         for pyver in supported_py_versions[::-1]:
@@ -485,14 +844,8 @@ def get_supported_platform_info(self):
             cpython_versions_non34_non_prerelease_.append(pyver)
     cpython_versions_non34 = cpython_versions_non34_
 
-    extras_versions_templates = {
-        'full-loose': self.config['ci_versions_full_loose'],
-        'full-strict': self.config['ci_versions_full_strict'],
-        'minimal-loose': self.config['ci_versions_minimal_loose'],
-        'minimal-strict': self.config['ci_versions_minimal_strict'],
-    }
     extras_versions = {}
-    for k, v in extras_versions_templates.items():
+    for k, v in resolved.ci_extra_version_specs:
         if v == '' or v is None:
             v = []
         elif v == 'min':
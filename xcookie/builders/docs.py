@@ -2,6 +2,8 @@
 Template code for building docs including conf.py
 """
 
+from dataclasses import dataclass, field
+
 import ubelt as ub
 
 
@@ -28,22 +30,34 @@ class DocsBuilder:
         # return docs_builder.docs_dpath / 'source'
         return docs_builder.docs_dpath / 'source/auto'
 
-    def sphinx_apidoc_invocation(docs_builder, shrinkuser=False):
+    @property
+    def mod_abspath(docs_builder):
+        repodir = ub.Path(docs_builder.config['repodir']).absolute()
+        rel_mod_dpath = (
+            ub.Path(docs_builder.config['rel_mod_parent_dpath'])
+            / docs_builder.config['mod_name']
+        )
+        return repodir / rel_mod_dpath
+
+    def sphinx_apidoc_invocation(
+        docs_builder, shrinkuser=False, output_dir=None
+    ):
         """
         Instructions to invoke sphinx-apidoc.
         Xcookie calls this, but also writes it to the conf.py docstring for
         transparency.
+
+        Args:
+            output_dir (PathLike | None):
+                write the stubs here instead of :attr:`docs_auto_outdir`.
         """
-        repodir = ub.Path(docs_builder.config['repodir']).absolute()
         docs_outdir = docs_builder.docs_auto_outdir
+        if output_dir is not None:
+            docs_outdir = ub.Path(output_dir)
+        mod_abspath = docs_builder.mod_abspath
         if shrinkuser:
-            repodir = repodir.shrinkuser()
             docs_outdir = docs_outdir.shrinkuser()
-        rel_mod_dpath = (
-            ub.Path(docs_builder.config['rel_mod_parent_dpath'])
-            / docs_builder.config['mod_name']
-        )
-        mod_abspath = repodir / rel_mod_dpath
+            mod_abspath = mod_abspath.shrinkuser()
 
         exclude_pattern = None
         if docs_builder.config['mod_name'] in {'mkinit', 'xdoctest'}:
@@ -56,6 +70,142 @@ class DocsBuilder:
             invocation = f"sphinx-apidoc --private --separate --force --output-dir {docs_outdir} {mod_abspath} '{exclude_pattern}'"
         return invocation
 
+    def module_index(docs_builder):
+        """
+        Map each python module under the package to a hash of its contents.
+
+        Returns:
+            Dict[str, str]: posix paths relative to the package parent
+        """
+        import hashlib
+
+        mod_abspath = docs_builder.mod_abspath
+        parent = mod_abspath.parent
+        index = {}
+        for fpath in sorted(mod_abspath.rglob('*.py')):
+            rel = fpath.relative_to(parent).as_posix()
+            index[rel] = hashlib.sha1(fpath.read_bytes()).hexdigest()
+        return index
+
+    def default_apidoc_index_fpath(docs_builder):
+        """Per-repo cache file recording the last incremental apidoc run."""
+        outdir = docs_builder.docs_auto_outdir.resolve()
+        key = ub.hash_data(str(outdir), hasher='sha1')[0:16]
+        return (
+            ub.Path.appdir('xcookie', 'apidoc_index', type='cache')
+            / f'{key}.json'
+        )
+
+    def refresh_apidoc_stubs(docs_builder, index_fpath=None, verbose=0):
+        """
+        Incrementally update the sphinx-apidoc stubs in :attr:`docs_auto_outdir`.
+
+        Stubs only depend on which modules exist, so sphinx-apidoc is skipped
+        when the module index has the same modules as the last run and its
+        stubs are still on disk. Otherwise it renders into a temporary
+        directory and only stubs whose text differs are written. Stubs for
+        modules that no longer exist are deleted. Unchanged stubs keep their
+        mtime, so Sphinx does not reread them.
+
+        Args:
+            index_fpath (PathLike | None):
+                where the module index is stored between runs. Defaults to
+                :meth:`default_apidoc_index_fpath`.
+
+        Returns:
+            ApidocRefresh: the stubs that were written or deleted
+        """
+        import json
+        import tempfile
+
+        if index_fpath is None:
+            index_fpath = docs_builder.default_apidoc_index_fpath()
+        index_fpath = ub.Path(index_fpath)
+        outdir = docs_builder.docs_auto_outdir
+
+        modules = docs_builder.module_index()
+        try:
+            previous = json.loads(index_fpath.read_text())
+            prev_modules = previous['modules']
+            prev_stubs = previous['stubs']
+        except (OSError, ValueError, KeyError, TypeError):
+            prev_modules, prev_stubs = None, []
+
+        result = ApidocRefresh(
+            added_modules=sorted(set(modules) - set(prev_modules or ())),
+            removed_modules=sorted(set(prev_modules or ()) - set(modules)),
+        )
+        stubs_present = all((outdir / name).exists() for name in prev_stubs)
+        if (
+            prev_modules is not None
+            and set(prev_modules) == set(modules)
+            and prev_stubs
+            and stubs_present
+        ):
+            result.unchanged = [outdir / name for name in prev_stubs]
+            if prev_modules != modules:
+                index_fpath.write_text(
+                    json.dumps({'modules': modules, 'stubs': prev_stubs})
+                )
+            return result
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_outdir = ub.Path(tmpdir)
+            command = docs_builder.sphinx_apidoc_invocation(
+                output_dir=tmp_outdir
+            )
+            ub.cmd(
+                command,
+                verbose=verbose,
+                check=True,
+                cwd=docs_builder.docs_dpath,
+            )
+            generated = {
+                p.name: p.read_bytes() for p in tmp_outdir.glob('*.rst')
+            }
+
+        outdir.ensuredir()
+        for name, data in sorted(generated.items()):
+            fpath = outdir / name
+            if fpath.exists() and fpath.read_bytes() == data:
+                result.unchanged.append(fpath)
+            else:
+                fpath.write_bytes(data)
+                result.written.append(fpath)
+
+        for fpath in sorted(outdir.glob('*.rst')):
+            if fpath.name in generated:
+                continue
+            if (
+                fpath.name in prev_stubs
+                or '.. automodule::' in fpath.read_text()
+            ):
+                fpath.delete()
+                result.deleted.append(fpath)
+
+        index_fpath.parent.ensuredir()
+        index_fpath.write_text(
+            json.dumps({'modules': modules, 'stubs': sorted(generated)})
+        )
+        return result
+
+
+@dataclass
+class ApidocRefresh:
+    """
+    Outcome of :meth:`DocsBuilder.refresh_apidoc_stubs`.
+    """
+
+    written: list = field(default_factory=list)
+    deleted: list = field(default_factory=list)
+    unchanged: list = field(default_factory=list)
+    added_modules: list = field(default_factory=list)
+    removed_modules: list = field(default_factory=list)
+
+    @property
+    def changed(self):
+        return self.written + self.deleted
+
 
 def build_docs_index(self):
     import ubelt as ub
@@ -183,6 +333,7 @@ def build_docs_conf(self):
             Based on template code in:
                 ~/code/xcookie/xcookie/builders/docs.py
                 ~/code/xcookie/xcookie/rc/conf_ext.py
+                ~/code/xcookie/xcookie/rc/intersphinx_mirror.py
 
             http://docs.readthedocs.io/en/latest/getting_started.html
 
@@ -597,7 +748,7 @@ def build_docs_conf(self):
 
     if self.config.render_doc_images:
         util_text = util_text.replace(
-            'render_doc_images = 0', 'render_doc_images = 1'
+            'RENDER_DOC_IMAGES = 0', 'RENDER_DOC_IMAGES = 1'
         )
 
     if self.config['repo_name'] == 'kwcoco':
@@ -605,7 +756,9 @@ def build_docs_conf(self):
             'HACK_FOR_KWCOCO = 0', 'HACK_FOR_KWCOCO = 1'
         )
 
-    text = text + '\n' + util_text
+    # conf_ext reads intersphinx inventories through the shared mirror code
+    mirror_text = rc.resource_fpath('intersphinx_mirror.py').read_text()
+    text = text + '\n' + mirror_text + '\n\n' + util_text
     from xcookie.util.util_code_format import format_code
 
     text = format_code(text)
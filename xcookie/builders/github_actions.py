@@ -61,6 +61,15 @@ class GitHubActionsRenderer:
         pull_request:
           branches: [ {run_on_branches_str} ]
         """
+        if self.plan.test_selection != 'all':
+            # Pull requests only run affected tests, so periodically run
+            # everything and refresh the cached test selection map.
+            on_lines = ub.codeblock(on_lines) + '\n' + ub.codeblock(
+                """
+                schedule:
+                  - cron: '0 6 * * 1'
+                """
+            )
         concurrency_lines = """
         group: ${{ github.workflow }}-${{ github.ref }}
         # Superseded runs on the same ref are cancelled; deploy-bearing refs
@@ -112,8 +121,12 @@ class GitHubActionsRenderer:
 
 
 def _action_ref(name: str) -> str:
-    """Return the pinned GitHub Action ref for an ``owner/repo`` name."""
-    return f'{name}@{ACTION_VERSIONS[name]}'
+    """
+    Return the pinned GitHub Action ref for an ``owner/repo`` name, or for an
+    action in a subdirectory of one (``owner/repo/path``).
+    """
+    repo = '/'.join(name.split('/')[:2])
+    return f'{name}@{ACTION_VERSIONS[repo]}'
 
 
 def _version_assign_command(applier, varname: str = 'VERSION') -> str:
@@ -273,6 +286,42 @@ class Actions:
             **kwargs,
         )
 
+    @classmethod
+    def cache(cls, *args, **kwargs) -> JSON_Mapping:
+        """
+        References:
+            https://github.com/actions/cache
+        """
+        return cls.action(
+            {'uses': _action_ref('actions/cache')},
+            *args,
+            **kwargs,
+        )
+
+    @classmethod
+    def cache_restore(cls, *args, **kwargs) -> JSON_Mapping:
+        """
+        References:
+            https://github.com/actions/cache/tree/main/restore
+        """
+        return cls.action(
+            {'uses': _action_ref('actions/cache/restore')},
+            *args,
+            **kwargs,
+        )
+
+    @classmethod
+    def cache_save(cls, *args, **kwargs) -> JSON_Mapping:
+        """
+        References:
+            https://github.com/actions/cache/tree/main/save
+        """
+        return cls.action(
+            {'uses': _action_ref('actions/cache/save')},
+            *args,
+            **kwargs,
+        )
+
     @classmethod
     def download_artifact(cls, *args, **kwargs) -> JSON_Mapping:
         return cls.action(
@@ -879,6 +928,19 @@ def _collect_test_jobs(self, plan: CIPlan | None = None) -> tuple[str, Mapping]:
     else:
         raise Exception('Need to specify binpy or purepy in tags')
 
+    if common_ci.docs_ci_enabled(self):
+        jobs['build_docs'] = docs_job(self)
+        jobs['build_docs'].yaml_set_start_comment(
+            ub.codeblock(
+                """
+            ##
+            Build the sphinx docs offline, reusing the cached environment and
+            intersphinx inventories so only changed sources are reread.
+            ##
+            """
+            ),
+            indent=4,
+        )
     return name, jobs
 
 
@@ -1016,6 +1078,67 @@ def lint_job(self, plan: CIPlan | None = None):
     return Yaml.Dict(job)
 
 
+def docs_job(self):
+    supported_platform_info = common_ci.get_supported_platform_info(self)
+    main_python_version = supported_platform_info['main_python_version']
+    docs_parts = common_ci.make_docs_build_parts(self)
+    hash_patterns = ', '.join(
+        repr(fpath) for fpath in docs_parts['requirement_fpaths']
+    )
+    cache_prefix = (
+        f'docs-${{{{ runner.os }}}}-${{{{ hashFiles({hash_patterns}) }}}}-'
+    )
+    cache_with = {
+        'path': '\n'.join(docs_parts['cache_paths']),
+        # Cache keys are immutable, so a re-run saves under a new key.
+        'key': cache_prefix + '${{ github.run_id }}-${{ github.run_attempt }}',
+    }
+    docs_env = {
+        'XCOOKIE_INTERSPHINX_MIRROR': '${{ github.workspace }}/.cache/intersphinx',
+    }
+    job = {
+        'runs-on': 'ubuntu-latest',
+        'steps': [
+            Actions.checkout(),
+            Actions.setup_python(
+                {
+                    'name': f'Set up Python {main_python_version} for docs',
+                    'with': {
+                        'python-version': main_python_version,
+                    },
+                }
+            ),
+            Actions.cache_restore(
+                {
+                    'name': 'Restore sphinx environment and inventories',
+                    'with': {**cache_with, 'restore-keys': cache_prefix},
+                }
+            ),
+            {
+                'name': 'Install docs dependencies',
+                'run': '\n'.join(docs_parts['install_commands']),
+            },
+            {
+                'name': 'Prepare incremental docs build',
+                'env': dict(docs_env),
+                'run': '\n'.join(docs_parts['prepare_commands']),
+            },
+            {
+                'name': 'Build docs',
+                'env': dict(docs_env),
+                'run': '\n'.join(docs_parts['build_commands']),
+            },
+            Actions.cache_save(
+                {
+                    'name': 'Save sphinx environment and inventories',
+                    'with': cache_with,
+                }
+            ),
+        ],
+    }
+    return Yaml.Dict(job)
+
+
 def build_and_test_sdist_job(self, plan: CIPlan | None = None):
     if plan is None:
         plan = common_ci.make_ci_plan(self)
@@ -1798,6 +1921,10 @@ def test_wheels_job(self, needs=None, plan: CIPlan | None = None):
     if common_ci.ci_plan.uses_lockfile_ci(self):
         install_env['USE_UV_LOCK'] = '${{ matrix.use-lockfile }}'
         install_env['LOCK_REQUIREMENTS'] = '${{ matrix.lock-requirements }}'
+    use_uv_sync = ci_model.any_test_case_uses_uv_sync(cases)
+    if use_uv_sync:
+        install_env['INSTALL_ENGINE'] = '${{ matrix.install-engine }}'
+        install_env['UV_CACHE_DIR'] = '${{ github.workspace }}/.cache/uv'
 
     special_install_lines = []
     if any(case.gdal_requirement_txt is not None for case in cases):
@@ -1891,6 +2018,23 @@ def test_wheels_job(self, needs=None, plan: CIPlan | None = None):
             )
         )
 
+    if use_uv_sync:
+        # uv sync links packages out of its cache, so a warm cache makes the
+        # locked install mostly a copy.
+        action_steps.append(
+            Actions.cache(
+                {
+                    'name': 'Cache uv packages',
+                    'if': "matrix.install-engine == 'uv-sync'",
+                    'with': {
+                        'path': '.cache/uv',
+                        'key': "uv-${{ runner.os }}-${{ matrix.python-version }}-${{ hashFiles('uv.lock') }}",
+                        'restore-keys': 'uv-${{ runner.os }}-${{ matrix.python-version }}-',
+                    },
+                }
+            )
+        )
+
     action_steps.append(
         Actions.action(
             {
@@ -1949,10 +2093,32 @@ def test_wheels_job(self, needs=None, plan: CIPlan | None = None):
     test_env = {
         'CI_PYTHON_VERSION': 'py${{ matrix.python-version }}',
     }
+    use_test_selection = plan.test_selection != 'all'
     user_test_env = kwutil.Yaml.coerce(self.config.test_env, backend='pyyaml')
     if user_test_env:
         test_env.update(user_test_env)
 
+    if use_test_selection:
+        # The map is keyed per matrix cell and refreshed by every full run;
+        # pull requests restore the newest one from the default branch.
+        selection_cache_prefix = 'test-selection-${{ matrix.os }}-${{ matrix.arch }}-${{ matrix.python-version }}-${{ matrix.install-extras }}-'
+        # Cache keys are immutable, so a re-run saves under a new key.
+        selection_cache_key = (
+            selection_cache_prefix + '${{ github.run_id }}-${{ github.run_attempt }}'
+        )
+        action_steps.append(
+            Actions.cache_restore(
+                {
+                    'name': 'Restore test selection map',
+                    'with': {
+                        'path': '.cache/test-selection',
+                        'key': selection_cache_key,
+                        'restore-keys': selection_cache_prefix,
+                    },
+                }
+            )
+        )
+
     action_steps.append(
         Actions.action(
             {
@@ -1963,6 +2129,19 @@ def test_wheels_job(self, needs=None, plan: CIPlan | None = None):
             }
         )
     )
+    if use_test_selection:
+        action_steps.append(
+            Actions.cache_save(
+                {
+                    'name': 'Save test selection map',
+                    'if': "github.event_name != 'pull_request'",
+                    'with': {
+                        'path': '.cache/test-selection',
+                        'key': selection_cache_key,
+                    },
+                }
+            )
+        )
     if WITH_COVERAGE:
         action_steps += [
             Actions.combine_coverage(),
@@ -112,10 +112,10 @@ def build_gitlab_rules(self):
 #         pass
 
 
-def workflow_section():
+def workflow_section(allow_schedule=False):
     from xcookie.util_yaml import Yaml
 
-    return Yaml.loads(
+    section = Yaml.loads(
         ub.codeblock(
             """
         rules:
@@ -130,6 +130,27 @@ def workflow_section():
         """
         )
     )
+    if allow_schedule:
+        # Scheduled pipelines run the full test suite and refresh the
+        # test selection map used by merge requests.
+        section['rules'].append({'if': '$CI_PIPELINE_SOURCE == "schedule"'})
+    return section
+
+
+def _test_selection_cache():
+    """
+    Caches for test jobs when ``ci_test_selection`` narrows merge requests.
+
+    Keeps the shared pip / uv cache and adds a per-job cache holding the
+    test selection map written by full runs.
+    """
+    return [
+        {'paths': ['.cache/pip', '.cache/uv']},
+        {
+            'key': 'test-selection-$CI_JOB_NAME_SLUG',
+            'paths': ['.cache/test-selection'],
+        },
+    ]
 
 
 def make_purepy_ci_jobs(self, plan: CIPlan | None = None):
@@ -144,7 +165,9 @@ def make_purepy_ci_jobs(self, plan: CIPlan | None = None):
 
     body = CommentedMap()
 
-    body['workflow'] = workflow_section()
+    body['workflow'] = workflow_section(
+        allow_schedule=plan.test_selection != 'all'
+    )
 
     enable_lint = self.config.linter
 
@@ -259,6 +282,8 @@ def make_purepy_ci_jobs(self, plan: CIPlan | None = None):
         'except': {'refs': ['release']},
     }
 
+    if plan.test_selection != 'all':
+        common_test_template['cache'] = _test_selection_cache()
     common_test_template = CommentedMap(common_test_template)
     common_test_template.yaml_set_anchor('common_test_template')
     _add_yaml_merge(common_test_template, common_template)
@@ -307,6 +332,10 @@ def make_purepy_ci_jobs(self, plan: CIPlan | None = None):
             test_steps.append(
                 f'export LOCK_REQUIREMENTS="{lock_requirements}"'
             )
+            if case.install_engine != 'pip':
+                test_steps.append(
+                    f'export INSTALL_ENGINE="{case.install_engine}"'
+                )
         test_steps += install_and_test_wheel_parts['install_wheel_commands']
         test_steps += install_and_test_wheel_parts['test_wheel_commands']
         test = {
@@ -403,6 +432,9 @@ def make_purepy_ci_jobs(self, plan: CIPlan | None = None):
         lint_job = build_lint_job(self, common_template, main_image, plan=plan)
         body['lint'] = lint_job
 
+    if common_ci.docs_ci_enabled(self):
+        body['docs'] = build_docs_job(self, common_template, main_image)
+
     if enable_gpg:
         gpgsign_job = build_gpg_job(
             self, common_template, main_image, wheelhouse_dpath
@@ -456,7 +488,9 @@ def make_binpy_ci_jobs(self, plan: CIPlan | None = None):
 
     body = CommentedMap()
 
-    body['workflow'] = workflow_section()
+    body['workflow'] = workflow_section(
+        allow_schedule=plan.test_selection != 'all'
+    )
 
     stages = ['build', 'test']
     if enable_gpg:
@@ -575,6 +609,8 @@ def make_binpy_ci_jobs(self, plan: CIPlan | None = None):
         'coverage': '/TOTAL.+ ([0-9]{1,3}%)/',
         'except': {'refs': ['release']},
     }
+    if plan.test_selection != 'all':
+        common_test_template['cache'] = _test_selection_cache()
     common_test_template = CommentedMap(common_test_template)
     common_test_template.yaml_set_anchor('common_test_template')
     _add_yaml_merge(common_test_template, common_template)
@@ -620,6 +656,10 @@ def make_binpy_ci_jobs(self, plan: CIPlan | None = None):
             test_steps.append(
                 f'export LOCK_REQUIREMENTS="{lock_requirements}"'
             )
+            if case.install_engine != 'pip':
+                test_steps.append(
+                    f'export INSTALL_ENGINE="{case.install_engine}"'
+                )
         test_steps += install_and_test_wheel_parts['install_wheel_commands']
         test_steps += install_and_test_wheel_parts['test_wheel_commands']
         test = {
@@ -703,6 +743,9 @@ def make_binpy_ci_jobs(self, plan: CIPlan | None = None):
 
     body.update(jobs)
 
+    if common_ci.docs_ci_enabled(self):
+        body['docs'] = build_docs_job(self, common_template, main_image)
+
     if enable_gpg:
         gpgsign_job = build_gpg_job(
             self, common_template, main_image, wheelhouse_dpath
@@ -787,6 +830,46 @@ def build_lint_job(self, common_template, deploy_image, plan: CIPlan | None = No
     return lint_job
 
 
+def build_docs_job(self, common_template, image):
+    """
+    Build the sphinx docs offline, reusing the cached environment and
+    intersphinx inventories so only changed sources are reread.
+    """
+    from ruamel.yaml.comments import CommentedMap
+
+    docs_parts = common_ci.make_docs_build_parts(self)
+    variables = dict(common_template['variables'])
+    variables['XCOOKIE_INTERSPHINX_MIRROR'] = (
+        '$CI_PROJECT_DIR/.cache/intersphinx'
+    )
+    docs_job = CommentedMap(
+        {
+            'image': image,
+            'stage': 'test',
+            'needs': [],
+            'variables': variables,
+            'cache': [
+                {'paths': ['.cache/pip', '.cache/uv']},
+                {
+                    # GitLab keys a cache on at most two files
+                    'key': {
+                        'files': docs_parts['requirement_fpaths'][-2:],
+                        'prefix': 'docs',
+                    },
+                    'paths': docs_parts['cache_paths'],
+                },
+            ],
+            'script': (
+                docs_parts['install_commands']
+                + docs_parts['prepare_commands']
+                + docs_parts['build_commands']
+            ),
+        }
+    )
+    _add_yaml_merge(docs_job, common_template)
+    return docs_job
+
+
 def build_gpg_job(self, common_template, deploy_image, wheelhouse_dpath):
     # import ruamel.yaml
     from ruamel.yaml.comments import CommentedMap
@@ -203,13 +203,9 @@ def build_pyproject(self):
             ub.oset(build_system_requires)
         )
 
-        supported_cp_version = []
-        for pyver in self.config['supported_python_versions']:
-            supported_cp_version.append('cp' + pyver.replace('.', ''))
-
-        wheel_build_patterns = []
-        for cpver in supported_cp_version:
-            wheel_build_patterns.append(cpver + '-*')
+        wheel_build_patterns = [
+            cpver + '-*' for cpver in self.resolved.cpython_wheel_tags
+        ]
 
         test_extras = ['tests-strict', 'runtime-strict']
         if 'cv2' in self.config['tags']:
@@ -217,12 +213,13 @@ def build_pyproject(self):
 
         skip_tokens = ['pp*', '*-musllinux_*']
         if 'win' in self.config['os']:
-            for pyver in self.config['supported_python_versions']:
+            resolved = self.resolved
+            for pyver, cpver in zip(
+                resolved.supported_python_versions, resolved.cpython_wheel_tags
+            ):
                 pyver_parts = tuple(int(p) for p in str(pyver).split('.')[:2])
                 if pyver_parts < (3, 11):
-                    skip_tokens.append(
-                        'cp' + str(pyver).replace('.', '') + '-win_arm64'
-                    )
+                    skip_tokens.append(cpver + '-win_arm64')
 
         pyproj_config['tool']['cibuildwheel'].update(
             {
@@ -27,6 +27,11 @@ def build_readthedocs(self):
           os: "ubuntu-24.04"
           tools:
             python: "3.13"
+          jobs:
+            build:
+              html:
+                # The default html build, but with one sphinx worker per CPU
+                - python -m sphinx -T -j auto -b html -d _build/doctrees -D language=en docs/source $READTHEDOCS_OUTPUT/html
 
         # Build documentation in the docs/ directory with Sphinx
         sphinx:
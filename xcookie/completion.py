@@ -0,0 +1,206 @@
+r"""
+Shell completion without importing the generator stack.
+
+Completing ``xcookie --<TAB>`` only needs option names and tag names, but
+:func:`xcookie.main.main` imports kwconf, xdev, toml, packaging, and the
+template builders before argcomplete gets a chance to answer. This module
+serves completions from a static table instead, so :mod:`xcookie.__main__`
+can answer a completion request and exit before ``xcookie.main`` is imported.
+
+The table mirrors the argparse actions of :class:`xcookie.main.XCookieConfig`
+and is checked against them by ``tests/test_completion.py``. After changing
+the config options or the documented tags, regenerate it with:
+
+CommandLine:
+    python -m xcookie.completion
+
+Example:
+    >>> from xcookie import completion
+    >>> parser = completion.build_parser()
+    >>> '--repo-name' in parser._option_string_actions
+    True
+    >>> completion._complete_tags('erotemic,bi')
+    ['erotemic,binpy']
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any
+
+#: ``(dest, option_strings, nargs)`` for each ``XCookieConfig`` argparse
+#: action. An empty ``option_strings`` marks a positional argument.
+OPTIONS: tuple[tuple[str, tuple[str, ...], str | None], ...] = (
+    ('repodir', (), None),
+    ('repodir', ('--repodir',), None),
+    ('repo_name', ('--repo_name', '--repo-name'), None),
+    ('mod_name', ('--mod_name', '--mod-name'), None),
+    ('pkg_name', ('--pkg_name', '--pkg-name'), None),
+    ('rel_mod_parent_dpath', ('--rel_mod_parent_dpath', '--rel-mod-parent-dpath'), None),
+    ('rotate_secrets', ('--rotate_secrets', '--no-rotate_secrets', '--rotate-secrets', '--no-rotate-secrets'), '?'),
+    ('refresh_docs', ('--refresh_docs', '--no-refresh_docs', '--refresh-docs', '--no-refresh-docs'), '?'),
+    ('deploy', ('--deploy', '--no-deploy'), '?'),
+    ('deploy_pypi', ('--deploy_pypi', '--no-deploy_pypi', '--deploy-pypi', '--no-deploy-pypi'), '?'),
+    ('deploy_tags', ('--deploy_tags', '--no-deploy_tags', '--deploy-tags', '--no-deploy-tags'), '?'),
+    ('deploy_artifacts', ('--deploy_artifacts', '--no-deploy_artifacts', '--deploy-artifacts', '--no-deploy-artifacts'), '?'),
+    ('deploy_gitlab', ('--deploy_gitlab', '--no-deploy_gitlab', '--deploy-gitlab', '--no-deploy-gitlab'), '?'),
+    ('os', ('--os',), None),
+    ('is_new', ('--is_new', '--is-new'), None),
+    ('init_new_remotes', ('--init_new_remotes', '--init-new-remotes'), None),
+    ('min_python', ('--min_python', '--min-python'), None),
+    ('max_python', ('--max_python', '--max-python'), None),
+    ('main_python', ('--main_python', '--main-python'), None),
+    ('typed', ('--typed',), None),
+    ('supported_python_versions', ('--supported_python_versions', '--supported-python-versions'), None),
+    ('ci_cpython_versions', ('--ci_cpython_versions', '--ci-cpython-versions'), None),
+    ('ci_pypy_versions', ('--ci_pypy_versions', '--ci-pypy-versions'), None),
+    ('ci_blocklist', ('--ci_blocklist', '--ci-blocklist'), None),
+    ('ci_versions_minimal_strict', ('--ci_versions_minimal_strict', '--ci-versions-minimal-strict'), None),
+    ('ci_versions_full_strict', ('--ci_versions_full_strict', '--ci-versions-full-strict'), None),
+    ('ci_versions_minimal_loose', ('--ci_versions_minimal_loose', '--ci-versions-minimal-loose'), None),
+    ('ci_versions_full_loose', ('--ci_versions_full_loose', '--ci-versions-full-loose'), None),
+    ('remote_host', ('--remote_host', '--remote-host'), None),
+    ('remote_group', ('--remote_group', '--remote-group'), None),
+    ('autostage', ('--autostage',), None),
+    ('visibility', ('--visibility',), None),
+    ('test_env', ('--test_env', '--test-env'), None),
+    ('version', ('--version',), None),
+    ('url', ('--url',), None),
+    ('author', ('--author',), None),
+    ('author_email', ('--author_email', '--author-email'), None),
+    ('description', ('--description',), None),
+    ('license', ('--license',), None),
+    ('dev_status', ('--dev_status', '--dev-status'), None),
+    ('enable_gpg', ('--enable_gpg', '--enable-gpg'), None),
+    ('ci_gpg_secret_transport', ('--ci_gpg_secret_transport', '--ci-gpg-secret-transport'), None),
+    ('defaultbranch', ('--defaultbranch',), None),
+    ('xdoctest_style', ('--xdoctest_style', '--xdoctest-style'), None),
+    ('test_command', ('--test_command', '--test-command'), None),
+    ('ci_test_selection', ('--ci_test_selection', '--ci-test-selection'), None),
+    ('ci_pypi_live_password_varname', ('--ci_pypi_live_password_varname', '--ci-pypi-live-password-varname'), None),
+    ('ci_pypi_test_password_varname', ('--ci_pypi_test_password_varname', '--ci-pypi-test-password-varname'), None),
+    ('ci_pypi_trusted_publishing', ('--ci_pypi_trusted_publishing', '--ci-pypi-trusted-publishing'), None),
+    ('regen', ('--regen',), None),
+    ('only_generate', ('--only_generate', '--only_gen', '--only-gen', '--only-generate'), None),
+    ('check', ('--check', '--no-check'), '?'),
+    ('plan_out', ('--plan_out', '--plan-out'), None),
+    ('plan_in', ('--plan_in', '--plan-in'), None),
+    ('tags', ('--tags',), '*'),
+    ('linter', ('--linter',), None),
+    ('docs_ci', ('--docs_ci', '--docs-ci'), None),
+    ('skip_autogen', ('--skip_autogen', '--skip-autogen'), None),
+    ('render_doc_images', ('--render_doc_images', '--render-doc-images'), None),
+    ('test_variants', ('--test_variants', '--test-variants'), None),
+    ('ci_versionless_wheels', ('--ci_versionless_wheels', '--no-ci_versionless_wheels', '--ci-versionless-wheels', '--no-ci-versionless-wheels'), '?'),
+    ('ci_extras', ('--ci_extras', '--ci-extras'), None),
+    ('ci_install_engine', ('--ci_install_engine', '--ci-install-engine'), None),
+    ('use_vcs', ('--use_vcs', '--use-vcs'), None),
+    ('use_uv', ('--use_uv', '--use-uv'), None),
+    ('uv_exclude_newer', ('--uv_exclude_newer', '--uv-exclude-newer'), None),
+    ('use_pyproject_requirements', ('--use_pyproject_requirements', '--use-pyproject-requirements'), None),
+    ('use_setup_py', ('--use_setup_py', '--use-setup-py'), None),
+    ('interactive', ('--interactive',), None),
+    ('yes', ('--yes',), None),
+)  # fmt: skip
+
+#: Tags documented in the ``tags`` option help plus the host tags that
+#: templates are gated on.
+KNOWN_TAGS: tuple[str, ...] = (
+    'binpy',
+    'ci_debug_windows_env',
+    'cv2',
+    'erotemic',
+    'gdal',
+    'github',
+    'gitlab',
+    'kitware',
+    'notypes',
+    'opencv_link',
+    'postgresql',
+    'purepy',
+    'pyutils',
+    'vcpkg',
+    'win_smoke',
+    'windows_smoke',
+)
+
+#: Tags implied by ``remote_host`` rather than listed in the ``tags`` help.
+HOST_TAGS: tuple[str, ...] = ('github', 'gitlab')
+
+#: The first positional word may be the ``xcookie check``,
+#: ``xcookie docs-inventories`` or ``xcookie provision`` subcommand.
+SUBCOMMANDS: tuple[str, ...] = ('check', 'docs-inventories', 'provision')
+
+
+def _complete_tags(prefix: str, **kwargs: Any) -> list[str]:
+    """Complete the last entry of a comma separated tag list."""
+    head, sep, last = prefix.rpartition(',')
+    return [head + sep + tag for tag in KNOWN_TAGS if tag.startswith(last)]
+
+
+def _complete_repodir(prefix: str, **kwargs: Any) -> list[str]:
+    import argcomplete
+
+    words = [word for word in SUBCOMMANDS if word.startswith(prefix)]
+    return words + list(argcomplete.completers.DirectoriesCompleter()(prefix))
+
+
+def build_parser():
+    """Build a lightweight parser from :data:`OPTIONS` for argcomplete."""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='xcookie')
+    for dest, option_strings, nargs in OPTIONS:
+        if option_strings:
+            action = parser.add_argument(*option_strings, dest=dest, nargs=nargs)
+        else:
+            action = parser.add_argument(dest, nargs='?')
+            action.completer = _complete_repodir  # type: ignore[attr-defined]
+        if dest == 'tags':
+            action.completer = _complete_tags  # type: ignore[attr-defined]
+    return parser
+
+
+def autocomplete() -> None:
+    """Answer a pending argcomplete request and exit, otherwise do nothing."""
+    if '_ARGCOMPLETE' not in os.environ:
+        return
+    try:
+        import argcomplete
+    except ImportError:
+        return
+    argcomplete.autocomplete(build_parser())
+
+
+def derive_options() -> tuple[tuple[str, tuple[str, ...], str | None], ...]:
+    """Compute :data:`OPTIONS` from the real ``XCookieConfig`` parser."""
+    from xcookie.main import XCookieConfig
+
+    parser = XCookieConfig().argparse()
+    return tuple(
+        (action.dest, tuple(action.option_strings), action.nargs)
+        for action in parser._actions
+        if action.dest != 'help'
+    )
+
+
+def derive_known_tags() -> tuple[str, ...]:
+    """Compute :data:`KNOWN_TAGS` from the ``tags`` option help text."""
+    import re
+
+    from xcookie.main import XCookieConfig
+
+    help_text = XCookieConfig.__default__['tags'].help
+    documented = re.findall(r'"([\w-]+)"', help_text)
+    return tuple(sorted(set(documented) | set(HOST_TAGS)))
+
+
+if __name__ == '__main__':
+    print('OPTIONS = (')
+    for row in derive_options():
+        print(f'    {row!r},')
+    print(')')
+    print('KNOWN_TAGS = (')
+    for tag in derive_known_tags():
+        print(f'    {tag!r},')
+    print(')')
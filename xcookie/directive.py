@@ -346,14 +346,100 @@ class DirectiveExtractor:
             '|'.join(directive_patterns), flags=re.IGNORECASE
         )
         self.directive_re = directive_re
+        # The directive regex is case insensitive, so is the prefilter.
+        self._prefilter = namespace.lower()
+        # One directive such as ``+COMMENT_IF(cv2)`` with spaces removed.
+        self._simple_opt_re = re.compile(
+            r'([+-]?)('
+            + '|'.join(re.escape(c) for c in commands)
+            + r')(?:\(([^()]*)\))?',
+            flags=re.IGNORECASE,
+        )
+
+    def may_contain(self, text):
+        """
+        Cheap check that is False when ``text`` cannot contain a directive.
+        """
+        return self._prefilter in text.lower()
 
     def extract(self, text):
+        """
+        Example:
+            >>> from xcookie.directive import *  # NOQA
+            >>> self = DirectiveExtractor('xcookie', ['UNCOMMENT_IF', 'COMMENT_IF'])
+            >>> self.extract('plain: line')
+            []
+            >>> [str(d) for d in self.extract('- run  # xcookie: +COMMENT_IF(cv2, gdal)')]
+            ['<Directive(+COMMENT_IF(cv2, gdal))>']
+            >>> [str(d) for d in self.extract('- pip "x"  # xcookie: -UNCOMMENT_IF(cv2)')]
+            ['<Directive(-UNCOMMENT_IF(cv2))>']
+        """
+        if not self.may_contain(text):
+            return []
+        comment = _unquoted_last_comment(text)
+        if comment is None:
+            # Quotes or continuations: only the tokenizer can tell what is a
+            # comment.
+            return self._extract_tokenized(text)
+        if comment == '':
+            return []
+        m = self.directive_re.match(comment[1:].strip())
+        if not m:
+            return []
+        optstr = m.group('style2')
+        if not optstr:
+            return []
+        inline = not text.strip().startswith('#')
+        simple = self._simple_opt_re.fullmatch(optstr.strip().replace(' ', ''))
+        if simple is None:
+            return [
+                directive
+                for optpart in _split_opstr(optstr)
+                for directive in [
+                    parse_directive_optstr(optpart, self.commands, inline)
+                ]
+                if directive
+            ]
+        sign, name, body = simple.groups()
+        args = [] if body is None else [a.strip() for a in body.split(',')]
+        return [Directive(name.upper(), sign != '-', args, inline)]
+
+    def _extract_tokenized(self, text):
         extracted = list(
             Directive.extract(text, self.directive_re, self.commands)
         )
         return extracted
 
 
+def _unquoted_last_comment(text):
+    """
+    Return the innermost comment of a single line without tokenizing.
+
+    For a line without quotes or backslashes, tokenize treats everything
+    after the first ``#`` as a comment, and :func:`extract_directive_comment`
+    keeps re-extracting until the last ``#``. Returns ``''`` if there is no
+    comment and None if the line needs the tokenizer.
+
+    Example:
+        >>> _unquoted_last_comment('a = 1  # outer # inner')
+        '# inner'
+        >>> _unquoted_last_comment('a = 1')
+        ''
+        >>> print(_unquoted_last_comment('a = "#"  # c'))
+        None
+    """
+    lines = text.splitlines()
+    if len(lines) != 1:
+        return None
+    text = lines[0]
+    if '"' in text or "'" in text or '\\' in text:
+        return None
+    pos = text.rfind('#')
+    if pos < 0:
+        return ''
+    return text[pos:]
+
+
 _MODNAME_EXISTS_CACHE: dict[str, bool] = {}
 
 
@@ -0,0 +1,111 @@
+r"""
+Maintain the shared on-disk mirror of intersphinx inventories.
+
+Generated ``docs/source/conf.py`` files read ``intersphinx_mapping``
+inventories from this mirror when a copy is present and refresh entries that
+are older than the ttl with conditional (``ETag`` / ``Last-Modified``)
+requests, see :mod:`xcookie.rc.intersphinx_mirror`. Running this command
+ahead of time means builds do not wait on the network, and builds with
+``XCOOKIE_DOCS_OFFLINE=1`` work without it.
+
+CommandLine:
+    xcookie docs-inventories
+    xcookie docs-inventories ~/code/kwarray --force
+"""
+
+from __future__ import annotations
+
+import ast
+
+import kwconf
+import ubelt as ub
+
+from xcookie.rc.intersphinx_mirror import (
+    INTERSPHINX_MIRROR_TTL,
+    InventoryMirror,
+)
+
+
+class DocsInventoriesConfig(kwconf.Config):
+    """
+    Refresh the intersphinx inventory mirror for a repo's docs.
+    """
+
+    repodir = kwconf.Value(
+        '.',
+        help='repo whose docs/source/conf.py lists the inventories',
+        position=1,
+    )
+    conf = kwconf.Value(
+        None,
+        help='path to the sphinx conf.py, defaults to docs/source/conf.py in repodir',
+    )
+    dpath = kwconf.Value(
+        None,
+        help=ub.paragraph(
+            """
+            mirror directory, defaults to $XCOOKIE_INTERSPHINX_MIRROR or
+            xcookie/intersphinx in the user cache directory
+            """
+        ),
+    )
+    ttl = kwconf.Value(
+        INTERSPHINX_MIRROR_TTL,
+        type=float,
+        help='seconds after which a mirrored inventory is revalidated',
+    )
+    force = kwconf.Value(
+        False,
+        isflag=True,
+        help='revalidate every inventory regardless of the ttl',
+    )
+    workers = kwconf.Value(8, type=int, help='number of concurrent downloads')
+
+    @classmethod
+    def main(cls, argv=True, **kwargs):
+        config = cls.cli(argv=argv, data=kwargs, strict=True)
+        conf_fpath = config.conf
+        if conf_fpath is None:
+            conf_fpath = ub.Path(config.repodir) / 'docs/source/conf.py'
+        mapping = read_intersphinx_mapping(conf_fpath)
+        mirror = InventoryMirror(config.dpath, ttl=config.ttl)
+        statuses = mirror.refresh_all(
+            mapping, force=config.force, workers=config.workers
+        )
+        print(f'Intersphinx mirror: {mirror.dpath}')
+        print(mirror.format_report(statuses))
+        return statuses, mirror
+
+
+def read_intersphinx_mapping(conf_fpath):
+    """
+    Read the literal ``intersphinx_mapping`` assignment from a sphinx
+    ``conf.py`` without executing it.
+
+    Example:
+        >>> import tempfile
+        >>> fpath = ub.Path(tempfile.mkdtemp()) / 'conf.py'
+        >>> _ = fpath.write_text(ub.codeblock(
+        >>>     '''
+        >>>     import sys
+        >>>     intersphinx_mapping = {
+        >>>         'python': ('https://docs.python.org/3', None),
+        >>>     }
+        >>>     '''))
+        >>> read_intersphinx_mapping(fpath)
+        {'python': ('https://docs.python.org/3', None)}
+    """
+    tree = ast.parse(ub.Path(conf_fpath).read_text())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            getattr(target, 'id', None) == 'intersphinx_mapping'
+            for target in node.targets
+        ):
+            return ast.literal_eval(node.value)
+    raise ValueError(f'No intersphinx_mapping assignment in {conf_fpath}')
+
+
+def main(argv=True):
+    statuses, mirror = DocsInventoriesConfig.main(argv=argv)
+    if mirror.errors:
+        raise SystemExit(1)
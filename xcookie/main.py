@@ -71,29 +71,44 @@ ExampleUsage:
 
 from __future__ import annotations
 
+import contextlib
 import os
 import re
 import shutil
+import sys
 import tempfile
 import warnings
 from collections.abc import MutableMapping, Sequence
-from typing import Any, cast
+from typing import Any
 
 import kwconf
 import toml
 import ubelt as ub
-import xdev
 from packaging.version import parse as Version
 
-from xcookie.patch_plan import PatchPlan, SearchPattern, render_patch_plan
-from xcookie.resolved_config import resolve_xcookie_config
-from xcookie.staging import apply_template_context
+from xcookie.patch_plan import (
+    APPLY_WORKERS,
+    PatchPlan,
+    SearchPattern,
+    content_matches_repo,
+    render_patch_plan,
+)
+from xcookie.resolved_config import (
+    SNAPSHOT_KEYS,
+    ResolvedXCookieConfig,
+    resolve_repodir,
+    resolve_xcookie_config,
+)
+from xcookie.staging import TokenSubstituter, load_compiled_template
 from xcookie.template_registry import (
     TemplateContext,
     TemplateInfo,
+    TemplateRegistry,
     coerce_template_infos,
 )
 from xcookie.util.util_metadata import metadata_text
+from xcookie.vcs import git_meta
+from xcookie.vcs.git_index import GitIndex
 
 
 class SkipFile(Exception):
@@ -115,6 +130,12 @@ class XCookieConfig(kwconf.Config):
 
     # Create a new binary repo
     xcookie --repo_name=cookiecutter_binpy --repodir="$HOME"/code/cookiecutter_binpy --tags="github,binpy,gdal"
+
+    # Refresh the shared intersphinx inventory mirror used by docs builds
+    xcookie docs-inventories --help
+
+    # Create several remote repos (and protected branches) concurrently
+    xcookie provision --help
     """
     __default__ = {
         'repodir': kwconf.Value(
@@ -297,6 +318,21 @@ class XCookieConfig(kwconf.Config):
         'test_command': kwconf.Value(
             'auto', help='The pytest command to run in the CL'
         ),
+        'ci_test_selection': kwconf.Value(
+            'all',
+            help=ub.paragraph(
+                """
+            Which tests the generated CI test jobs run. "all" runs the full
+            suite everywhere. "affected" records a per-test coverage map on
+            full runs (pushes to the default branch and scheduled runs), caches
+            it, and on pull / merge requests only runs the tests that touched
+            the changed files. Changes the map cannot account for fall back to a
+            full run. Requires the "auto" test_command. On GitLab, merge
+            request pipelines can only reuse the map if protected and
+            unprotected branches share caches.
+            """
+            ),
+        ),
         'ci_pypi_live_password_varname': kwconf.Value(
             'TWINE_PASSWORD',
             help='variable of the live twine password in your secrets',
@@ -327,6 +363,37 @@ class XCookieConfig(kwconf.Config):
             """
             ),
         ),
+        'check': kwconf.Value(
+            False,
+            isflag=True,
+            help=ub.paragraph(
+                """
+            if True, render templates in memory, print the paths of missing,
+            dirty, and modified files, and exit nonzero if any file is missing
+            or dirty. Nothing is written. Also available as ``xcookie check``.
+            """
+            ),
+        ),
+        'plan_out': kwconf.Value(
+            None,
+            help=ub.paragraph(
+                """
+            if specified, write the patch plan and its staged contents to this
+            tarball instead of applying it. Use with ``plan_in`` to review a
+            plan and apply it elsewhere without re-rendering.
+            """
+            ),
+        ),
+        'plan_in': kwconf.Value(
+            None,
+            help=ub.paragraph(
+                """
+            if specified, apply a patch plan written by ``plan_out`` to
+            ``repodir`` instead of rendering templates. Refuses to apply if a
+            target file changed since the plan was made.
+            """
+            ),
+        ),
         'tags': kwconf.Value(
             'auto',
             nargs='*',
@@ -353,6 +420,16 @@ class XCookieConfig(kwconf.Config):
         'linter': kwconf.Value(
             True, help=ub.paragraph('if true enables lint checks in CI')
         ),
+        'docs_ci': kwconf.Value(
+            'auto',
+            help=ub.paragraph(
+                '''
+                if true adds a CI job that builds the sphinx docs. If "auto",
+                only when the repo has docs/source/conf.py and docs
+                requirements, existing or generated.
+                '''
+            ),
+        ),
         'skip_autogen': kwconf.Value(
             None,
             help=ub.paragraph(
@@ -400,6 +477,21 @@ class XCookieConfig(kwconf.Config):
             """
             ),
         ),
+        'ci_install_engine': kwconf.Value(
+            'pip',
+            help=ub.paragraph(
+                """
+            How CI test jobs install the wheel and its dependencies for
+            lockfile variants. "pip" installs the wheel with uv pip constrained
+            by requirements/locks/*.txt. "uv-sync" installs the locked
+            dependencies directly from uv.lock with "uv sync --frozen" and
+            installs the wheel on top with --no-deps. A plain engine name
+            applies to the strict variants. A YAML dictionary with the same
+            keys as ci_extras selects per variant, e.g. "full-strict: uv-sync".
+            Only strict variants in lockfile CI mode can use uv-sync.
+            """
+            ),
+        ),
         'use_vcs': kwconf.Value(
             'auto',
             help=ub.paragraph(
@@ -457,7 +549,24 @@ class XCookieConfig(kwconf.Config):
         return description
 
     def __post_init__(self):
-        object.__setattr__(self, 'resolved', resolve_xcookie_config(self))
+        resolve_xcookie_config(self)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self.__dict__.get('_frozen_keys', ()):
+            raise TypeError(
+                f'Cannot set {key!r} after the config was frozen into a '
+                'resolved snapshot. Set it before creating the TemplateApplier.'
+            )
+        super().__setitem__(key, value)
+
+    def freeze_resolved(self) -> ResolvedXCookieConfig:
+        """
+        Resolve the config and make the keys it was resolved from read-only,
+        so values derived from the snapshot cannot go stale.
+        """
+        resolved = resolve_xcookie_config(self)
+        self._frozen_keys = frozenset(SNAPSHOT_KEYS)
+        return resolved
 
     def _load_pyproject_config(self):
         pyproject_fpath = self['repodir'] / 'pyproject.toml'
@@ -690,39 +799,54 @@ class XCookieConfig(kwconf.Config):
         autocomplete: bool | str = 'auto',
         **kwargs: Any,
     ) -> XCookieConfig:
-        # We load the config multiple times to get the right defaults.
-        # ideally we should fix this up
+        """
+        Load the config from layered sources and resolve it once.
+
+        Later layers win: the built-in defaults, metadata inferred from the
+        standard ``pyproject.toml`` tables, the ``[tool.xcookie]`` table, and
+        finally ``kwargs`` and the command line. The command line is parsed a
+        single time and the pyproject layers only fill in keys it did not set.
+        The resolved values are available as ``config.resolved``.
+        """
         if isinstance(argv, int) and not isinstance(argv, bool):
             if argv != 0:
                 raise ValueError('integer argv values must be 0')
             cli_argv: bool | str | Sequence[str] | None = False
         else:
-            cli_argv = argv
-        config = cast(
-            XCookieConfig,
-            cls.cli(
-                argv=cli_argv,
-                data=kwargs,
-                strict=strict,
-                autocomplete=autocomplete,
-            ),
+            cli_argv = True if argv is None else argv
+        config = cls(_dont_call_post_init=True)
+        config.load(
+            kwargs,
+            argv=cli_argv,
+            strict=strict,
+            autocomplete=autocomplete,
+            _dont_call_post_init=True,
         )
-        # config.__post_init__()
+        explicit = config._explicit_keys(kwargs)
+        config['repodir'] = resolve_repodir(config['repodir'])
         settings = config._load_xcookie_pyproject_settings()
         if settings:
             print(f'settings={settings}')
-            config = cast(
-                XCookieConfig,
-                cls.cli(
-                    argv=cli_argv,
-                    data=kwargs,
-                    default=ub.dict_isect(settings, config),
-                    strict=strict,
-                    autocomplete=autocomplete,
-                ),
+            config.update(
+                {
+                    key: value
+                    for key, value in settings.items()
+                    if key in config and key not in explicit
+                }
             )
+        resolve_xcookie_config(config)
         return config
 
+    def _explicit_keys(self, data: dict[str, Any]) -> set[str]:
+        """Keys set by ``data`` or the command line in the last load."""
+        provided = getattr(self, '_provided_keys', None)
+        if provided is None:
+            # Older kwconf versions do not track provenance, so treat any
+            # value that differs from its default as explicit.
+            default = self.__class__(_dont_call_post_init=True)
+            provided = {key for key in self if self[key] != default[key]}
+        return set(provided) | set(data)
+
     @classmethod
     def main(
         cls,
@@ -752,23 +876,20 @@ class XCookieConfig(kwconf.Config):
             }
             argv = 0
         """
-        # We load the config multiple times to get the right defaults.
         config = XCookieConfig.load_from_cli_and_pyproject(
             argv=argv,
             strict=strict,
             autocomplete=autocomplete,
             **kwargs,
         )
-        # # config.__post_init__()
-        # settings = config._load_xcookie_pyproject_settings()
-        # if settings:
-        #     print(f'settings={settings}')
-        #     config = XCookieConfig.cli(argv=argv, data=kwargs, default=ub.dict_isect(settings, config))
-        # config.__post_init__()
-
         # import xdev
         # xdev.embed()
 
+        if config['check']:
+            self = TemplateApplier(config)
+            self.drift = self.check_drift()
+            return self
+
         import rich
 
         rich.print('config = {}'.format(ub.urepr(config, nl=1)))
@@ -776,8 +897,14 @@ class XCookieConfig(kwconf.Config):
         # repodir.ensuredir()
 
         self = TemplateApplier(config)
-        self.setup()
-        self.apply()
+        if config['plan_in']:
+            self.apply_plan_artifact(config['plan_in'])
+        elif config['plan_out']:
+            self.setup()
+            self.dump_patch_plan(config['plan_out'])
+        else:
+            self.setup()
+            self.apply()
         return self
 
 
@@ -796,12 +923,14 @@ class TemplateApplier:
             config = XCookieConfig(**config)
 
         self.config = config
-        self.resolved = resolve_xcookie_config(self.config)
+        self.resolved = config.freeze_resolved()
         self.repodir = self.resolved.repodir
         self.repo_name = self.resolved.repo_name
         self._tmpdir = tempfile.TemporaryDirectory(prefix=self.repo_name)
+        # Populated by check mode, see :func:`check_drift`.
+        self.drift: dict[str, list[ub.Path]] | None = None
 
-        self.template_infos: list[TemplateInfo] = []
+        self.template_infos: TemplateRegistry = TemplateRegistry()
         try:
             xcookie_dpath = ub.Path(__file__).parent.parent
         except NameError:
@@ -831,18 +960,22 @@ class TemplateApplier:
                 self.autostage()
 
     def autostage(self):
-        import git
-
-        repo = git.Repo(self.repodir)
-
-        # Find untracked files
+        # Find untracked files with one query instead of one per file
+        index = GitIndex.read(self.repodir)
         untracked = []
         for info in self.staging_infos:
             fpath = info['repo_fpath']
-            if not repo.git.ls_files(fpath):
+            if index is None or not index.is_tracked(fpath):
                 untracked.append(fpath)
+        self._git_add(untracked)
 
-        repo.git.add(untracked)
+    def _git_add(self, fpaths) -> None:
+        if fpaths:
+            ub.cmd(
+                ['git', 'add', '--', *map(os.fspath, fpaths)],
+                cwd=self.repodir,
+                check=True,
+            )
 
     @property
     def has_git(self) -> bool:
@@ -1152,7 +1285,9 @@ class TemplateApplier:
                 'input_fname': rc.resource_fpath('run_tests.purepy.py.in'),
             },
         ]
-        self.template_infos = coerce_template_infos(raw_template_infos)
+        self.template_infos = TemplateRegistry(
+            coerce_template_infos(raw_template_infos)
+        )
 
         # The user specified some files to not overwrite by default
         skip_autogen = {
@@ -1221,8 +1356,8 @@ class TemplateApplier:
                 )
 
     @property
-    def tags(self):
-        return set(self.config['tags'])
+    def tags(self) -> frozenset[str]:
+        return self.resolved.tag_set
 
     def _project_classifiers(self):
         version_classifiers = [
@@ -1279,7 +1414,7 @@ class TemplateApplier:
         effects, so it would be good if we were able have these fields
         populated on initialization for tests.
         """
-        tags = set(self.config['tags'])
+        tags = self.tags
         self.remote_info = {'type': 'unknown'}
 
         if isinstance(self.config.url, str) and self.config.url.lower() in {
@@ -1293,9 +1428,9 @@ class TemplateApplier:
             # We can infer this if the repo already exists.
             git_dpath = self.repodir / '.git'
             if git_dpath.exists():
-                resp = ub.cmd('git remote -v  get-url origin', cwd=self.repodir)
-                if resp['ret'] == 0:
-                    remote_url = resp['out'].strip()
+                metadata = git_meta.read_git_metadata(self.repodir)
+                remote_url = None if metadata is None else metadata.remote_url()
+                if remote_url is not None:
                     if self.config.url is None:
                         try:
                             self.config.url = GitURL(remote_url).to_https()
@@ -1371,18 +1506,29 @@ class TemplateApplier:
         staging directory.
         """
         self._presetup()
+        self._resolve_use_vcs()
+        self._build_template_registry()
+        self.stage_files()
+        return self
 
-        tags = set(self.config['tags'])
+    def _resolve_use_vcs(self, verbose: bool = True) -> None:
+        """
+        Resolve ``use_vcs='auto'`` based on the known remote information.
+        """
+        tags = self.tags
 
         use_vcs = self.config['use_vcs']
 
         if self.remote_info['type'] == 'unknown':
             if use_vcs == 'auto':
                 use_vcs = False
-            print(f'tags={tags}')
-            print(
-                'self.remote_info = {}'.format(ub.urepr(self.remote_info, nl=1))
-            )
+            if verbose:
+                print(f'tags={tags}')
+                print(
+                    'self.remote_info = {}'.format(
+                        ub.urepr(self.remote_info, nl=1)
+                    )
+                )
             msg = 'Tags does not include github or gitlab. Cannot use VCS system without that'
             if use_vcs:
                 raise Exception(msg)
@@ -1392,10 +1538,13 @@ class TemplateApplier:
         if 'group' not in self.remote_info:
             if use_vcs == 'auto':
                 use_vcs = False
-            print(f'tags={tags}')
-            print(
-                'self.remote_info = {}'.format(ub.urepr(self.remote_info, nl=1))
-            )
+            if verbose:
+                print(f'tags={tags}')
+                print(
+                    'self.remote_info = {}'.format(
+                        ub.urepr(self.remote_info, nl=1)
+                    )
+                )
             msg = 'Unknown user / group, specify a tag for a known user. Or a URL in the pyproject.toml [tool.xcookie]'
             if use_vcs:
                 raise Exception(msg)
@@ -1406,12 +1555,93 @@ class TemplateApplier:
             use_vcs = True
         self.config['use_vcs'] = use_vcs
 
+    def check_drift(self) -> dict[str, list[ub.Path]]:
+        """
+        Render every applicable template in memory and compare it with the
+        working tree without writing a staging directory.
+
+        Honors ``only_generate`` and ``regen`` the same way as
+        :func:`gather_tasks`.
+
+        Returns:
+            Dict[str, List[Path]]: repo-relative paths that are ``missing``,
+            ``dirty`` (would be rewritten), or ``modified`` (differ, but are
+            not managed by xcookie).
+        """
+        self._presetup()
+        self._resolve_use_vcs(verbose=False)
         self._build_template_registry()
-        self.stage_files()
-        return self
 
-    def copy_staged_files(self):
+        regen_pat = SearchPattern.coerce(self.config.get('regen'))
+        onlygen_pat = SearchPattern.coerce(self.config.get('only_generate'))
+        index = self._read_git_index()
+
+        drift: dict[str, list[ub.Path]] = {
+            'missing': [],
+            'dirty': [],
+            'modified': [],
+        }
+        for info in self.template_infos.enabled(self.tags):
+            if info.skip:
+                continue
+            if onlygen_pat is not None and not onlygen_pat.matches(info.fname):
+                continue
+            rel_fpath = ub.Path(info.fname)
+            repo_fpath = self.repodir / rel_fpath
+            info.stage_fpath = self.staging_dpath / rel_fpath
+            info.repo_fpath = repo_fpath
+            if info.path_type == 'dir':
+                if not repo_fpath.exists():
+                    drift['missing'].append(rel_fpath)
+                continue
+            try:
+                text = self._render_text(info)
+            except SkipFile:
+                continue
+            data = text.encode()
+            if not repo_fpath.exists():
+                drift['missing'].append(rel_fpath)
+            elif not (
+                index is not None and index.known_identical(repo_fpath, data)
+            ) and not content_matches_repo(data, repo_fpath):
+                want_rewrite = info.overwrite or (
+                    regen_pat is not None and regen_pat.matches(info.fname)
+                )
+                if want_rewrite:
+                    drift['dirty'].append(rel_fpath)
+                else:
+                    drift['modified'].append(rel_fpath)
+        return drift
+
+    def dump_patch_plan(self, fpath) -> ub.Path:
+        """
+        Gather the patch plan for the staged files and write it to ``fpath``.
+        """
         plan = self.gather_tasks()
+        fpath = ub.Path(plan.dump(fpath, self.repodir))
+        print('task_summary = {}'.format(ub.urepr(plan.task_summary, nl=1)))
+        print(f'Wrote patch plan to {fpath}')
+        return fpath
+
+    def apply_plan_artifact(self, fpath) -> PatchPlan:
+        """
+        Apply a patch plan written by :func:`dump_patch_plan`.
+        """
+        plan = PatchPlan.load(fpath, self.repodir, self.staging_dpath / '_plan')
+        stale = plan.stale_paths()
+        if stale:
+            raise RuntimeError(
+                'Refusing to apply {}: these files changed since it was '
+                'planned:\n{}'.format(fpath, ub.urepr(stale, nl=1))
+            )
+        self.copy_staged_files(plan)
+        if self.config['use_vcs'] and self.config['autostage'] and plan.missing:
+            self._git_add([p for p in plan.missing if p.exists()])
+        return plan
+
+    def copy_staged_files(self, plan: PatchPlan | None = None):
+        if plan is None:
+            plan = self.gather_tasks()
         self.render_patch_plan(plan)
         task_summary = plan.task_summary
         if any(task_summary.values()):
@@ -1422,13 +1652,15 @@ class TemplateApplier:
                 default='yes',
             )
             if answer in {'all', 'yes'}:
-                plan.apply_all()
+                plan.apply_all(transactional=True, workers=APPLY_WORKERS)
             elif answer == 'some':
                 selected = []
                 for task in plan.copy:
                     if self.config.confirm(f'Apply {task.dst}?'):
                         selected.append(task.dst)
-                plan.apply_some(selected)
+                plan.apply_some(
+                    selected, transactional=True, workers=APPLY_WORKERS
+                )
 
     def vcs_checks(self):
         # repodir = self.config['repodir']
@@ -1521,7 +1753,7 @@ class TemplateApplier:
 
     @property
     def template_context(self) -> TemplateContext:
-        return TemplateContext.from_config(self.config)
+        return self.resolved.template_context
 
     def _stage_file(self, info):
         """
@@ -1558,149 +1790,71 @@ class TemplateApplier:
             raise SkipFile
 
         path_name = info.fname
-        path_type = info.path_type
-
         stage_fpath = self.staging_dpath / path_name
         info.stage_fpath = stage_fpath
         info.repo_fpath = self.repodir / path_name
-        info.path_type = path_type
-        if path_type == 'dir':
+        if info.path_type == 'dir':
             stage_fpath.ensuredir()
         else:
+            text = self._render_text(info)
             stage_fpath.parent.ensuredir()
-            dynamic = info.dynamic or info.source == 'dynamic'
-            if dynamic:
-                dynamic_var = info.dynamic
-                if dynamic_var == '':
-                    text = self.lut(info)
-                else:
-                    text = getattr(self, dynamic_var)()
-                if text is None:
-                    raise SkipFile('file was disabled')
-                try:
-                    stage_fpath.write_text(text)
-                    if 'x' in info.perms:
-                        stage_fpath.chmod('+x')
-                except Exception:
-                    print(f'text={text}')
-                    raise
+            try:
+                stage_fpath.write_text(text)
+            except Exception:
+                print(f'text={text}')
+                raise
+            if info.dynamic or info.source == 'dynamic':
+                if 'x' in info.perms:
+                    stage_fpath.chmod('+x')
             else:
-                in_fname = info.input_fname or path_name
-                raw_fpath = self.template_dpath / in_fname
-                if not raw_fpath.exists():
-                    raise IOError(
-                        f'Template file: raw_fpath={raw_fpath} does not exist'
-                    )
-                shutil.copy2(raw_fpath, stage_fpath)
-
-                self._apply_xcookie_directives(stage_fpath)
-
-                if info.template:
-                    text = stage_fpath.read_text()
-                    text = apply_template_context(text, self.template_context)
-                    stage_fpath.write_text(text)
-
-        # Probably inefficient.
-        if stage_fpath.name.endswith('.py'):
-            new_text = self.format_code(
-                stage_fpath.read_text(), filename=stage_fpath.name
-            )
-            stage_fpath.write_text(new_text)
+                shutil.copymode(self._raw_fpath(info), stage_fpath)
         return info
 
-    def _apply_xcookie_directives(self, stage_fpath):
-        text = stage_fpath.read_text()
-        from xcookie.directive import DirectiveExtractor
-
-        namespace = 'xcookie'
-        commands = ['UNCOMMENT_IF', 'COMMENT_IF']
-        extractor = DirectiveExtractor(namespace, commands)
-
-        import re
+    def _raw_fpath(self, info) -> ub.Path:
+        in_fname = info.input_fname or info.fname
+        return self.template_dpath / in_fname
 
-        def comment_line(line):
-            """
+    def _render_text(self, info) -> str:
+        """
+        Return the final text of a file template without touching the disk.
 
-            line = '       #- pip install .[tests-strict,headless-strict]  # testrepo: +UNCOMMENT_IF(cv2)'
-            uncomment_line(line)
+        Raises:
+            SkipFile: if a dynamic builder disables the file.
+        """
+        dynamic = info.dynamic or info.source == 'dynamic'
+        if dynamic:
+            dynamic_var = info.dynamic
+            if dynamic_var == '':
+                text = self.lut(info)
+            else:
+                text = getattr(self, dynamic_var)()
+            if text is None:
+                raise SkipFile('file was disabled')
+        else:
+            raw_fpath = self._raw_fpath(info)
+            if not raw_fpath.exists():
+                raise IOError(
+                    f'Template file: raw_fpath={raw_fpath} does not exist'
+                )
+            # Directives and token positions are cached per template file,
+            # and one substituter is shared by every file of this context.
+            substitute = TokenSubstituter.for_context(self.template_context)
+            compiled = load_compiled_template(
+                raw_fpath, substitute.replacements
+            )
+            text = compiled.render(
+                self.tags, substitute if info.template else None
+            )
 
-            cases = [
-                '   foobar',
-                'foobar',
-                '   def fds(): # hello',
-            ]
-            for line in cases:
-                cline = comment_line(line)
-                uline = uncomment_line(cline)
-                print(f'line={line}')
-                print(f'cline={cline}')
-                print(f'uline={uline}')
-                assert uline == line
-            cases = [
-                '#   foobar',
-                '   #  foobar',
-                '   #foobar',
-                '#foobar',
-                '#  foobar',
-                '# foobar',
-                '#   def fds(): # hello',
-                '   #def fds(): # hello',
-            ]
-            for line in cases:
-                uline = uncomment_line(cline)
-                cline = comment_line(line)
-                print(f'line={line}')
-                print(f'cline={cline}')
-                print(f'uline={uline}')
-            """
-            return re.sub(r'^(\s*)([^\s])', r'\g<1># \g<2>', line)
-
-        def uncomment_line(line):
-            return re.sub(r'^(\s*)#\s*', r'\g<1>', line, count=1)
-
-        def tags_satisfied(directive, tags):
-            value = tags.issuperset(set(directive.args))
-            return value
-
-        tags = set(self.config['tags'])
-        new_lines = []
-        did_work = 0
-        for line in text.split('\n'):
-            extracted = list(extractor.extract(line))
-            # if 'COMMENT' in line:
-            #     print(f'line={line}')
-            #     print(f'extracted={extracted}')
-            if extracted:
-                for directive in extracted:
-                    action = None
-                    if directive.name == 'COMMENT_IF':
-                        value = tags_satisfied(directive, tags)
-                        if value:
-                            action = comment_line
-                            # print(f'action={action}')
-                            did_work = 1
-                    if directive.name == 'UNCOMMENT_IF':
-                        value = tags_satisfied(directive, tags)
-                        if value:
-                            action = uncomment_line
-                            # print(f'action={action}')
-                            did_work = 1
-                    if action is not None:
-                        # print(f'directive.name={directive.name}')
-                        # print(f'action={action}')
-                        # print(f'old line={line}')
-                        line = action(line)
-                        # print(f'new line={line}')
-            new_lines.append(line)
-
-        if did_work:
-            stage_fpath.write_text('\n'.join(new_lines))
+        # Probably inefficient.
+        if info.fname.endswith('.py'):
+            text = self.format_code(text, filename=ub.Path(info.fname).name)
+        return text
 
     def stage_files(self):
         self.staging_infos = []
-        for info in ub.ProgIter(self.template_infos, desc='staging'):
-            if not info.get('enabled', True):
-                continue
+        enabled_infos = self.template_infos.enabled(self.tags)
+        for info in ub.ProgIter(enabled_infos, desc='staging'):
             try:
                 info = self._stage_file(info)
             except SkipFile:
@@ -1718,13 +1872,20 @@ class TemplateApplier:
                 )
             )
 
+    def _read_git_index(self) -> GitIndex | None:
+        if self.repodir is None:
+            return None
+        return GitIndex.read(self.repodir)
+
     def gather_tasks(self) -> PatchPlan:
         plan = PatchPlan()
+        # Tracked files whose staged content hashes to the indexed blob are
+        # clean without reading them.
+        index = self._read_git_index()
 
         regen_pat = SearchPattern.coerce(self.config.get('regen'))
         onlygen_pat = SearchPattern.coerce(self.config.get('only_generate'))
 
-        diff_style = 'unified'
         for info in self.staging_infos:
             stage_fpath = info['stage_fpath']
             repo_fpath = info['repo_fpath']
@@ -1740,54 +1901,17 @@ class TemplateApplier:
                 else:
                     plan.missing.append(repo_fpath)
                     plan.add_copy(stage_fpath, repo_fpath)
-                    stage_text = stage_fpath.read_text()
-                    # TODO: add style when available
-                    try:
-                        difftext = (
-                            xdev.difftext(
-                                '',
-                                stage_text[:1000],
-                                colored=1,
-                                context_lines=2,
-                                style=diff_style,
-                            )
-                            + '...and more'
-                        )
-                    except Exception:
-                        difftext = (
-                            xdev.difftext(
-                                '',
-                                stage_text[:1000],
-                                colored=1,
-                                context_lines=2,
-                            )
-                            + '...and more'
-                        )
-                    plan.diff_texts[repo_fpath] = difftext
+                    plan.add_diff('new', stage_fpath, repo_fpath)
             else:
                 assert stage_fpath.exists()
                 if stage_fpath.is_dir():
                     continue
-                repo_text = repo_fpath.read_text()
-                stage_text = stage_fpath.read_text()
-                if stage_text.strip() == repo_text.strip():
-                    difftext = None
+                stage_bytes = stage_fpath.read_bytes()
+                if (
+                    index is not None and index.known_identical(repo_fpath, stage_bytes)
+                ) or content_matches_repo(stage_bytes, repo_fpath):
+                    plan.clean.append(repo_fpath)
                 else:
-                    try:
-                        difftext = xdev.difftext(
-                            repo_text, stage_text, colored=1, context_lines=1
-                        )
-                    except Exception:
-                        difftext = xdev.difftext(
-                            repo_text,
-                            stage_text,
-                            colored=1,
-                            context_lines=1,
-                            style=diff_style,
-                            fromfile=repo_fpath,
-                            tofile=repo_fpath,
-                        )
-                if difftext:
                     want_rewrite = info['overwrite']
                     if not want_rewrite:
                         if regen_pat is not None:
@@ -1797,11 +1921,9 @@ class TemplateApplier:
                     if want_rewrite:
                         plan.add_copy(stage_fpath, repo_fpath)
                         plan.dirty.append(repo_fpath)
-                        plan.diff_texts[repo_fpath] = difftext
+                        plan.add_diff('dirty', stage_fpath, repo_fpath)
                     else:
                         plan.modified.append(repo_fpath)
-                else:
-                    plan.clean.append(repo_fpath)
 
             if 'x' in info.get('perms', ''):
                 import stat
@@ -1841,22 +1963,28 @@ class TemplateApplier:
         return text
 
     def refresh_docs(self):
+        """
+        Bring the sphinx-apidoc stubs up to date, touching only stubs whose
+        module set changed, and stage just those files.
+        """
         from xcookie.builders import docs
 
         docs_builder = docs.DocsBuilder(self.config)
-
-        docs_dpath = docs_builder.docs_dpath
-        docs_auto_outdir = docs_builder.docs_auto_outdir
-        command = docs_builder.sphinx_apidoc_invocation()
-
-        ub.cmd(command, verbose=3, check=True, cwd=docs_dpath)
-        if self.has_git:
-            ub.cmd(
-                f'git add {docs_auto_outdir}/*.rst',
-                verbose=3,
-                check=True,
-                cwd=docs_dpath,
-            )
+        refresh = docs_builder.refresh_apidoc_stubs(verbose=3)
+        print(
+            f'Refreshed apidoc stubs: {len(refresh.written)} written, '
+            f'{len(refresh.deleted)} deleted, {len(refresh.unchanged)} unchanged'
+        )
+        if self.has_git and refresh.changed:
+            self._git_add(refresh.written)
+            if refresh.deleted:
+                deleted = list(map(os.fspath, refresh.deleted))
+                ub.cmd(
+                    ['git', 'rm', '--cached', '--ignore-unmatch', '-q', '--']
+                    + deleted,
+                    cwd=self.repodir,
+                    check=True,
+                )
             # ub.cmd('make html', verbose=3, check=True, cwd=docs_dpath)
 
     def _github_org_environ(self):
@@ -2376,8 +2504,8 @@ class TemplateApplier:
             '# Generated dynamically via: ~/code/xcookie/xcookie/main.py::TemplateApplier._build_special_requirements'
         ]
         req_lines.extend(header_lines)
-        max_pyver = Version(self.config['max_python'] or '4.0')
-        min_pyver = Version(self.config['min_python'])
+        max_pyver = self.resolved.max_python_version
+        min_pyver = self.resolved.min_python_version
 
         for row in version_defaults:
             lt = row['pyver_lt']
@@ -2600,7 +2728,36 @@ class TemplateApplier:
 
 
 def main():
-    XCookieConfig.main(argv=True, strict=True, autocomplete=True)
+    argv = sys.argv[1:]
+    if argv[:1] == ['docs-inventories']:
+        from xcookie import docs_inventories
+
+        docs_inventories.main(argv=argv[1:])
+        return
+    if argv[:1] == ['provision']:
+        from xcookie.vcs import provision
+
+        provision.main(argv=argv[1:])
+        return
+    if argv[:1] == ['check']:
+        # ``xcookie check`` is sugar for ``xcookie --check``.
+        argv = argv[1:] + ['--check']
+    is_check = any(arg == '--check' or arg.startswith('--check=') for arg in argv)
+    if not is_check:
+        XCookieConfig.main(argv=True, strict=True, autocomplete=True)
+        return
+    # Keep stdout to the drifted paths so it can be consumed by hooks.
+    stdout = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        self = XCookieConfig.main(argv=argv, strict=True, autocomplete=True)
+    drift = self.drift
+    if drift is None:
+        return
+    for key, paths in drift.items():
+        for path in paths:
+            print(f'{key}: {path}', file=stdout)
+    if drift['missing'] or drift['dirty']:
+        sys.exit(1)
 
 
 def _parse_remote_url(url):
@@ -2622,21 +2779,10 @@ def _parse_remote_url(url):
 
 
 def find_git_root(dpath):
-    cwd = ub.Path(dpath).resolve()
-    parts = cwd.parts
-    found = None
-    for i in reversed(range(0, len(parts) + 1)):
-        subparts = parts[0:i]
-        if len(subparts) == 0:
-            break
-        p = ub.Path(*subparts)
-        cand = p / '.git'
-        if cand.exists():
-            found = p
-            break
+    found = git_meta.find_git_root(dpath)
     if found is None:
         raise Exception('cannot find git root')
-    return found
+    return ub.Path(found)
 
 
 class GitURL(str):
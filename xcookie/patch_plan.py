@@ -50,6 +50,82 @@ class MkdirTask:
     path: Path
 
 
+@dataclass(frozen=True)
+class DiffSource:
+    """Cheap reference to a diff that is only rendered when it is shown.
+
+    Planning records one of these per new or dirty file instead of the
+    colored diff text, so non-interactive runs never pay for diffing.
+    """
+
+    kind: str
+    repo_fpath: Path
+    stage_fpath: Path
+
+    def render(self) -> str:
+        """Return the colored diff text for this file."""
+        stage_text = self.stage_fpath.read_text()
+        if self.kind == 'new':
+            # Only preview the head of new files.
+            return (
+                _difftext('', stage_text[:1000], context_lines=2, style='unified')
+                + '...and more'
+            )
+        repo_text = self.repo_fpath.read_text()
+        return _difftext(
+            repo_text,
+            stage_text,
+            context_lines=1,
+            fromfile=self.repo_fpath,
+            tofile=self.repo_fpath,
+        )
+
+
+def _difftext(text1: str, text2: str, **kwargs: Any) -> str:
+    import xdev
+
+    try:
+        return xdev.difftext(text1, text2, colored=1, **kwargs)
+    except TypeError:
+        # Older xdev versions do not accept the style / file label options.
+        kwargs.pop('style', None)
+        kwargs.pop('fromfile', None)
+        kwargs.pop('tofile', None)
+        return xdev.difftext(text1, text2, colored=1, **kwargs)
+
+
+def staged_matches_repo(stage_fpath: Path, repo_fpath: Path) -> bool:
+    r"""Return True when writing ``stage_fpath`` would not change ``repo_fpath``.
+
+    Byte-identical files are detected without decoding or diffing. Otherwise
+    the texts are compared ignoring surrounding whitespace, which is what
+    xcookie has always treated as "clean".
+
+    Example:
+        >>> import ubelt as ub
+        >>> dpath = ub.Path.appdir('xcookie/tests/patch_plan').delete().ensuredir()
+        >>> (dpath / 'a').write_text('text\n')
+        >>> (dpath / 'b').write_text('text')
+        >>> (dpath / 'c').write_text('other')
+        >>> assert staged_matches_repo(dpath / 'a', dpath / 'a')
+        >>> assert staged_matches_repo(dpath / 'a', dpath / 'b')
+        >>> assert not staged_matches_repo(dpath / 'a', dpath / 'c')
+    """
+    return content_matches_repo(stage_fpath.read_bytes(), repo_fpath)
+
+
+def content_matches_repo(data: bytes, repo_fpath: Path) -> bool:
+    """Return True when writing ``data`` would not change ``repo_fpath``.
+
+    Same rule as :func:`staged_matches_repo` for content that only exists in
+    memory.
+    """
+    repo_bytes = repo_fpath.read_bytes()
+    if data == repo_bytes:
+        return True
+    return data.decode().strip() == repo_bytes.decode().strip()
+
+
 @dataclass(frozen=True)
 class SearchPattern:
     """Small compatibility wrapper for xcookie path matching options.
@@ -128,7 +204,11 @@ class PatchPlan:
     dirty: list[Path] = field(default_factory=list)
     clean: list[Path] = field(default_factory=list)
     missing_dir: list[Path] = field(default_factory=list)
+    diff_sources: dict[Path, DiffSource] = field(default_factory=dict)
     diff_texts: dict[Path, str] = field(default_factory=dict)
+    #: sha256 of each copy destination when the plan was made (None if it
+    #: did not exist). Only populated for plans loaded with :meth:`load`.
+    base_digests: dict[Path, str | None] = field(default_factory=dict)
 
     def add_copy(self, src: os.PathLike[str], dst: os.PathLike[str]) -> CopyTask:
         """Register a file-copy task and return it."""
@@ -148,6 +228,27 @@ class PatchPlan:
         self.mkdir.append(task)
         return task
 
+    def add_diff(
+        self, kind: str, stage_fpath: os.PathLike[str], repo_fpath: os.PathLike[str]
+    ) -> DiffSource:
+        """Register a lazily rendered diff for a new or dirty file."""
+        source = DiffSource(kind, Path(repo_fpath), Path(stage_fpath))
+        self.diff_sources[source.repo_fpath] = source
+        return source
+
+    def diff_text(self, fpath: os.PathLike[str]) -> str | None:
+        """Return the diff text for ``fpath``, rendering it on demand.
+
+        Explicit entries in :attr:`diff_texts` take precedence.
+        """
+        fpath = Path(fpath)
+        if fpath in self.diff_texts:
+            return self.diff_texts[fpath]
+        source = self.diff_sources.get(fpath)
+        if source is None:
+            return None
+        return source.render()
+
     @property
     def stats(self) -> dict[str, list[Path]]:
         """Return a legacy dict-shaped summary of path classifications."""
@@ -181,56 +282,360 @@ class PatchPlan:
         """Return True if applying this plan would modify the repository."""
         return any(self.task_summary.values())
 
-    def apply_all(self) -> None:
-        """Apply all planned tasks without prompting."""
-        for dpath in sorted(self.parent_directories()):
-            Path(dpath).mkdir(parents=True, exist_ok=True)
-        for mkdir_task in self.mkdir:
-            mkdir_task.path.mkdir(parents=True, exist_ok=True)
-        for copy_task in self.copy:
-            shutil.copy2(copy_task.src, copy_task.dst)
-        for perm_task in self.perms:
-            os.chmod(perm_task.path, perm_task.mode)
-
-    def apply_some(self, include: Iterable[os.PathLike[str]]) -> None:
+    def apply_all(
+        self, transactional: bool = False, workers: int | None = None
+    ) -> None:
+        """Apply all planned tasks without prompting.
+
+        Args:
+            transactional: if True, each destination is written to a temporary
+                file and moved into place with :func:`os.replace`, and any
+                failure rolls the repository back to its original file
+                contents, modes, and directories before re-raising.
+            workers: if more than 1, copy files on a thread pool of this size.
+        """
+        self._apply(self.copy, transactional=transactional, workers=workers)
+
+    def apply_some(
+        self,
+        include: Iterable[os.PathLike[str]],
+        transactional: bool = False,
+        workers: int | None = None,
+    ) -> None:
         """Apply copy tasks whose destinations are present in ``include``.
 
         Permission and directory tasks are intentionally applied wholesale.
         This matches the historical ``some`` behavior where the prompt only
-        filtered copy operations.
+        filtered copy operations. See :meth:`apply_all` for the options.
         """
         include_paths = {Path(path) for path in include}
         copy_tasks = [task for task in self.copy if task.dst in include_paths]
-        for dpath in sorted({task.dst.parent for task in copy_tasks}):
-            dpath.mkdir(parents=True, exist_ok=True)
-        for mkdir_task in self.mkdir:
-            mkdir_task.path.mkdir(parents=True, exist_ok=True)
-        for copy_task in copy_tasks:
-            shutil.copy2(copy_task.src, copy_task.dst)
-        for perm_task in self.perms:
-            os.chmod(perm_task.path, perm_task.mode)
+        self._apply(copy_tasks, transactional=transactional, workers=workers)
+
+    def _apply(
+        self,
+        copy_tasks: list[CopyTask],
+        transactional: bool = False,
+        workers: int | None = None,
+    ) -> None:
+        journal = _ApplyJournal() if transactional else None
+        try:
+            dpaths = {task.dst.parent for task in copy_tasks}
+            dpaths.update(task.path for task in self.mkdir)
+            for dpath in sorted(dpaths):
+                _makedirs(dpath, journal)
+            if workers is not None and workers > 1 and len(copy_tasks) > 1:
+                from concurrent.futures import ThreadPoolExecutor
+
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = [
+                        pool.submit(_copy_file, task, journal)
+                        for task in copy_tasks
+                    ]
+                # Surface the first failure after every worker has stopped so
+                # the journal is complete before any rollback.
+                for future in futures:
+                    future.result()
+            else:
+                for task in copy_tasks:
+                    _copy_file(task, journal)
+            for perm_task in self.perms:
+                if journal is not None:
+                    journal.record_file(perm_task.path)
+                os.chmod(perm_task.path, perm_task.mode)
+        except BaseException:
+            if journal is not None:
+                journal.rollback()
+            raise
 
     def parent_directories(self) -> set[Path]:
         """Return parent directories required by all copy tasks."""
         return {task.dst.parent for task in self.copy}
 
+    def dump(self, fpath: os.PathLike[str], repodir: os.PathLike[str]) -> Path:
+        """Write this plan and its staged contents to a tarball.
+
+        All repository paths are stored relative to ``repodir`` so the
+        artifact can be reviewed and applied on another machine with
+        :meth:`load`, without re-rendering any templates.
+
+        Example:
+            >>> import ubelt as ub
+            >>> dpath = ub.Path.appdir('xcookie/tests/plan_dump').delete().ensuredir()
+            >>> repodir = (dpath / 'repo').ensuredir()
+            >>> stage = (dpath / 'stage').ensuredir()
+            >>> (stage / 'README.rst').write_text('new readme')
+            >>> plan = PatchPlan()
+            >>> plan.missing.append(repodir / 'README.rst')
+            >>> _ = plan.add_copy(stage / 'README.rst', repodir / 'README.rst')
+            >>> _ = plan.add_diff('new', stage / 'README.rst', repodir / 'README.rst')
+            >>> artifact = plan.dump(dpath / 'plan.tar.gz', repodir)
+            >>> other = (dpath / 'other').ensuredir()
+            >>> loaded = PatchPlan.load(artifact, other, dpath / 'extracted')
+            >>> loaded.apply_all()
+            >>> assert (other / 'README.rst').read_text() == 'new readme'
+        """
+        import hashlib
+        import io
+        import json
+        import tarfile
+
+        repodir = Path(repodir)
+
+        def rel(path: Path) -> str:
+            return Path(path).relative_to(repodir).as_posix()
+
+        copy_items = []
+        for index, task in enumerate(self.copy):
+            if task.dst.exists():
+                base_digest = hashlib.sha256(task.dst.read_bytes()).hexdigest()
+            else:
+                base_digest = None
+            copy_items.append(
+                {
+                    'src': f'staged/{index}',
+                    'dst': rel(task.dst),
+                    'base_sha256': base_digest,
+                }
+            )
+        meta = {
+            'version': PLAN_ARTIFACT_VERSION,
+            'repodir': os.fspath(repodir),
+            'stats': {
+                key: [rel(path) for path in paths]
+                for key, paths in self.stats.items()
+            },
+            'copy': copy_items,
+            'perms': [
+                {'path': rel(task.path), 'mode': task.mode} for task in self.perms
+            ],
+            'mkdir': [rel(task.path) for task in self.mkdir],
+            'diffs': {
+                rel(path): source.kind for path, source in self.diff_sources.items()
+            },
+        }
+        fpath = Path(fpath)
+        fpath.parent.mkdir(parents=True, exist_ok=True)
+        meta_bytes = json.dumps(meta, indent=2).encode()
+        with tarfile.open(fpath, 'w:gz') as tar:
+            info = tarfile.TarInfo('plan.json')
+            info.size = len(meta_bytes)
+            tar.addfile(info, io.BytesIO(meta_bytes))
+            for task, item in zip(self.copy, copy_items):
+                tar.add(task.src, arcname=item['src'])
+        return fpath
 
-def render_patch_plan(plan: PatchPlan) -> None:
-    """Print the human-readable patch summary for a staging plan."""
+    @classmethod
+    def load(
+        cls,
+        fpath: os.PathLike[str],
+        repodir: os.PathLike[str],
+        extract_dpath: os.PathLike[str],
+    ) -> PatchPlan:
+        """Read a plan written by :meth:`dump` and rebase it onto ``repodir``.
+
+        The staged contents are extracted into ``extract_dpath``, which must
+        outlive the returned plan.
+        """
+        import json
+        import tarfile
+
+        repodir = Path(repodir)
+        extract_dpath = Path(extract_dpath)
+        with tarfile.open(fpath, 'r:*') as tar:
+            for member in tar.getmembers():
+                name = Path(member.name)
+                if name.is_absolute() or '..' in name.parts:
+                    raise ValueError(f'Unsafe path in plan artifact: {member.name}')
+                if not (member.isfile() or member.isdir()):
+                    raise ValueError(f'Unexpected member in plan artifact: {member.name}')
+            if hasattr(tarfile, 'data_filter'):
+                tar.extractall(extract_dpath, filter='data')
+            else:
+                tar.extractall(extract_dpath)
+        meta = json.loads((extract_dpath / 'plan.json').read_text())
+        if meta.get('version') != PLAN_ARTIFACT_VERSION:
+            raise ValueError(
+                f'Unsupported plan artifact version: {meta.get("version")!r}'
+            )
+        plan = cls()
+        for key, paths in meta['stats'].items():
+            getattr(plan, key).extend(repodir / path for path in paths)
+        for item in meta['copy']:
+            task = plan.add_copy(extract_dpath / item['src'], repodir / item['dst'])
+            plan.base_digests[task.dst] = item['base_sha256']
+        for item in meta['perms']:
+            plan.add_perm(repodir / item['path'], item['mode'])
+        for path in meta['mkdir']:
+            plan.add_mkdir(repodir / path)
+        stage_lut = {task.dst: task.src for task in plan.copy}
+        for path, kind in meta['diffs'].items():
+            repo_fpath = repodir / path
+            if repo_fpath in stage_lut:
+                plan.add_diff(kind, stage_lut[repo_fpath], repo_fpath)
+        return plan
+
+    def stale_paths(self) -> list[Path]:
+        """Return copy destinations that changed since the plan was made.
+
+        Only plans loaded with :meth:`load` record the original contents, so
+        this is always empty for freshly gathered plans.
+        """
+        import hashlib
+
+        stale = []
+        for task in self.copy:
+            if task.dst not in self.base_digests:
+                continue
+            want = self.base_digests[task.dst]
+            if task.dst.exists():
+                have = hashlib.sha256(task.dst.read_bytes()).hexdigest()
+            else:
+                have = None
+            if have != want:
+                stale.append(task.dst)
+        return stale
+
+
+class _ApplyJournal:
+    """Original state of everything a transactional apply touched."""
+
+    def __init__(self) -> None:
+        import threading
+
+        self._lock = threading.Lock()
+        # path -> (original bytes, original mode), or None if it did not exist
+        self.files: dict[Path, tuple[bytes, int] | None] = {}
+        self.created_dirs: list[Path] = []
+
+    def record_file(self, path: Path) -> None:
+        with self._lock:
+            if path in self.files:
+                return
+            if path.exists():
+                self.files[path] = (path.read_bytes(), path.stat().st_mode)
+            else:
+                self.files[path] = None
+
+    def record_dir(self, path: Path) -> None:
+        with self._lock:
+            self.created_dirs.append(path)
+
+    def rollback(self) -> None:
+        for path, original in self.files.items():
+            if original is None:
+                if path.exists():
+                    path.unlink()
+            else:
+                data, mode = original
+                _atomic_write_bytes(path, data)
+                os.chmod(path, mode)
+        for dpath in reversed(self.created_dirs):
+            try:
+                dpath.rmdir()
+            except OSError:
+                pass
+
+
+def _makedirs(dpath: Path, journal: _ApplyJournal | None) -> None:
+    if journal is None:
+        dpath.mkdir(parents=True, exist_ok=True)
+        return
+    missing = []
+    for parent in [dpath, *dpath.parents]:
+        if parent.exists():
+            break
+        missing.append(parent)
+    for parent in reversed(missing):
+        parent.mkdir(exist_ok=True)
+        journal.record_dir(parent)
+
+
+def _copy_file(task: CopyTask, journal: _ApplyJournal | None) -> None:
+    if journal is None:
+        shutil.copy2(task.src, task.dst)
+        return
+    journal.record_file(task.dst)
+    tmp_fpath = _temp_sibling(task.dst)
+    try:
+        shutil.copy2(task.src, tmp_fpath)
+        os.replace(tmp_fpath, task.dst)
+    except BaseException:
+        if tmp_fpath.exists():
+            tmp_fpath.unlink()
+        raise
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    tmp_fpath = _temp_sibling(path)
+    try:
+        tmp_fpath.write_bytes(data)
+        os.replace(tmp_fpath, path)
+    except BaseException:
+        if tmp_fpath.exists():
+            tmp_fpath.unlink()
+        raise
+
+
+def _temp_sibling(path: Path) -> Path:
+    import tempfile
+
+    # The temporary file must live on the same filesystem for os.replace.
+    fd, tmp_name = tempfile.mkstemp(
+        prefix=f'.{path.name}.', suffix='.tmp', dir=path.parent
+    )
+    os.close(fd)
+    return Path(tmp_name)
+
+
+#: Format version written into ``plan.json`` by :meth:`PatchPlan.dump`.
+PLAN_ARTIFACT_VERSION = 1
+
+#: Thread pool size xcookie uses when applying a plan.
+APPLY_WORKERS = 8
+
+#: Default cap on the number of diff characters :func:`render_patch_plan` prints.
+RENDER_DIFF_LIMIT = 200_000
+
+
+def render_patch_plan(plan: PatchPlan, max_chars: int | None = RENDER_DIFF_LIMIT) -> None:
+    """Print the human-readable patch summary for a staging plan.
+
+    Diffs are rendered on demand. Once ``max_chars`` characters of diff text
+    have been printed, the remaining diffs are skipped and only listed. Pass
+    ``max_chars=None`` to print everything.
+    """
     import pprint
 
-    for fpath in plan.missing:
-        difftext = plan.diff_texts.get(fpath)
-        if difftext:
+    budget = max_chars
+    omitted: list[Path] = []
+    sections = [(fpath, 'NEW') for fpath in plan.missing] + [
+        (fpath, 'DIFF') for fpath in plan.dirty
+    ]
+    for fpath, kind in sections:
+        if budget is not None and budget <= 0:
+            if fpath in plan.diff_texts or fpath in plan.diff_sources:
+                omitted.append(fpath)
+            continue
+        difftext = plan.diff_text(fpath)
+        if not difftext:
+            continue
+        if budget is not None:
+            budget -= len(difftext)
+        if kind == 'NEW':
             print(f'<NEW FPATH={fpath}>')
             print(difftext)
             print(f'<END FPATH={fpath}>')
-    for fpath in plan.dirty:
-        difftext = plan.diff_texts.get(fpath)
-        if difftext:
+        else:
             print(f'<DIFF FOR repo_fpath={fpath}>')
             print(difftext)
             print(f'<END DIFF repo_fpath={fpath}>')
+    if omitted:
+        print(
+            f'<DIFFS OMITTED count={len(omitted)}, over the {max_chars} character render limit>'
+        )
+        for fpath in omitted:
+            print(f'  {fpath}')
     print('stats = {}'.format(pprint.pformat(plan.stats)))
 
 
@@ -4,14 +4,11 @@ from sphinx.domains.python import PythonDomain  # NOQA
 from typing import Any, List  # NOQA
 
 
-# HACK TO PREVENT EXCESSIVE TIME.
-# TODO: FIXME FOR REAL
-MAX_TIME_MINUTES = None
-if MAX_TIME_MINUTES:
-    import ubelt  # NOQA
-
-    TIMER = ubelt.Timer()
-    TIMER.tic()
+# Set to 1 when xcookie is configured with ``render_doc_images``. Figures
+# are rendered by a thread pool of per-doctest subprocesses before Sphinx
+# reads any document, see ``doctest_figure_workers`` and
+# ``doctest_figure_timeout`` in :func:`setup`.
+RENDER_DOC_IMAGES = 0
 
 
 class PatchedPythonDomain(PythonDomain):
@@ -42,6 +39,10 @@ class GoogleStyleDocstringProcessor:
     google-style docstrings for sphinx.
     """
 
+    #: Bump when :meth:`process` or the builtin sections change their output,
+    #: so docstrings memoized by earlier builds are processed again.
+    VERSION = 1
+
     def __init__(self, autobuild=1):
         self.debug = 0
         self.registry = {}
@@ -132,6 +133,55 @@ class GoogleStyleDocstringProcessor:
         def ignore(lines):
             return []
 
+    def memo_key(self, name, lines):
+        """
+        Key for the processed form of a docstring: the processor version, the
+        registered section tags, the object name, and the docstring text.
+        """
+        import hashlib
+
+        hasher = hashlib.sha1()
+        header = f'{self.VERSION}:{sorted(self.registry)}:{name}\0'
+        hasher.update(header.encode('utf8'))
+        hasher.update('\n'.join(lines).encode('utf8'))
+        return hasher.hexdigest()
+
+    def process_memoized(self, env, name, lines):
+        """
+        Like :meth:`process`, but reuses the result stored in the Sphinx
+        environment by a previous build when the docstring is unchanged.
+
+        Example:
+            >>> from types import SimpleNamespace
+            >>> self = GoogleStyleDocstringProcessor()
+            >>> env = SimpleNamespace(docname='index')
+            >>> _before_read_docs(None, env, ['index'])
+            >>> lines = ['Hello', 'Ignore:', '    hidden']
+            >>> self.process_memoized(env, 'mod.func', lines)
+            ['Hello', '']
+            >>> # The next build of the document reuses the processed lines
+            >>> _before_read_docs(None, env, ['index'])
+            >>> self.process_memoized(env, 'mod.func', ['Hello', 'Ignore:', '    hidden'])
+            ['Hello', '']
+            >>> env.docstring_memo_stats
+            {'index': {'hit': 1, 'miss': 0}}
+        """
+        docname = env.docname
+        key = self.memo_key(name, lines)
+        entries = _doc_state(env, 'docstring_memo').setdefault(docname, {})
+        processed = entries.get(key)
+        if processed is None:
+            previous = getattr(env, 'docstring_memo_previous', {})
+            processed = previous.get(docname, {}).get(key)
+        if processed is None:
+            _count_doc_event(env, 'docstring_memo_stats', 'miss')
+            processed = tuple(self.process(lines))
+        else:
+            _count_doc_event(env, 'docstring_memo_stats', 'hit')
+            lines[:] = processed
+        entries[key] = processed
+        return lines
+
     def process(self, lines):
         """
         Example:
@@ -253,7 +303,8 @@ class GoogleStyleDocstringProcessor:
         # import ubelt as ub
         # print('lines = {}'.format(ub.urepr(lines, nl=1)))
 
-        self.process(lines)
+        with _timeit(app, 'docstring', name):
+            self.process_memoized(app.env, name, lines)
 
         # docstr = '\n'.join(lines)
         # if 'Convert the Mask' in docstr:
@@ -264,17 +315,13 @@ class GoogleStyleDocstringProcessor:
         #     import xdev
         #     xdev.embed()
 
-        render_doc_images = 0
-
-        if MAX_TIME_MINUTES and TIMER.toc() > (60 * MAX_TIME_MINUTES):
-            render_doc_images = False  # FIXME too slow on RTD
-
-        if render_doc_images:
+        if RENDER_DOC_IMAGES:
             # DEVELOPING
             if any('REQUIRES(--show)' in line for line in lines):
                 # import xdev
                 # xdev.embed()
-                create_doctest_figure(app, obj, name, lines)
+                with _timeit(app, 'figure', name):
+                    create_doctest_figure(app, obj, name, lines)
 
         FIX_EXAMPLE_FORMATTING = 1
         if FIX_EXAMPLE_FORMATTING:
@@ -419,10 +466,646 @@ def paragraph(text):
     return out
 
 
+class DoctestFigureCache:
+    """
+    Figures written by figure-producing doctests, stored in the docs build
+    directory and keyed by the executed doctest source (see
+    :func:`_doctest_source`) plus a hash of its module file, so unchanged
+    doctests are not executed again.
+
+    Example:
+        >>> import tempfile, pathlib
+        >>> dpath = pathlib.Path(tempfile.mkdtemp())
+        >>> cache = DoctestFigureCache(dpath / 'figs')
+        >>> modpath = dpath / 'mod.py'
+        >>> _ = modpath.write_text('x = 1')
+        >>> key = cache.key(modpath, 'plot()')
+        >>> cache.load(key) is None
+        True
+        >>> fpaths = cache.store(key, [lambda fpath: fpath.write_bytes(b'img')])
+        >>> [p.read_bytes() for p in cache.load(key)]
+        [b'img']
+        >>> # Editing the module invalidates its entries on the next build
+        >>> _ = modpath.write_text('x = 2')
+        >>> cache = DoctestFigureCache(dpath / 'figs')
+        >>> cache.key(modpath, 'plot()') == key
+        False
+    """
+
+    def __init__(self, dpath):
+        import pathlib
+
+        self.dpath = pathlib.Path(dpath)
+        self._module_hashes = {}
+
+    @classmethod
+    def for_app(cls, app):
+        import pathlib
+
+        return cls(pathlib.Path(app.doctreedir).parent / 'doctest_figures')
+
+    def key(self, modpath, source):
+        import hashlib
+
+        modpath = str(modpath)
+        module_hash = self._module_hashes.get(modpath)
+        if module_hash is None:
+            with open(modpath, 'rb') as file:
+                module_hash = hashlib.sha256(file.read()).hexdigest()
+            self._module_hashes[modpath] = module_hash
+        hasher = hashlib.sha256()
+        for part in [module_hash, source]:
+            hasher.update(part.encode('utf8') + b'\0')
+        return hasher.hexdigest()
+
+    def load(self, key):
+        """Return the cached figure paths for ``key`` or None on a miss."""
+        import json
+
+        entry_dpath = self.dpath / key
+        try:
+            fnames = json.loads((entry_dpath / 'manifest.json').read_text())
+        except (OSError, ValueError):
+            return None
+        fpaths = [entry_dpath / fname for fname in fnames]
+        if not all(fpath.exists() for fpath in fpaths):
+            return None
+        return fpaths
+
+    def store(self, key, savers, record=True):
+        """
+        Write one figure per ``saver(fpath)`` callback and return their paths.
+
+        Unless ``record`` is True the entry is left without a manifest, so the
+        next build treats it as a miss.
+        """
+        import json
+        import os
+        import pathlib
+        import shutil
+        import tempfile
+
+        self.dpath.mkdir(parents=True, exist_ok=True)
+        tmp_dpath = pathlib.Path(
+            tempfile.mkdtemp(prefix=f'.{key}.', dir=self.dpath)
+        )
+        fnames = []
+        for idx, saver in enumerate(savers, start=1):
+            fname = f'fig_{idx:03d}.jpeg'
+            saver(tmp_dpath / fname)
+            fnames.append(fname)
+        if record:
+            (tmp_dpath / 'manifest.json').write_text(json.dumps(fnames))
+        entry_dpath = self.dpath / key
+        if self.load(key) is None:
+            shutil.rmtree(entry_dpath, ignore_errors=True)
+            try:
+                os.replace(tmp_dpath, entry_dpath)
+            except OSError:
+                shutil.rmtree(tmp_dpath, ignore_errors=True)
+        else:
+            # Another worker stored the same entry first.
+            shutil.rmtree(tmp_dpath, ignore_errors=True)
+        return [entry_dpath / fname for fname in fnames]
+
+
+def _doctest_source(doctest):
+    """
+    The code an xdoctest example executes, independent of how the docstring
+    around it was reformatted by napoleon.
+    """
+    return '\n'.join(part.source for part in doctest._parts)
+
+
+# Runs one figure doctest in a fresh interpreter. Argument: a json job from
+# :func:`collect_figure_jobs` plus the ``dpath`` to write figures into.
+_FIGURE_WORKER_CODE = """
+import json
+import sys
+
+job = json.loads(sys.argv[1])
+sys.argv[1:] = ['--show', '--nointeract']
+
+import kwplot
+import xdoctest.core
+from xdoctest.exceptions import Skipped
+
+kwplot.autompl(force='agg')
+for doctest in xdoctest.core.parse_doctestables(job['modpath'], analysis='static'):
+    if doctest.callname == job['callname'] and doctest.num == job['num']:
+        break
+else:
+    sys.exit('doctest not found')
+doctest.mode = 'native'
+try:
+    doctest.run(verbose=0, on_error='raise')
+except Skipped:
+    pass
+fnames = []
+for idx, fig in enumerate(kwplot.all_figures(), start=1):
+    fname = f'fig_{idx:03d}.jpeg'
+    fig.savefig(f"{job['dpath']}/{fname}")
+    fnames.append(fname)
+with open(f"{job['dpath']}/figures.json", 'w') as file:
+    json.dump(fnames, file)
+"""
+
+
+def _autodoc_modnames(env, docnames):
+    """Modules named by ``automodule`` directives in the given documents."""
+    import pathlib
+    import re
+
+    pattern = re.compile(r'^\s*\.\.\s+automodule::\s+(\S+)', flags=re.MULTILINE)
+    modnames = []
+    for docname in sorted(docnames):
+        try:
+            text = pathlib.Path(env.doc2path(docname)).read_text()
+        except OSError:
+            continue
+        for modname in pattern.findall(text):
+            if modname not in modnames:
+                modnames.append(modname)
+    return modnames
+
+
+def collect_figure_jobs(modnames, figure_cache):
+    """
+    Statically find the figure-producing doctests in ``modnames`` that do not
+    have cached figures yet.
+
+    Returns:
+        List[Dict]: jobs for :func:`render_figure_jobs`
+    """
+    import pathlib
+
+    import xdoctest.core
+    import xdoctest.static_analysis
+
+    jobs = []
+    seen = set()
+    for modname in modnames:
+        modpath = xdoctest.static_analysis.modname_to_modpath(modname)
+        if modpath is None:
+            continue
+        modpath = pathlib.Path(modpath)
+        if modpath.is_dir():
+            modpath = modpath / '__init__.py'
+        doctests = xdoctest.core.parse_doctestables(
+            str(modpath), analysis='static'
+        )
+        for doctest in doctests:
+            if '--show' not in doctest.docsrc:
+                continue
+            key = figure_cache.key(modpath, _doctest_source(doctest))
+            if key in seen or figure_cache.load(key) is not None:
+                continue
+            seen.add(key)
+            jobs.append(
+                {
+                    'modpath': str(modpath),
+                    'callname': doctest.callname,
+                    'num': doctest.num,
+                    'key': key,
+                }
+            )
+    return jobs
+
+
+def render_figure_jobs(
+    jobs, figure_cache, workers=None, timeout=None, budget=None, timer=None
+):
+    """
+    Run each job in its own agg-backed python process, at most ``workers`` at
+    a time, and store the figures of successful runs in ``figure_cache``.
+    A process that runs longer than ``timeout`` seconds is killed, and jobs
+    that have not started ``budget`` seconds after the first one are skipped.
+
+    Returns:
+        Dict[str, int]: number of jobs that were rendered, failed, timed out,
+        or skipped
+    """
+    import concurrent.futures
+    import contextlib
+    import functools
+    import json
+    import os
+    import pathlib
+    import shutil
+    import subprocess
+    import sys
+    import tempfile
+    import time
+
+    start_time = time.monotonic()
+
+    def render(job):
+        if budget is not None and time.monotonic() - start_time > budget:
+            return 'skipped'
+        if timer is None:
+            timing = contextlib.nullcontext()
+        else:
+            label = f'{job["modpath"]}::{job["callname"]}'
+            timing = timer.timeit('figure', label)
+        with timing, tempfile.TemporaryDirectory() as dpath:
+            dpath = pathlib.Path(dpath)
+            argv = [
+                sys.executable,
+                '-c',
+                _FIGURE_WORKER_CODE,
+                json.dumps({**job, 'dpath': os.fspath(dpath)}),
+            ]
+            try:
+                proc = subprocess.run(
+                    argv, capture_output=True, text=True, timeout=timeout
+                )
+            except subprocess.TimeoutExpired:
+                print(f'Timeout rendering figures for {job["callname"]}')
+                return 'timeout'
+            if proc.returncode != 0:
+                print(f'Error rendering figures for {job["callname"]}')
+                print(proc.stderr)
+                return 'failed'
+            fnames = json.loads((dpath / 'figures.json').read_text())
+            savers = [functools.partial(shutil.copy, dpath / f) for f in fnames]
+            figure_cache.store(job['key'], savers)
+            return 'rendered'
+
+    counts = {'rendered': 0, 'failed': 0, 'timeout': 0, 'skipped': 0}
+    if not jobs:
+        return counts
+    max_workers = workers or os.cpu_count() or 1
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        for outcome in executor.map(render, jobs):
+            counts[outcome] += 1
+    return counts
+
+
+def _prerender_doctest_figures(app, env, docnames):
+    if not RENDER_DOC_IMAGES or app.config.doctest_figure_workers == 0:
+        return
+    figure_cache = DoctestFigureCache.for_app(app)
+    modnames = _autodoc_modnames(env, docnames)
+    jobs = collect_figure_jobs(modnames, figure_cache)
+    counts = render_figure_jobs(
+        jobs,
+        figure_cache,
+        workers=app.config.doctest_figure_workers,
+        timeout=app.config.doctest_figure_timeout,
+        budget=app.config.doctest_figure_budget,
+        timer=getattr(app, 'conf_ext_timer', None),
+    )
+    if jobs:
+        print(
+            'Rendered doctest figures: {rendered} ok, {failed} failed, '
+            '{timeout} timed out, {skipped} skipped'.format(**counts)
+        )
+
+
+def _run_figure_doctest_within_budget(app, doctest, figure_cache, key):
+    """
+    Run a figure doctest inline unless this process already spent
+    ``doctest_figure_budget`` seconds on figures.
+    """
+    import time
+
+    budget = app.config.doctest_figure_budget
+    spent = getattr(app, 'doctest_figure_seconds', 0.0)
+    if budget is not None and spent > budget:
+        print(f'Skip doctest={doctest}: doctest_figure_budget exceeded')
+        return []
+    start_time = time.monotonic()
+    try:
+        return _run_figure_doctest(doctest, figure_cache, key)
+    finally:
+        app.doctest_figure_seconds = spent + time.monotonic() - start_time
+
+
+class BuildTimer:
+    """
+    Per-object timings of the extension hooks.
+
+    Every process (including parallel Sphinx workers and the figure pre-pass
+    threads) appends ``[kind, docname, name, seconds]`` records to its own
+    JSON-lines file in ``dpath``; :meth:`summarize` merges them.
+
+    Example:
+        >>> import tempfile
+        >>> timer = BuildTimer(tempfile.mkdtemp())
+        >>> timer.reset()
+        >>> timer.record('docstring', 'index', 'mod.func', 0.25)
+        >>> timer.record('hyperlinks', 'index', 'index', 0.5)
+        >>> timer.record('figure', None, 'mod.py::func', 2.0)
+        >>> timer.close()
+        >>> summary = timer.summarize(top=2)
+        >>> summary['totals']
+        {'docstring': 0.25, 'figure': 2.0, 'hyperlinks': 0.5}
+        >>> summary['documents']
+        [['index', 0.75]]
+        >>> print(timer.format_report(summary))
+        Extension build time (seconds)
+            docstring      0.250  (1 objects)
+            figure         2.000  (1 objects)
+            hyperlinks     0.500  (1 objects)
+        Slowest objects
+              2.000  figure      mod.py::func
+              0.500  hyperlinks  index
+        Slowest documents
+              0.750  index
+    """
+
+    def __init__(self, dpath):
+        import pathlib
+        import threading
+
+        self.dpath = pathlib.Path(dpath)
+        self._lock = threading.Lock()
+        self._file = None
+        self._pid = None
+
+    @classmethod
+    def for_app(cls, app):
+        import pathlib
+
+        return cls(pathlib.Path(app.doctreedir).parent / 'conf_ext_timings')
+
+    def reset(self):
+        import shutil
+
+        shutil.rmtree(self.dpath, ignore_errors=True)
+        self.dpath.mkdir(parents=True, exist_ok=True)
+        self._file = self._pid = None
+
+    def record(self, kind, docname, name, seconds):
+        import json
+        import os
+
+        with self._lock:
+            pid = os.getpid()
+            if self._pid != pid:
+                # Forked workers must not share the parent's file object.
+                fpath = self.dpath / f'{pid}.jsonl'
+                self._file = open(fpath, 'a', buffering=1, encoding='utf8')
+                self._pid = pid
+            self._file.write(json.dumps([kind, docname, name, seconds]) + '\n')
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+            self._file = self._pid = None
+
+    def timeit(self, kind, name, docname=None):
+        import contextlib
+        import time
+
+        @contextlib.contextmanager
+        def _timing():
+            start_time = time.perf_counter()
+            try:
+                yield
+            finally:
+                elapsed = time.perf_counter() - start_time
+                self.record(kind, docname, name, elapsed)
+
+        return _timing()
+
+    def records(self):
+        import json
+
+        records = []
+        for fpath in sorted(self.dpath.glob('*.jsonl')):
+            for line in fpath.read_text().splitlines():
+                if line:
+                    records.append(json.loads(line))
+        return records
+
+    def summarize(self, top=10):
+        """
+        Returns:
+            Dict: total seconds per kind, the slowest objects, and the
+            slowest documents
+        """
+        totals = {}
+        counts = {}
+        per_object = {}
+        per_doc = {}
+        for kind, docname, name, seconds in self.records():
+            totals[kind] = totals.get(kind, 0.0) + seconds
+            counts[kind] = counts.get(kind, 0) + 1
+            key = (kind, name)
+            per_object[key] = per_object.get(key, 0.0) + seconds
+            if docname is not None:
+                per_doc[docname] = per_doc.get(docname, 0.0) + seconds
+        objects = sorted(per_object.items(), key=lambda item: -item[1])
+        documents = sorted(per_doc.items(), key=lambda item: -item[1])
+        return {
+            'totals': dict(sorted(totals.items())),
+            'counts': dict(sorted(counts.items())),
+            'objects': [
+                [kind, name, sec] for (kind, name), sec in objects[:top]
+            ],
+            'documents': [[docname, sec] for docname, sec in documents[:top]],
+        }
+
+    @staticmethod
+    def format_report(summary):
+        lines = ['Extension build time (seconds)']
+        for kind, seconds in summary['totals'].items():
+            count = summary['counts'][kind]
+            lines.append(f'    {kind:<12} {seconds:7.3f}  ({count} objects)')
+        lines.append('Slowest objects')
+        for kind, name, seconds in summary['objects']:
+            lines.append(f'    {seconds:7.3f}  {kind:<10}  {name}')
+        lines.append('Slowest documents')
+        for docname, seconds in summary['documents']:
+            lines.append(f'    {seconds:7.3f}  {docname}')
+        return '\n'.join(lines)
+
+
+def _timeit(app, kind, name, docname=None):
+    import contextlib
+
+    timer = getattr(app, 'conf_ext_timer', None)
+    if timer is None:
+        return contextlib.nullcontext()
+    if docname is None:
+        docname = app.env.docname
+    return timer.timeit(kind, name, docname=docname)
+
+
+def _init_build_timer(app):
+    app.conf_ext_timer = None
+    if app.config.conf_ext_timing:
+        app.conf_ext_timer = BuildTimer.for_app(app)
+        app.conf_ext_timer.reset()
+
+
+def _report_build_timings(app, exception):
+    import json
+    import pathlib
+
+    timer = getattr(app, 'conf_ext_timer', None)
+    if timer is None:
+        return
+    timer.close()
+    summary = timer.summarize(top=app.config.conf_ext_timing_top)
+    if not summary['totals']:
+        return
+    print(timer.format_report(summary))
+    json_fpath = app.config.conf_ext_timing_json
+    if json_fpath:
+        json_fpath = timer.dpath.parent / pathlib.Path(json_fpath)
+        json_fpath.write_text(json.dumps(summary, indent=2))
+        print(f'Wrote extension timings to {json_fpath}')
+
+
+def _postprocess_hyperlinks_timed(app, doctree, docname):
+    with _timeit(app, 'hyperlinks', docname, docname=docname):
+        postprocess_hyperlinks(app, doctree, docname)
+
+
+def _run_figure_doctest(doctest, figure_cache, key):
+    """
+    Run a doctest with the agg backend and return paths to the figures it
+    made. Figures are only cached when the doctest ran without an error.
+    """
+    import kwplot
+
+    kwplot.autompl(force='agg')
+    plt = kwplot.autoplt()
+
+    # print('-- SHOW TEST---')/)
+    # kwplot.close_figures()
+    try:
+        import pytest  # NOQA
+    except ImportError:
+        pass
+    try:
+        from xdoctest.exceptions import Skipped
+    except ImportError:  # nocover
+        # Define dummy skipped exception if pytest is not available
+        class Skipped(Exception):
+            pass
+
+    cacheable = True
+    try:
+        doctest.mode = 'native'
+        doctest.run(verbose=0, on_error='raise')
+        ...
+    except Skipped:
+        print(f'Skip doctest={doctest}')
+    except Exception as ex:
+        cacheable = False
+        print(f'ex={ex}')
+        print(f'Error in doctest={doctest}')
+
+    figures = kwplot.all_figures()
+    savers = [fig.savefig for fig in figures]
+    fpaths = figure_cache.store(key, savers, record=cacheable)
+    for fpath in fpaths:
+        print(f'Wrote figure: {fpath}')
+    for fig in figures:
+        plt.close(fig)
+    # kwplot.close_figures(figures)
+    return fpaths
+
+
+def _copy_if_changed(src, dst):
+    """Copy ``src`` to ``dst`` unless it already has the same bytes."""
+    import shutil
+
+    if dst.exists() and dst.read_bytes() == src.read_bytes():
+        return
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy(src, dst)
+
+
+# Per-document state kept on the Sphinx environment. It is pickled with the
+# environment between builds and handed back by parallel read workers
+# through ``env-merge-info``.
+_DOC_STATE_ATTRS = (
+    'doctest_figure_cache_stats',
+    'docstring_memo_stats',
+    'docstring_memo',
+)
+
+
+def _doc_state(env, attr):
+    state = getattr(env, attr, None)
+    if state is None:
+        state = {}
+        setattr(env, attr, state)
+    return state
+
+
+def _count_doc_event(env, attr, outcome):
+    counts = _doc_state(env, attr).setdefault(
+        env.docname, {'hit': 0, 'miss': 0}
+    )
+    counts[outcome] += 1
+
+
+def _figure_cache_stats(env):
+    return _doc_state(env, 'doctest_figure_cache_stats')
+
+
+def _figure_cache_count(app, outcome):
+    _count_doc_event(app.env, 'doctest_figure_cache_stats', outcome)
+
+
+def _before_read_docs(app, env, docnames):
+    env.doctest_figure_cache_stats = {}
+    env.docstring_memo_stats = {}
+    # Documents about to be reread start a fresh memo, but may reuse the
+    # entries of their previous read.
+    memo = _doc_state(env, 'docstring_memo')
+    env.docstring_memo_previous = {
+        docname: memo.pop(docname) for docname in docnames if docname in memo
+    }
+
+
+def _purge_doc_state(app, env, docname):
+    _doc_state(env, 'docstring_memo').pop(docname, None)
+
+
+def _merge_doc_state(app, env, docnames, other):
+    for attr in _DOC_STATE_ATTRS:
+        state = _doc_state(env, attr)
+        other_state = _doc_state(other, attr)
+        for docname in docnames:
+            if docname in other_state:
+                state[docname] = other_state[docname]
+
+
+def _after_read_docs(app, env):
+    # Only the entries reused by this build are kept.
+    env.docstring_memo_previous = {}
+    return []
+
+
+def _report_doc_stats(app, exception):
+    reports = [('Doctest figure cache', 'doctest_figure_cache_stats')]
+    if app.config.docstring_memo_debug:
+        reports.append(('Docstring memo', 'docstring_memo_stats'))
+    for label, attr in reports:
+        stats = _doc_state(app.env, attr)
+        if not stats:
+            continue
+        hits = sum(counts['hit'] for counts in stats.values())
+        misses = sum(counts['miss'] for counts in stats.values())
+        print(f'{label}: {hits} hits, {misses} misses')
+
+
 def create_doctest_figure(app, obj, name, lines):
     """
     The idea is that each doctest that produces a figure should generate that
     and then that figure should be part of the docs.
+
+    Figures normally come from the cache filled by the pre-pass, a thread
+    pool of per-doctest subprocesses (:func:`_prerender_doctest_figures`).
+    Doctests only run here, in the Sphinx process, when
+    ``doctest_figure_workers = 0``.
     """
     import sys
     import types
@@ -458,10 +1141,7 @@ def create_doctest_figure(app, obj, name, lines):
 
     fig_num = 1
 
-    import kwplot
-
-    kwplot.autompl(force='agg')
-    plt = kwplot.autoplt()
+    figure_cache = DoctestFigureCache.for_app(app)
 
     docstr = '\n'.join(lines)
 
@@ -517,44 +1197,32 @@ def create_doctest_figure(app, obj, name, lines):
 
         for doctest in doctests:
             if '--show' in part:
-                ...
-                # print('-- SHOW TEST---')/)
-                # kwplot.close_figures()
-                try:
-                    import pytest  # NOQA
-                except ImportError:
-                    pass
-                try:
-                    from xdoctest.exceptions import Skipped
-                except ImportError:  # nocover
-                    # Define dummy skipped exception if pytest is not available
-                    class Skipped(Exception):
-                        pass
-
-                try:
-                    doctest.mode = 'native'
-                    doctest.run(verbose=0, on_error='raise')
-                    ...
-                except Skipped:
-                    print(f'Skip doctest={doctest}')
-                except Exception as ex:
-                    print(f'ex={ex}')
-                    print(f'Error in doctest={doctest}')
+                key = figure_cache.key(modpath, _doctest_source(doctest))
+                cached_fpaths = figure_cache.load(key)
+                if cached_fpaths is not None:
+                    _figure_cache_count(app, 'hit')
+                elif app.config.doctest_figure_workers == 0:
+                    _figure_cache_count(app, 'miss')
+                    cached_fpaths = _run_figure_doctest_within_budget(
+                        app, doctest, figure_cache, key
+                    )
+                else:
+                    # The pre-pass failed or timed out on this doctest.
+                    _figure_cache_count(app, 'miss')
+                    cached_fpaths = []
 
                 offsets = doctest_line_offsets(doctest)
                 doctest_line_end = curr_line_offset + offsets['stop']
                 insert_line_index = doctest_line_end
 
-                figures = kwplot.all_figures()
-                for fig in figures:
+                for cached_fpath in cached_fpaths:
                     fig_num += 1
                     # path_name = path_sanatize(name)
                     path_name = (name).replace('.', '_')
                     fig_fpath = (
                         src_fig_dpath / f'fig_{path_name}_{fig_num:03d}.jpeg'
                     )
-                    fig.savefig(fig_fpath)
-                    print(f'Wrote figure: {fig_fpath}')
+                    _copy_if_changed(cached_fpath, fig_fpath)
                     to_insert_fpaths.append(
                         {
                             'insert_line_index': insert_line_index,
@@ -562,10 +1230,6 @@ def create_doctest_figure(app, obj, name, lines):
                         }
                     )
 
-                for fig in figures:
-                    plt.close(fig)
-                # kwplot.close_figures(figures)
-
         curr_line_offset += num_lines
 
     # if len(doctests) > 1:
@@ -578,8 +1242,6 @@ def create_doctest_figure(app, obj, name, lines):
 
     end_index = len(lines)
     # Reverse order for inserts
-    import shutil
-
     for info in to_insert_fpaths[::-1]:
         src_abs_fpath = info['fpath']
 
@@ -590,16 +1252,13 @@ def create_doctest_figure(app, obj, name, lines):
         rel_to_root_fpath = src_abs_fpath.relative_to(doc_srcdir)
 
         dst_abs_fpath1 = doc_outdir / rel_to_root_fpath
-        dst_abs_fpath1.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy(src_abs_fpath, dst_abs_fpath1)
+        _copy_if_changed(src_abs_fpath, dst_abs_fpath1)
 
         dst_abs_fpath2 = doc_outdir / rel_to_static_fpath
-        dst_abs_fpath2.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy(src_abs_fpath, dst_abs_fpath2)
+        _copy_if_changed(src_abs_fpath, dst_abs_fpath2)
 
         dst_abs_fpath3 = doc_srcdir / rel_to_static_fpath
-        dst_abs_fpath3.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy(src_abs_fpath, dst_abs_fpath3)
+        _copy_if_changed(src_abs_fpath, dst_abs_fpath3)
 
         if INSERT_AT == 'inline':
             # Try to insert after test
@@ -642,6 +1301,48 @@ def postprocess_hyperlinks(app, doctree, docname):
                     raise AssertionError
 
 
+def _use_intersphinx_mirror(app, config):
+    """
+    Refresh the inventory mirror (see ``intersphinx_mirror.py``) and point
+    ``intersphinx_mapping`` entries at their mirrored inventory, falling back
+    to the remote one. Offline builds skip the refresh and drop the entries
+    without a copy. Sphinx rereads every document when the mapping changes,
+    so incremental builds need a mirror at a stable path.
+    """
+    intersphinx_mapping = getattr(config, 'intersphinx_mapping', None)
+    if not intersphinx_mapping:
+        return
+    # The generated conf.py is intersphinx_mirror.py followed by this file,
+    # so InventoryMirror is a module global there rather than an import.
+    InventoryMirror = globals()['InventoryMirror']
+    mirror = InventoryMirror(
+        config.intersphinx_mirror, ttl=config.intersphinx_mirror_ttl
+    )
+    offline = config.intersphinx_offline
+    if not offline and config.intersphinx_mirror_refresh:
+        statuses = mirror.refresh_all(intersphinx_mapping)
+        if mirror.errors:
+            failed = {name: statuses[name] for name in mirror.errors}
+            print(mirror.format_report(failed))
+    mapping = {}
+    missing = []
+    for name, value in intersphinx_mapping.items():
+        if isinstance(value, (tuple, list)) and len(value) == 2:
+            fpath = mirror.local_fpath(name, value[0])
+            if fpath is not None:
+                value = (
+                    value[0],
+                    (str(fpath),) if offline else (str(fpath), None),
+                )
+            elif offline:
+                missing.append(name)
+                continue
+        mapping[name] = value
+    if missing:
+        print(f'Offline build: no mirrored inventory for {", ".join(missing)}')
+    config.intersphinx_mapping = mapping
+
+
 def fix_rst_todo_section(lines):
     # new_lines = []
     for line in lines:
@@ -650,13 +1351,60 @@ def fix_rst_todo_section(lines):
 
 
 def setup(app):
+    """
+    Register the docstring, domain, and hyperlink hooks.
+
+    Every hook is safe to run in parallel Sphinx workers: the docstring and
+    hyperlink callbacks only modify the lines / doctree they are given, the
+    docstring processor registry is read-only once built, the patched domain
+    inherits ``PythonDomain.merge_domaindata``, and doctest figures are
+    written to paths unique to the documented object.
+    """
+    import os
+
     import sphinx
     import sphinx.application
 
     app: sphinx.application.Sphinx = app
     app.add_domain(PatchedPythonDomain, override=True)
 
-    app.connect('doctree-resolved', postprocess_hyperlinks)
+    app.connect('doctree-resolved', _postprocess_hyperlinks_timed)
+
+    # Number of processes rendering doctest figures before documents are
+    # read (None means one per CPU, 0 runs doctests inline while reading) and
+    # the number of seconds a single figure doctest may run.
+    app.add_config_value('doctest_figure_workers', None, '')
+    app.add_config_value('doctest_figure_timeout', 120, '')
+    # Stop rendering doctest figures after this many seconds in total.
+    app.add_config_value('doctest_figure_budget', None, '')
+    # Time the hooks per object and document and print the slowest ones at
+    # the end of the build, optionally also as JSON (relative to the build
+    # directory).
+    app.add_config_value('conf_ext_timing', True, '')
+    app.add_config_value('conf_ext_timing_top', 10, '')
+    app.add_config_value('conf_ext_timing_json', None, '')
+    app.connect('builder-inited', _init_build_timer)
+    # Print docstring memo hits / misses at the end of the build.
+    app.add_config_value('docstring_memo_debug', False, '')
+    app.connect('env-before-read-docs', _before_read_docs)
+    app.connect('env-before-read-docs', _prerender_doctest_figures)
+    app.connect('env-purge-doc', _purge_doc_state)
+    app.connect('env-merge-info', _merge_doc_state)
+    app.connect('env-updated', _after_read_docs)
+    app.connect('build-finished', _report_doc_stats)
+    app.connect('build-finished', _report_build_timings)
+    # Read intersphinx inventories from a local mirror, refreshing entries
+    # older than ``intersphinx_mirror_ttl`` seconds. Offline builds never
+    # fetch. See ``intersphinx_mirror.py``.
+    app.add_config_value('intersphinx_mirror', None, '')
+    app.add_config_value('intersphinx_mirror_ttl', None, '')
+    app.add_config_value('intersphinx_mirror_refresh', True, '')
+    app.add_config_value(
+        'intersphinx_offline',
+        os.environ.get('XCOOKIE_DOCS_OFFLINE', '') not in {'', '0'},
+        '',
+    )
+    app.connect('config-inited', _use_intersphinx_mirror, priority=400)
 
     docstring_processor = GoogleStyleDocstringProcessor()
     # https://stackoverflow.com/questions/26534184/can-sphinx-ignore-certain-tags-in-python-docstrings
@@ -691,4 +1439,21 @@ def setup(app):
         src_fpath = mod_dpath / 'coco_schema_informal.rst'
         copy(src_fpath, doc_outdir / src_fpath.name)
         copy(src_fpath, doc_srcdir / src_fpath.name)
-    return app
+    return {
+        'parallel_read_safe': True,
+        'parallel_write_safe': True,
+    }
+
+
+if __name__ == '__main__':
+    # Refresh the inventory mirror, e.g. before an offline build:
+    # python docs/source/conf.py --fetch-intersphinx
+    import sys
+
+    if '--fetch-intersphinx' in sys.argv:
+        # Both names are module globals of the generated conf.py, which
+        # concatenates the conf template, intersphinx_mirror.py and this file.
+        mirror = globals()['InventoryMirror']()
+        statuses = mirror.refresh_all(globals()['intersphinx_mapping'])
+        print(mirror.format_report(statuses))
+        sys.exit(1 if mirror.errors else 0)
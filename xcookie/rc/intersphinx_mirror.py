@@ -0,0 +1,173 @@
+# Shared on-disk mirror of the intersphinx inventories. This file is inserted
+# into the generated ``docs/source/conf.py`` ahead of ``conf_ext.py`` and is
+# imported by ``xcookie docs-inventories``, so it only uses the stdlib.
+
+# Revalidate a mirrored inventory this many seconds after it was last checked.
+INTERSPHINX_MIRROR_TTL = 7 * 24 * 60 * 60
+
+
+def intersphinx_mirror_dpath(dpath=None):
+    """
+    Directory holding local copies of the intersphinx inventories, named
+    ``<project>.inv``. Defaults to ``$XCOOKIE_INTERSPHINX_MIRROR``, then to
+    ``xcookie/intersphinx`` in the user cache directory.
+    """
+    import os
+    import pathlib
+
+    if dpath is None:
+        dpath = os.environ.get('XCOOKIE_INTERSPHINX_MIRROR') or None
+    if dpath is None:
+        cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser(
+            '~/.cache'
+        )
+        dpath = pathlib.Path(cache_home) / 'xcookie' / 'intersphinx'
+    return pathlib.Path(dpath)
+
+
+class InventoryMirror:
+    """
+    Local copies of intersphinx ``objects.inv`` files shared by every docs
+    build on the machine. Each ``<name>.inv`` has a ``<name>.json`` sidecar
+    with its url, the ``ETag`` / ``Last-Modified`` validators, and the time it
+    was last checked. Entries older than ``ttl`` seconds are revalidated with
+    a conditional request, so an unchanged inventory is not downloaded again.
+
+    Example:
+        >>> import tempfile
+        >>> mirror = InventoryMirror(tempfile.mkdtemp(), ttl=60)
+        >>> url = 'https://docs.python.org/3'
+        >>> mirror.local_fpath('python', url) is None
+        True
+        >>> mirror._store('python', url, b'inv', {'ETag': '"abc"'})
+        >>> mirror.local_fpath('python', url).read_bytes()
+        b'inv'
+        >>> mirror.refresh('python', url)  # checked less than ttl ago
+        'fresh'
+        >>> # A project that maps the same name elsewhere does not use it
+        >>> mirror.local_fpath('python', 'https://example.com') is None
+        True
+    """
+
+    def __init__(self, dpath=None, ttl=None):
+        self.dpath = intersphinx_mirror_dpath(dpath)
+        self.ttl = INTERSPHINX_MIRROR_TTL if ttl is None else ttl
+        self.errors = {}
+
+    @staticmethod
+    def inventory_url(url):
+        return url.rstrip('/') + '/objects.inv'
+
+    def _meta_fpath(self, name):
+        return self.dpath / f'{name}.json'
+
+    def _read_meta(self, name):
+        import json
+
+        try:
+            return json.loads(self._meta_fpath(name).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, fpath, data):
+        import os
+
+        tmp_fpath = fpath.with_name(f'.{fpath.name}.{os.getpid()}')
+        tmp_fpath.write_bytes(data)
+        os.replace(tmp_fpath, fpath)
+
+    def _write_meta(self, name, meta):
+        import json
+
+        self._write(self._meta_fpath(name), json.dumps(meta).encode('utf8'))
+
+    def _store(self, name, url, data, headers):
+        import time
+
+        self.dpath.mkdir(parents=True, exist_ok=True)
+        self._write(self.dpath / f'{name}.inv', data)
+        meta = {
+            'url': self.inventory_url(url),
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'checked': time.time(),
+        }
+        self._write_meta(name, meta)
+
+    def local_fpath(self, name, url):
+        """Path of the mirrored inventory for ``url`` or None."""
+        fpath = self.dpath / f'{name}.inv'
+        if not fpath.exists():
+            return None
+        recorded = self._read_meta(name).get('url')
+        if recorded is not None and recorded != self.inventory_url(url):
+            return None
+        return fpath
+
+    def refresh(self, name, url, force=False, timeout=30):
+        """
+        Bring one inventory up to date. Returns ``'fresh'`` when it was checked
+        within the ttl, ``'not-modified'`` when the server confirmed the copy,
+        ``'fetched'`` when it was downloaded, or ``'failed'``.
+        """
+        import time
+        import urllib.error
+        import urllib.request
+
+        meta = self._read_meta(name)
+        if self.local_fpath(name, url) is None:
+            meta = {}
+        elif not force and time.time() - meta.get('checked', 0) < self.ttl:
+            return 'fresh'
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        request = urllib.request.Request(
+            self.inventory_url(url), headers=headers
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                data = response.read()
+                response_headers = response.headers
+        except urllib.error.HTTPError as ex:
+            if ex.code != 304:
+                self.errors[name] = str(ex)
+                return 'failed'
+            meta['checked'] = time.time()
+            self._write_meta(name, meta)
+            return 'not-modified'
+        except OSError as ex:
+            self.errors[name] = str(ex)
+            return 'failed'
+        self._store(name, url, data, response_headers)
+        return 'fetched'
+
+    def refresh_all(self, mapping, force=False, workers=8, timeout=30):
+        """
+        Refresh every ``intersphinx_mapping`` entry concurrently and return a
+        dictionary mapping each name to its :meth:`refresh` status.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        entries = {
+            name: value[0]
+            for name, value in mapping.items()
+            if isinstance(value, (tuple, list)) and value
+        }
+        with ThreadPoolExecutor(max(1, workers)) as executor:
+            futures = {
+                name: executor.submit(self.refresh, name, url, force, timeout)
+                for name, url in entries.items()
+            }
+        return {name: future.result() for name, future in futures.items()}
+
+    def format_report(self, statuses):
+        lines = []
+        for name, status in statuses.items():
+            line = f'{name:<20} {status}'
+            if name in self.errors:
+                line += f': {self.errors[name]}'
+            lines.append(line)
+        return '\n'.join(lines)
@@ -1,11 +1,61 @@
 from __future__ import annotations
 
+import copy
+import dataclasses
+import functools
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import ubelt as ub
 from packaging.version import parse as Version
 
+from xcookie.vcs.git_meta import find_git_root, read_git_config
+
+if TYPE_CHECKING:
+    from packaging.version import Version as ParsedVersion
+
+    from xcookie.template_registry import TemplateContext
+
+#: Config keys the resolved snapshot is derived from. A
+#: :class:`~xcookie.main.TemplateApplier` makes these read-only once it has
+#: taken its snapshot.
+SNAPSHOT_KEYS = (
+    'repodir',
+    'repo_name',
+    'mod_name',
+    'pkg_name',
+    'rel_mod_parent_dpath',
+    'tags',
+    'os',
+    'is_new',
+    'rotate_secrets',
+    'refresh_docs',
+    'author',
+    'author_email',
+    'license',
+    'version',
+    'description',
+    'supported_python_versions',
+    'min_python',
+    'max_python',
+    'main_python',
+    'ci_cpython_versions',
+    'ci_pypy_versions',
+    'ci_versions_full_loose',
+    'ci_versions_full_strict',
+    'ci_versions_minimal_loose',
+    'ci_versions_minimal_strict',
+    'use_uv',
+)
+
+#: Maps CI install-extra variants to the config key choosing their versions.
+_CI_EXTRA_VERSION_KEYS = {
+    'full-loose': ('ci_versions_full_loose', '*'),
+    'full-strict': ('ci_versions_full_strict', 'main'),
+    'minimal-loose': ('ci_versions_minimal_loose', 'main'),
+    'minimal-strict': ('ci_versions_minimal_strict', 'min'),
+}
+
 
 @dataclass(frozen=True)
 class ResolvedXCookieConfig:
@@ -16,6 +66,10 @@ class ResolvedXCookieConfig:
     ``XCookieConfig.__post_init__`` so downstream code can depend on explicit
     resolved values instead of knowing which config fields may still be
     ``None`` or ``"auto"``.
+
+    Values derived from the snapshot (the tag set, parsed Python versions,
+    CI platform info, and the template context) are computed on first use
+    and then reused.
     """
 
     repodir: ub.Path
@@ -40,11 +94,16 @@ class ResolvedXCookieConfig:
     ci_cpython_versions: tuple[str, ...]
     ci_pypy_versions: tuple[str, ...]
     use_uv: bool
+    min_python: str
+    max_python: str | None
+    main_python: str
+    # Pairs of CI install-extra variant and its version spec (e.g. "main").
+    ci_extra_version_specs: tuple[tuple[str, Any], ...]
 
     @classmethod
     def from_config(cls, config: Any) -> ResolvedXCookieConfig:
         """Resolve the mutable scriptconfig object into explicit values."""
-        repodir = _resolve_repodir(config['repodir'])
+        repodir = resolve_repodir(config['repodir'])
         tags = _normalize_tags(config['tags'])
         os_values = _normalize_os(config['os'])
 
@@ -80,7 +139,7 @@ class ResolvedXCookieConfig:
             if 'erotemic' in tags:
                 author = 'Jon Crall'
             else:
-                author = ub.cmd('git config user.name')['out'].strip()
+                author = read_git_config(repodir).get('user.name', '')
                 if author == 'joncrall':
                     author = 'Jon Crall'
 
@@ -93,7 +152,7 @@ class ResolvedXCookieConfig:
             if 'erotemic' in tags:
                 author_email = 'erotemic@gmail.com'
             else:
-                author_email = ub.cmd('git config user.email')['out'].strip()
+                author_email = read_git_config(repodir).get('user.email', '')
 
         version = config['version']
         if version is None:
@@ -137,6 +196,12 @@ class ResolvedXCookieConfig:
             use_uv = Version(min_python) >= Version('3.8')
         use_uv = bool(use_uv)
 
+        max_python = config.get('max_python', None)
+        ci_extra_version_specs = tuple(
+            (variant, config.get(key, default))
+            for variant, (key, default) in _CI_EXTRA_VERSION_KEYS.items()
+        )
+
         return cls(
             repodir=repodir,
             repo_name=str(repo_name),
@@ -157,6 +222,10 @@ class ResolvedXCookieConfig:
             ci_cpython_versions=ci_cpython_versions,
             ci_pypy_versions=ci_pypy_versions,
             use_uv=use_uv,
+            min_python=str(config['min_python']),
+            max_python=None if max_python is None else str(max_python),
+            main_python=str(config.get('main_python', 'max')),
+            ci_extra_version_specs=ci_extra_version_specs,
         )
 
     @property
@@ -167,6 +236,43 @@ class ResolvedXCookieConfig:
     def mod_dpath(self) -> ub.Path:
         return self.repodir / self.rel_mod_dpath
 
+    @functools.cached_property
+    def tag_set(self) -> frozenset[str]:
+        return frozenset(self.tags)
+
+    @functools.cached_property
+    def min_python_version(self) -> ParsedVersion:
+        return Version(self.min_python)
+
+    @functools.cached_property
+    def max_python_version(self) -> ParsedVersion:
+        """The parsed ``max_python``, or 4.0 if it is unbounded."""
+        return Version(self.max_python or '4.0')
+
+    @functools.cached_property
+    def cpython_wheel_tags(self) -> tuple[str, ...]:
+        """cibuildwheel identifiers (e.g. ``cp311``) of the supported versions."""
+        return tuple(
+            'cp' + pyver.replace('.', '') for pyver in self.supported_python_versions
+        )
+
+    @functools.cached_property
+    def template_context(self) -> TemplateContext:
+        from xcookie.template_registry import TemplateContext
+
+        return TemplateContext.from_config(dataclasses.asdict(self))
+
+    @functools.cached_property
+    def platform_info(self) -> dict[str, Any]:
+        """
+        The CI platform info. Builders should use
+        :func:`xcookie.builders.common_ci.get_supported_platform_info`, which
+        returns a copy they are free to modify.
+        """
+        from xcookie.builders.common_ci import build_supported_platform_info
+
+        return build_supported_platform_info(self)
+
     def apply_to_config(self, config: Any) -> None:
         """Update a scriptconfig object with resolved compatibility values."""
         updates = {
@@ -194,12 +300,31 @@ class ResolvedXCookieConfig:
 
 
 def resolve_xcookie_config(config: Any) -> ResolvedXCookieConfig:
-    """Resolve and write back compatibility values for existing builders."""
+    """Resolve and write back compatibility values for existing builders.
+
+    The result is stored as ``config.resolved`` and returned again by later
+    calls until one of the :data:`SNAPSHOT_KEYS` values changes.
+    """
+    cached = getattr(config, 'resolved', None)
+    if cached is not None:
+        if getattr(config, '_resolved_values', None) == _snapshot_values(config):
+            return cached
     resolved = ResolvedXCookieConfig.from_config(config)
     resolved.apply_to_config(config)
+    try:
+        object.__setattr__(config, 'resolved', resolved)
+        object.__setattr__(config, '_resolved_values', _snapshot_values(config))
+    except AttributeError:
+        pass
     return resolved
 
 
+def _snapshot_values(config: Any) -> dict[str, Any]:
+    return {
+        key: copy.deepcopy(config[key]) for key in SNAPSHOT_KEYS if key in config
+    }
+
+
 def _coerce_meta_text(value: Any) -> str | list[str]:
     """Coerce metadata to text, preserving list structure."""
     if isinstance(value, (list, tuple)):
@@ -207,7 +332,7 @@ def _coerce_meta_text(value: Any) -> str | list[str]:
     return str(value)
 
 
-def _resolve_repodir(value: Any) -> ub.Path:
+def resolve_repodir(value: Any) -> ub.Path:
     if value is None:
         repodir = ub.Path.cwd()
     else:
@@ -338,18 +463,7 @@ def _coerce_tuple(value: Any) -> tuple[str, ...]:
 
 
 def _find_git_root(dpath: Any) -> ub.Path:
-    cwd = ub.Path(dpath).resolve()
-    parts = cwd.parts
-    found = None
-    for i in reversed(range(0, len(parts) + 1)):
-        subparts = parts[0:i]
-        if len(subparts) == 0:
-            break
-        path = ub.Path(*subparts)
-        candidate = path / '.git'
-        if candidate.exists():
-            found = path
-            break
+    found = find_git_root(dpath)
     if found is None:
         raise Exception('cannot find git root')
-    return found
+    return ub.Path(found)
@@ -1,10 +1,259 @@
 from __future__ import annotations
 
+import functools
+import hashlib
+import json
+import os
+import re
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
 from xcookie.template_registry import TemplateContext
 
+#: Directive commands understood by :class:`CompiledTemplate`.
+DIRECTIVE_COMMANDS = ('UNCOMMENT_IF', 'COMMENT_IF')
+
+#: Bump when the serialized :class:`CompiledTemplate` layout changes.
+COMPILED_TEMPLATE_VERSION = 1
+
 
 def apply_template_context(text: str, context: TemplateContext) -> str:
-    """Apply simple token substitutions without regex replacement semantics."""
-    for old, new in context.replacements().items():
-        text = text.replace(old, new)
-    return text
+    """Apply simple token substitutions without regex replacement semantics.
+
+    All tokens are replaced in one left-to-right pass, so substituted values
+    are never rescanned for other tokens.
+
+    Example:
+        >>> from xcookie.template_registry import TemplateContext
+        >>> context = TemplateContext('demo', 'xcookie_ext', 'demo', 'demo', '<AUTHOR>', '')
+        >>> apply_template_context('xcookie/<mod_name> by <AUTHOR>', context)
+        'demo/xcookie_ext by <AUTHOR>'
+    """
+    return TokenSubstituter.for_context(context)(text)
+
+
+class TokenSubstituter:
+    """Single-pass substitution of a fixed set of literal tokens.
+
+    At each position the longest matching token wins and matches never
+    overlap, so the result does not depend on the order of the mapping.
+    """
+
+    def __init__(self, replacements: Mapping[str, str]) -> None:
+        self.replacements = dict(replacements)
+        self.pattern = _token_regex(self.replacements)
+
+    @classmethod
+    def for_context(cls, context: TemplateContext) -> TokenSubstituter:
+        """Return the (memoized) substituter for a template context."""
+        return _substituter_for(context)
+
+    def __call__(self, text: str) -> str:
+        if self.pattern is None:
+            return text
+        lookup = self.replacements.__getitem__
+        return self.pattern.sub(lambda match: lookup(match.group()), text)
+
+
+@functools.lru_cache(maxsize=32)
+def _substituter_for(context: TemplateContext) -> TokenSubstituter:
+    return TokenSubstituter(context.replacements())
+
+
+def comment_line(line: str) -> str:
+    """
+    Example:
+        >>> comment_line('   def fds(): # hello')
+        '   # def fds(): # hello'
+        >>> uncomment_line(comment_line('   foobar'))
+        '   foobar'
+    """
+    return re.sub(r'^(\s*)([^\s])', r'\g<1># \g<2>', line)
+
+
+def uncomment_line(line: str) -> str:
+    return re.sub(r'^(\s*)#\s*', r'\g<1>', line, count=1)
+
+
+def _token_regex(tokens: Iterable[str]) -> re.Pattern[str] | None:
+    # Longest first so a token never shadows a longer one it prefixes.
+    ordered = sorted(set(tokens), key=lambda t: (-len(t), t))
+    if not ordered:
+        return None
+    return re.compile('|'.join(re.escape(t) for t in ordered))
+
+
+@dataclass
+class CompiledTemplate:
+    r"""A template split into literal text, tokens, and directive lines.
+
+    Directives and token positions are found once, so rendering for a tag
+    set and replacement mapping is a single join.
+
+    Segments are ``['s', text]`` literals, ``['t', token]`` substitution
+    tokens, and ``['d', line, [[name, args], ...]]`` lines carrying
+    ``COMMENT_IF`` / ``UNCOMMENT_IF`` directives.
+
+    Example:
+        >>> text = 'name: xcookie\n- pip install xcookie[cv2]  # xcookie: +COMMENT_IF(cv2)\n'
+        >>> compiled = CompiledTemplate.compile(text, ['xcookie'])
+        >>> print(compiled.render({'cv2'}, {'xcookie': 'demo'}))
+        name: demo
+        # - pip install demo[cv2]  # demo: +COMMENT_IF(cv2)
+        >>> print(compiled.render(set()))
+        name: xcookie
+        - pip install xcookie[cv2]  # xcookie: +COMMENT_IF(cv2)
+    """
+
+    tokens: tuple[str, ...]
+    segments: list[list[Any]] = field(default_factory=list)
+
+    @classmethod
+    def compile(
+        cls, text: str, tokens: Iterable[str], namespace: str = 'xcookie'
+    ) -> CompiledTemplate:
+        from xcookie.directive import DirectiveExtractor
+
+        self = cls(tuple(tokens))
+        extractor = DirectiveExtractor(namespace, list(DIRECTIVE_COMMANDS))
+        token_re = _token_regex(self.tokens)
+        scan_directives = extractor.may_contain(text)
+        literal: list[str] = []
+
+        def flush() -> None:
+            if literal:
+                self.segments.append(['s', ''.join(literal)])
+                literal.clear()
+
+        for index, line in enumerate(text.split('\n')):
+            if index:
+                literal.append('\n')
+            directives = extractor.extract(line) if scan_directives else []
+            if directives:
+                flush()
+                self.segments.append(
+                    ['d', line, [[d.name, list(d.args)] for d in directives]]
+                )
+                continue
+            prev = 0
+            if token_re is not None:
+                for match in token_re.finditer(line):
+                    literal.append(line[prev : match.start()])
+                    flush()
+                    self.segments.append(['t', match.group()])
+                    prev = match.end()
+            literal.append(line[prev:])
+        flush()
+        return self
+
+    def render(
+        self,
+        tags: Iterable[str],
+        replacements: Mapping[str, str] | TokenSubstituter | None = None,
+    ) -> str:
+        """Return the text for ``tags``, substituting tokens if given.
+
+        Pass a :class:`TokenSubstituter` (e.g. from
+        :meth:`TokenSubstituter.for_context`) to share one substituter across
+        every template rendered for a context. A plain mapping builds a new
+        one restricted to this template's tokens.
+        """
+        if not isinstance(tags, (set, frozenset)):
+            tags = frozenset(tags)
+        substitute = replacements
+        if replacements is not None and not isinstance(
+            replacements, TokenSubstituter
+        ):
+            substitute = TokenSubstituter(
+                {t: replacements[t] for t in self.tokens if t in replacements}
+            )
+        lookup = None if substitute is None else substitute.replacements
+        parts = []
+        for segment in self.segments:
+            kind = segment[0]
+            if kind == 's':
+                parts.append(segment[1])
+            elif kind == 't':
+                token = segment[1]
+                if lookup is None:
+                    parts.append(token)
+                else:
+                    parts.append(lookup.get(token, token))
+            else:
+                line = segment[1]
+                for name, args in segment[2]:
+                    if tags.issuperset(args):
+                        if name == 'COMMENT_IF':
+                            line = comment_line(line)
+                        elif name == 'UNCOMMENT_IF':
+                            line = uncomment_line(line)
+                if substitute is not None:
+                    line = substitute(line)
+                parts.append(line)
+        return ''.join(parts)
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            'version': COMPILED_TEMPLATE_VERSION,
+            'tokens': list(self.tokens),
+            'segments': self.segments,
+        }
+
+    @classmethod
+    def from_json(cls, data: Mapping[str, Any]) -> CompiledTemplate:
+        if data.get('version') != COMPILED_TEMPLATE_VERSION:
+            raise ValueError('stale compiled template')
+        return cls(tuple(data['tokens']), list(data['segments']))
+
+
+_COMPILED_MEMO: dict[str, CompiledTemplate] = {}
+
+
+def default_template_cache_dpath() -> Path:
+    """Directory holding compiled templates between runs."""
+    import ubelt as ub
+
+    return Path(ub.Path.appdir('xcookie', 'compiled_templates', type='cache'))
+
+
+def load_compiled_template(
+    fpath: os.PathLike[str],
+    tokens: Iterable[str],
+    cache_dpath: os.PathLike[str] | None = None,
+) -> CompiledTemplate:
+    """Compile the template at ``fpath``, reusing an earlier compile if possible.
+
+    Compiled templates are keyed by a hash of the file contents and the token
+    set, memoized in process, and stored as JSON in ``cache_dpath`` (the user
+    cache directory by default). An unreadable or stale cache entry is
+    recompiled, and failing to write the cache is not an error.
+    """
+    tokens = tuple(tokens)
+    raw = Path(fpath).read_bytes()
+    hasher = hashlib.sha256()
+    hasher.update(b'%d\0' % COMPILED_TEMPLATE_VERSION)
+    hasher.update('\0'.join(tokens).encode() + b'\0')
+    hasher.update(raw)
+    key = hasher.hexdigest()
+    compiled = _COMPILED_MEMO.get(key)
+    if compiled is not None:
+        return compiled
+
+    if cache_dpath is None:
+        cache_dpath = default_template_cache_dpath()
+    cache_fpath = Path(cache_dpath) / f'{key}.json'
+    try:
+        compiled = CompiledTemplate.from_json(json.loads(cache_fpath.read_text()))
+    except (OSError, ValueError, KeyError, TypeError):
+        compiled = CompiledTemplate.compile(raw.decode(), tokens)
+        try:
+            cache_fpath.parent.mkdir(parents=True, exist_ok=True)
+            tmp_fpath = cache_fpath.with_suffix(f'.{os.getpid()}.tmp')
+            tmp_fpath.write_text(json.dumps(compiled.to_json()))
+            os.replace(tmp_fpath, cache_fpath)
+        except OSError:
+            pass
+    _COMPILED_MEMO[key] = compiled
+    return compiled
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
 import os
-from collections.abc import Iterator, MutableMapping
+from collections.abc import Iterable, Iterator, MutableMapping, Sequence
 from dataclasses import dataclass, field
 from typing import Any, cast
 
 import ubelt as ub
 
 
-@dataclass
+@dataclass(slots=True)
 class TemplateInfo(MutableMapping[str, Any]):
-    """Typed record describing one generated template output."""
+    """Typed record describing one generated template output.
+
+    Fields live in ``__slots__``. The mapping interface is kept for builders
+    that still index records like dictionaries.
+    """
 
     fname: str | os.PathLike[str]
     template: bool = False
@@ -100,7 +104,72 @@ class TemplateInfo(MutableMapping[str, Any]):
         return data
 
     def tag_requirements_met(self, active_tags: set[str] | frozenset[str]) -> bool:
-        return not self.tags or set(active_tags).issuperset(self.tags)
+        return self.tags.issubset(active_tags)
+
+
+class TemplateRegistry(Sequence[TemplateInfo]):
+    """Template records with an inverted index from tag to records.
+
+    The records a tag set enables are computed once per distinct tag set.
+    Call :meth:`invalidate` after changing ``enabled`` or ``tags`` on a
+    record.
+
+    Example:
+        >>> registry = TemplateRegistry(coerce_template_infos([
+        >>>     {'fname': 'setup.py'},
+        >>>     {'fname': 'CMakeLists.txt', 'tags': 'binpy'},
+        >>>     {'fname': '.gitlab-ci.yml', 'tags': 'gitlab,binpy'},
+        >>>     {'fname': 'off.txt', 'enabled': False},
+        >>> ]))
+        >>> [str(info.fname) for info in registry.enabled({'binpy', 'github'})]
+        ['setup.py', 'CMakeLists.txt']
+        >>> [str(info.fname) for info in registry.with_tag('binpy')]
+        ['CMakeLists.txt', '.gitlab-ci.yml']
+    """
+
+    def __init__(self, infos: Iterable[TemplateInfo] = ()) -> None:
+        self._infos = list(infos)
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Rebuild the tag index and drop cached enabled sets."""
+        self._untagged: list[int] = []
+        self._by_tag: dict[str, list[int]] = {}
+        for index, info in enumerate(self._infos):
+            if not info.tags:
+                self._untagged.append(index)
+            for tag in info.tags:
+                self._by_tag.setdefault(tag, []).append(index)
+        self._enabled_cache: dict[frozenset[str], tuple[TemplateInfo, ...]] = {}
+
+    def __getitem__(self, index):  # type: ignore[override]
+        return self._infos[index]
+
+    def __len__(self) -> int:
+        return len(self._infos)
+
+    def __iter__(self) -> Iterator[TemplateInfo]:
+        return iter(self._infos)
+
+    def with_tag(self, tag: str) -> list[TemplateInfo]:
+        """Return the records that require ``tag``, in registry order."""
+        return [self._infos[index] for index in self._by_tag.get(tag, [])]
+
+    def enabled(self, active_tags: Iterable[str]) -> tuple[TemplateInfo, ...]:
+        """Return enabled records whose tag requirements ``active_tags`` meet."""
+        key = frozenset(active_tags)
+        found = self._enabled_cache.get(key)
+        if found is None:
+            candidates = set(self._untagged)
+            for tag in key:
+                candidates.update(self._by_tag.get(tag, ()))
+            found = tuple(
+                info
+                for info in (self._infos[index] for index in sorted(candidates))
+                if info.enabled and info.tags.issubset(key)
+            )
+            self._enabled_cache[key] = found
+        return found
 
 
 @dataclass(frozen=True)
@@ -0,0 +1,127 @@
+"""
+Read-only view of the git index used to compare staged files cheaply.
+
+A single ``git ls-files -s`` call gives the blob hash of every tracked file,
+and ``git diff-files`` names the tracked files whose working tree copy no
+longer matches the index. For every other tracked file, hashing the staged
+content the way git does is enough to know whether it matches the repo,
+without reading the repo file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import ubelt as ub
+
+#: Index modes of regular files. Symlinks and submodules are never compared.
+_REGULAR_MODES = {0o100644, 0o100755}
+
+
+def git_blob_hash(data: bytes, algo: str = 'sha1') -> str:
+    r"""Return the object id git would assign to a blob holding ``data``.
+
+    Example:
+        >>> # Matches ``printf 'hello\n' | git hash-object --stdin``
+        >>> git_blob_hash(b'hello\n')
+        'ce013625030ba8dba906f756967f9e9ca394464a'
+    """
+    hasher = hashlib.new(algo)
+    hasher.update(b'blob %d\0' % len(data))
+    hasher.update(data)
+    return hasher.hexdigest()
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    """One stage-0 entry from ``git ls-files -s``."""
+
+    mode: int
+    object_id: str
+
+
+@dataclass
+class GitIndex:
+    """Snapshot of the tracked files of a repository.
+
+    Attributes:
+        root: directory the relative paths are relative to
+        entries: unconflicted index entries keyed by posix relative path
+        tracked: every tracked path, including conflicted ones
+        worktree_dirty: tracked paths whose working tree copy may differ from
+            the index
+        tracked_dirs: every directory that contains a tracked path
+    """
+
+    root: Path
+    entries: dict[str, IndexEntry] = field(default_factory=dict)
+    tracked: set[str] = field(default_factory=set)
+    worktree_dirty: set[str] = field(default_factory=set)
+    tracked_dirs: set[str] = field(default_factory=set)
+
+    @classmethod
+    def read(cls, repodir: os.PathLike[str]) -> GitIndex | None:
+        """Query the index of the repo at ``repodir``.
+
+        Returns None if ``repodir`` is not inside a git working tree or git is
+        not available.
+        """
+        root = Path(repodir).absolute()
+        try:
+            info = ub.cmd(['git', 'ls-files', '-s', '-z'], cwd=root)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        if info['ret'] != 0:
+            return None
+        self = cls(root)
+        for record in info['out'].split('\0'):
+            if not record:
+                continue
+            meta, path = record.split('\t', 1)
+            mode, object_id, stage = meta.split()
+            self.tracked.add(path)
+            if stage == '0':
+                self.entries[path] = IndexEntry(int(mode, 8), object_id)
+            parent = path.rpartition('/')[0]
+            while parent and parent not in self.tracked_dirs:
+                self.tracked_dirs.add(parent)
+                parent = parent.rpartition('/')[0]
+        if self.tracked:
+            self.tracked_dirs.add('.')
+        # ls-files names paths relative to ``root``, which may be below the
+        # toplevel of the repo; ``--relative`` makes diff-files agree.
+        diff = ub.cmd(
+            ['git', 'diff-files', '--name-only', '--relative', '-z'], cwd=root
+        )
+        if diff['ret'] == 0:
+            self.worktree_dirty = {p for p in diff['out'].split('\0') if p}
+        else:
+            self.worktree_dirty = set(self.tracked)
+        return self
+
+    def _key(self, path: os.PathLike[str]) -> str:
+        return Path(
+            os.path.relpath(Path(path).absolute(), self.root)
+        ).as_posix()
+
+    def is_tracked(self, path: os.PathLike[str]) -> bool:
+        """Return True if ``path`` is a tracked file or contains one."""
+        key = self._key(path)
+        return key in self.tracked or key in self.tracked_dirs
+
+    def known_identical(self, path: os.PathLike[str], data: bytes) -> bool:
+        """Return True if the working tree copy of ``path`` is exactly ``data``.
+
+        A False result means "unknown" and the caller has to read the file.
+        """
+        key = self._key(path)
+        entry = self.entries.get(key)
+        if entry is None or entry.mode not in _REGULAR_MODES:
+            return False
+        if key in self.worktree_dirty:
+            return False
+        algo = 'sha256' if len(entry.object_id) == 64 else 'sha1'
+        return git_blob_hash(data, algo) == entry.object_id
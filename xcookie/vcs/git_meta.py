@@ -0,0 +1,499 @@
+"""
+Read git repository metadata without spawning git.
+
+The worktree root, the git directory (following ``.git`` files written by
+``git worktree`` and submodules), ``HEAD``, and the merged system, global,
+and repository config are read straight from disk. Results are cached per
+repository and reused until one of the files they came from changes.
+
+Setups this reader does not model fall back to the git CLI: ``include`` /
+``includeIf`` config sections, unreadable ``.git`` files, and environment
+variables that change how git finds its directories or config (such as
+``GIT_DIR`` or ``GIT_CONFIG_COUNT``). Results read through includes are
+cached too, keyed on the included files as well.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import ubelt as ub
+
+#: Environment variables that change repository discovery or config lookup.
+_CLI_ONLY_ENVIRON = (
+    'GIT_DIR',
+    'GIT_WORK_TREE',
+    'GIT_COMMON_DIR',
+    'GIT_CEILING_DIRECTORIES',
+    'GIT_CONFIG',
+    'GIT_CONFIG_COUNT',
+    'GIT_CONFIG_PARAMETERS',
+)
+
+_SECTION_RE = re.compile(
+    r'\s*\[\s*(?P<section>[A-Za-z0-9.-]+)'
+    r'(?:\s+"(?P<subsection>(?:[^"\\\n]|\\.)*)")?\s*\]'
+)
+_KEY_RE = re.compile(r'\s*(?P<key>[A-Za-z][A-Za-z0-9-]*)\s*(?P<eq>=)?')
+_INCLUDE_PATH_RE = re.compile(
+    r'\s*path\s*=\s*(?P<path>[^#;]*?)\s*(?:[#;].*)?$', re.I
+)
+_VALUE_ESCAPES = {'n': '\n', 't': '\t', 'b': '\b', '"': '"', '\\': '\\'}
+
+
+class _NeedsGitCLI(Exception):
+    """Raised when the on-disk layout needs git itself to interpret."""
+
+
+@dataclass(frozen=True)
+class GitConfig:
+    """
+    Ordered ``(key, value)`` pairs as listed by ``git config --list``.
+
+    Keys are ``section.name`` or ``section.subsection.name`` with the section
+    and name lowercased. Later entries override earlier ones.
+
+    Example:
+        >>> config = GitConfig.parse(chr(10).join([
+        >>>     '[remote "origin"]',
+        >>>     '    url = git@github.com:Org/Repo.git  ; comment',
+        >>>     '[url "https://github.com/"]',
+        >>>     '    insteadOf = gh:',
+        >>> ]))
+        >>> config.get('Remote.origin.URL')
+        'git@github.com:Org/Repo.git'
+        >>> config.rewrite_url('gh:Org/Other.git')
+        'https://github.com/Org/Other.git'
+    """
+
+    entries: tuple[tuple[str, str], ...] = ()
+
+    @classmethod
+    def parse(cls, text: str) -> GitConfig:
+        """Parse the contents of one git config file."""
+        return cls(tuple(_parse_config_text(text)))
+
+    def __add__(self, other: GitConfig) -> GitConfig:
+        return GitConfig(self.entries + other.entries)
+
+    def get_all(self, key: str) -> list[str]:
+        key = _normalize_key(key)
+        return [value for k, value in self.entries if k == key]
+
+    def get(self, key: str, default: str | None = None) -> str | None:
+        """Return the last value of ``key``, like ``git config <key>``."""
+        values = self.get_all(key)
+        return values[-1] if values else default
+
+    def rewrite_url(self, url: str) -> str:
+        """Apply ``url.<base>.insteadOf`` rules the way git does."""
+        best = None
+        for key, value in self.entries:
+            if key.startswith('url.') and key.endswith('.insteadof'):
+                base = key[len('url.') : -len('.insteadof')]
+                if url.startswith(value) and (
+                    best is None or len(value) > len(best[1])
+                ):
+                    best = (base, value)
+        if best is None:
+            return url
+        return best[0] + url[len(best[1]) :]
+
+
+@dataclass(frozen=True)
+class GitMetadata:
+    """
+    Metadata about one git worktree.
+
+    Attributes:
+        root: the worktree root (the directory containing ``.git``)
+        git_dir: the per-worktree git directory
+        common_dir: the git directory shared by all worktrees
+        head: the contents of ``HEAD``, either ``ref: <refname>`` or a commit
+        config: the merged system, global, and repository config
+    """
+
+    root: Path
+    git_dir: Path
+    common_dir: Path
+    head: str
+    config: GitConfig = field(default_factory=GitConfig)
+
+    @property
+    def head_ref(self) -> str | None:
+        """The symbolic ref ``HEAD`` points to, or None if it is detached."""
+        if self.head.startswith('ref:'):
+            return self.head[len('ref:') :].strip()
+        return None
+
+    @property
+    def branch(self) -> str | None:
+        ref = self.head_ref
+        if ref is not None and ref.startswith('refs/heads/'):
+            return ref[len('refs/heads/') :]
+        return None
+
+    def remote_url(self, name: str = 'origin') -> str | None:
+        """The url of a remote, like ``git remote get-url <name>``."""
+        url = self.config.get(f'remote.{name}.url')
+        if url is None:
+            return None
+        return self.config.rewrite_url(url)
+
+
+def find_git_root(dpath: os.PathLike[str] | str) -> Path | None:
+    """Return the closest directory at or above ``dpath`` with a ``.git``."""
+    path = Path(dpath).resolve()
+    for candidate in (path, *path.parents):
+        if (candidate / '.git').exists():
+            return candidate
+    return None
+
+
+_METADATA_CACHE: dict[Path, tuple[tuple, GitMetadata]] = {}
+_USER_CONFIG_CACHE: dict[tuple, GitConfig] = {}
+#: Results of the CLI fallback for configs with includes, stored with the
+#: included files and their stamp: ``key -> (stamp, includes, stamp, value)``
+_INCLUDE_CACHE: dict[object, tuple[tuple, list[Path], tuple, object]] = {}
+
+
+def read_git_metadata(dpath: os.PathLike[str] | str) -> GitMetadata | None:
+    """
+    Return metadata for the repository containing ``dpath``.
+
+    Returns None if ``dpath`` is not inside a git worktree.
+    """
+    root = find_git_root(dpath)
+    if root is None:
+        return None
+    if _cli_only_environ():
+        return _read_metadata_with_cli(root)
+    try:
+        git_dir, common_dir = _resolve_git_dirs(root)
+    except (_NeedsGitCLI, OSError, UnicodeDecodeError):
+        return _read_metadata_with_cli(root)
+    config_paths = [
+        common_dir / 'config',
+        git_dir / 'config.worktree',
+    ] + _user_config_paths()
+    stamp = _stamp([git_dir / 'HEAD'] + config_paths)
+    cached = _METADATA_CACHE.get(root)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    try:
+        head = (git_dir / 'HEAD').read_text().strip()
+        config = _read_user_config() + _read_config_file(common_dir / 'config')
+        if _truthy(config.get('extensions.worktreeconfig')):
+            config = config + _read_config_file(git_dir / 'config.worktree')
+    except (_NeedsGitCLI, OSError, UnicodeDecodeError):
+        return _cached_with_includes(
+            ('metadata', root),
+            stamp,
+            config_paths,
+            lambda: _read_metadata_with_cli(root),
+        )
+    metadata = GitMetadata(root, git_dir, common_dir, head, config)
+    _METADATA_CACHE[root] = (stamp, metadata)
+    return metadata
+
+
+def read_git_config(dpath: os.PathLike[str] | str | None = None) -> GitConfig:
+    """
+    Return the config git would use in ``dpath``.
+
+    Outside of a repository (or if ``dpath`` is None) this is only the
+    system and global config.
+    """
+    if dpath is not None:
+        metadata = read_git_metadata(dpath)
+        if metadata is not None:
+            return metadata.config
+    if _cli_only_environ():
+        return _read_user_config_with_cli()
+    try:
+        return _read_user_config()
+    except (_NeedsGitCLI, OSError, UnicodeDecodeError):
+        paths = _user_config_paths()
+        return _cached_with_includes(
+            'user', _stamp(paths), paths, _read_user_config_with_cli
+        )
+
+
+def _cached_with_includes(key, stamp, config_paths, read):
+    """
+    Return ``read()``, cached until ``stamp`` or a file included by one of
+    ``config_paths`` changes. Used for results of the git CLI fallback.
+    """
+    cached = _INCLUDE_CACHE.get(key)
+    if (
+        cached is not None
+        and cached[0] == stamp
+        and _stamp(cached[1]) == cached[2]
+    ):
+        return cached[3]
+    includes = _include_paths(config_paths)
+    value = read()
+    if value is not None:
+        _INCLUDE_CACHE[key] = (stamp, includes, _stamp(includes), value)
+    return value
+
+
+def _include_paths(config_paths: list[Path]) -> list[Path]:
+    """
+    Files named by ``include.path`` and ``includeIf.*.path``, recursively.
+
+    Every target is listed whatever its condition, so that a change to any
+    file git might read invalidates the cache.
+    """
+    found: list[Path] = []
+    stack = list(config_paths)
+    seen = set()
+    while stack:
+        fpath = stack.pop(0)
+        if fpath in seen:
+            continue
+        seen.add(fpath)
+        try:
+            text = fpath.read_text()
+        except (OSError, UnicodeDecodeError):
+            continue
+        section = None
+        for line in text.splitlines():
+            match = _SECTION_RE.match(line)
+            if match is not None:
+                section = match['section'].lower()
+                line = line[match.end() :]
+            if section not in {'include', 'includeif'}:
+                continue
+            match = _INCLUDE_PATH_RE.match(line)
+            if match is None:
+                continue
+            target = Path(os.path.expanduser(match['path'].strip('"')))
+            if not target.is_absolute():
+                target = fpath.parent / target
+            found.append(target)
+            stack.append(target)
+    return found
+
+
+def _cli_only_environ() -> bool:
+    return any(key in os.environ for key in _CLI_ONLY_ENVIRON)
+
+
+def _resolve_git_dirs(root: Path) -> tuple[Path, Path]:
+    dot_git = root / '.git'
+    if dot_git.is_dir():
+        git_dir = dot_git
+    else:
+        text = dot_git.read_text().strip()
+        if not text.startswith('gitdir:'):
+            raise _NeedsGitCLI(dot_git)
+        git_dir = Path(text[len('gitdir:') :].strip())
+        if not git_dir.is_absolute():
+            git_dir = (root / git_dir).resolve()
+    common_dir = git_dir
+    commondir_fpath = git_dir / 'commondir'
+    if commondir_fpath.exists():
+        common_dir = Path(commondir_fpath.read_text().strip())
+        if not common_dir.is_absolute():
+            common_dir = (git_dir / common_dir).resolve()
+    return git_dir, common_dir
+
+
+def _user_config_paths() -> list[Path]:
+    """System then global config files, in the order git reads them."""
+    paths = []
+    if not _truthy(os.environ.get('GIT_CONFIG_NOSYSTEM')):
+        paths.append(
+            Path(os.environ.get('GIT_CONFIG_SYSTEM', '/etc/gitconfig'))
+        )
+    if 'GIT_CONFIG_GLOBAL' in os.environ:
+        paths.append(Path(os.environ['GIT_CONFIG_GLOBAL']))
+    else:
+        xdg_home = os.environ.get('XDG_CONFIG_HOME') or os.path.join(
+            os.path.expanduser('~'), '.config'
+        )
+        paths.append(Path(xdg_home) / 'git' / 'config')
+        paths.append(Path(os.path.expanduser('~')) / '.gitconfig')
+    return paths
+
+
+def _read_user_config() -> GitConfig:
+    paths = _user_config_paths()
+    stamp = _stamp(paths)
+    config = _USER_CONFIG_CACHE.get(stamp)
+    if config is None:
+        config = GitConfig()
+        for fpath in paths:
+            config = config + _read_config_file(fpath)
+        _USER_CONFIG_CACHE.clear()
+        _USER_CONFIG_CACHE[stamp] = config
+    return config
+
+
+def _read_config_file(fpath: Path) -> GitConfig:
+    try:
+        text = fpath.read_text()
+    except FileNotFoundError:
+        return GitConfig()
+    return GitConfig.parse(text)
+
+
+def _stamp(paths: list[Path]) -> tuple:
+    stamp = []
+    for fpath in paths:
+        try:
+            stat = fpath.stat()
+        except OSError:
+            stamp.append((os.fspath(fpath), None))
+        else:
+            stamp.append((os.fspath(fpath), stat.st_mtime_ns, stat.st_size))
+    return tuple(stamp)
+
+
+def _truthy(value: str | None) -> bool:
+    return value is not None and value.lower() in {'true', 'yes', 'on', '1'}
+
+
+def _normalize_key(key: str) -> str:
+    section, _, rest = key.partition('.')
+    subsection, _, name = rest.rpartition('.')
+    if subsection:
+        return f'{section.lower()}.{subsection}.{name.lower()}'
+    return f'{section.lower()}.{name.lower()}'
+
+
+def _parse_config_text(text: str) -> list[tuple[str, str]]:
+    entries = []
+    prefix = None
+    lines = text.splitlines()
+    lineno = 0
+    while lineno < len(lines):
+        line = lines[lineno]
+        lineno += 1
+        stripped = line.strip()
+        if not stripped or stripped[0] in '#;':
+            continue
+        if stripped.startswith('['):
+            match = _SECTION_RE.match(line)
+            if match is None:
+                raise _NeedsGitCLI(f'cannot parse section: {line!r}')
+            section = match['section'].lower()
+            if section in {'include', 'includeif'}:
+                raise _NeedsGitCLI('config includes other files')
+            subsection = match['subsection']
+            if subsection is not None:
+                subsection = re.sub(r'\\(.)', r'\1', subsection)
+                prefix = f'{section}.{subsection}'
+            else:
+                prefix = section
+            line = line[match.end() :]
+            if not line.strip() or line.strip()[0] in '#;':
+                continue
+        if prefix is None:
+            raise _NeedsGitCLI(f'key outside of a section: {line!r}')
+        match = _KEY_RE.match(line)
+        if match is None:
+            raise _NeedsGitCLI(f'cannot parse line: {line!r}')
+        key = f'{prefix}.{match["key"].lower()}'
+        if match['eq'] is None:
+            rest = line[match.end() :].strip()
+            if rest and rest[0] not in '#;':
+                raise _NeedsGitCLI(f'cannot parse line: {line!r}')
+            # A key without a value is boolean true.
+            entries.append((key, 'true'))
+            continue
+        value, lineno = _parse_value(line[match.end() :], lines, lineno)
+        entries.append((key, value))
+    return entries
+
+
+def _parse_value(rest: str, lines: list[str], lineno: int) -> tuple[str, int]:
+    """Parse a value that may be quoted, escaped, or continued."""
+    chars: list[str] = []
+    # Unquoted trailing whitespace is dropped, so hold it back until we know
+    # more of the value follows.
+    pending_space: list[str] = []
+    quoted = False
+    index = 0
+    rest = rest.lstrip()
+    while True:
+        if index >= len(rest):
+            if quoted:
+                raise _NeedsGitCLI('unterminated quote')
+            break
+        char = rest[index]
+        index += 1
+        if char == '\\':
+            if index >= len(rest):
+                # Line continuation
+                if lineno >= len(lines):
+                    raise _NeedsGitCLI('dangling line continuation')
+                rest = lines[lineno]
+                lineno += 1
+                index = 0
+                continue
+            escaped = rest[index]
+            index += 1
+            if escaped not in _VALUE_ESCAPES:
+                raise _NeedsGitCLI(f'unknown escape: \\{escaped}')
+            chars.extend(pending_space)
+            pending_space.clear()
+            chars.append(_VALUE_ESCAPES[escaped])
+        elif char == '"':
+            chars.extend(pending_space)
+            pending_space.clear()
+            quoted = not quoted
+        elif not quoted and char in '#;':
+            break
+        elif not quoted and char.isspace():
+            if chars:
+                pending_space.append(char)
+        else:
+            chars.extend(pending_space)
+            pending_space.clear()
+            chars.append(char)
+    return ''.join(chars), lineno
+
+
+def _parse_config_list(out: str) -> GitConfig:
+    """Parse ``git config --list -z`` output."""
+    entries = []
+    for record in out.split('\0'):
+        if not record:
+            continue
+        key, sep, value = record.partition('\n')
+        entries.append((_normalize_key(key), value if sep else 'true'))
+    return GitConfig(tuple(entries))
+
+
+def _read_metadata_with_cli(root: Path) -> GitMetadata | None:
+    info = ub.cmd(
+        ['git', 'rev-parse', '--absolute-git-dir', '--git-common-dir'], cwd=root
+    )
+    if info['ret'] != 0:
+        return None
+    git_dir_text, common_dir_text = info['out'].splitlines()[:2]
+    git_dir = Path(git_dir_text)
+    common_dir = Path(common_dir_text)
+    if not common_dir.is_absolute():
+        common_dir = (root / common_dir).resolve()
+    try:
+        head = (git_dir / 'HEAD').read_text().strip()
+    except OSError:
+        head = ub.cmd(['git', 'rev-parse', 'HEAD'], cwd=root)['out'].strip()
+    listing = ub.cmd(['git', 'config', '--list', '--includes', '-z'], cwd=root)
+    config = _parse_config_list(listing['out'] if listing['ret'] == 0 else '')
+    return GitMetadata(root, git_dir, common_dir, head, config)
+
+
+def _read_user_config_with_cli() -> GitConfig:
+    config = GitConfig()
+    for scope in ['--system', '--global']:
+        listing = ub.cmd(['git', 'config', scope, '--list', '--includes', '-z'])
+        if listing['ret'] == 0:
+            config = config + _parse_config_list(listing['out'])
+    return config
@@ -7,13 +7,40 @@ from xcookie.vcs.gitlab import GitlabRemote  # NOQA
 
 
 class GithubRemote:
-    def __init__(self, proj_name):
+    def __init__(self, proj_name, visibility='public', rate_limiter=None):
         self.proj_name = proj_name
+        self.visibility = visibility
+        self.rate_limiter = rate_limiter
+
+    def _gh(self, command, **kwargs):
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait()
+        return ub.cmd(command, **kwargs)
 
     def new_project(self):
-        ub.cmd(
-            f'gh repo create {self.proj_name} --public', verbose=3, system=True
+        self._gh(
+            f'gh repo create {self.proj_name} --{self.visibility}',
+            verbose=3,
+            system=True,
+        )
+
+    def exists(self):
+        info = self._gh(f'gh repo view {self.proj_name} --json name')
+        return info['ret'] == 0
+
+    def ensure_project(self):
+        """
+        Create the repository unless it exists.
+
+        Returns:
+            str: 'created' or 'exists'
+        """
+        if self.exists():
+            return 'exists'
+        self._gh(
+            f'gh repo create {self.proj_name} --{self.visibility}', check=True
         )
+        return 'created'
 
     def publish_release(self):
         """
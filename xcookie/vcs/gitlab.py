@@ -43,6 +43,7 @@ class GitlabRemote:
         url,
         visibility='public',
         private_token='env:PRIVATE_GITLAB_TOKEN',
+        rate_limiter=None,
     ):
         import gitlab  # type: ignore
 
@@ -53,34 +54,74 @@ class GitlabRemote:
         self.visibility = visibility
         if private_token.startswith('env:'):
             private_token = os.environ[private_token[4:]]
-        self.gitlab = gitlab.Gitlab(url=self.url, private_token=private_token)
+        # A :class:`xcookie.vcs.provision.RateLimiter` shared between remotes
+        # paces every API request made through this client.
+        session = (
+            None if rate_limiter is None else rate_limiter.requests_session()
+        )
+        self.gitlab = gitlab.Gitlab(
+            url=self.url, private_token=private_token, session=session
+        )
+        # Resolved on first access, see :attr:`group` and :attr:`project`
+        self._group = None
+        self._project = None
 
     def auth(self):
         self.gitlab.auth()
         return self
 
+    def _get_or_none(self, manager, ident):
+        import gitlab  # type: ignore
+
+        try:
+            return manager.get(ident)
+        except gitlab.exceptions.GitlabGetError as ex:
+            if ex.response_code == 404:
+                return None
+            raise
+
     @property
     def group(self):
-        gl = self.gitlab
-        # Is there a better way to query?
-        groups = gl.groups.list(iterator=True)
-        found = [g for g in groups if g.name.lower() == self.proj_group.lower()]
-        # if not found:
-        #     # allow case insensitivity
-        #     found = [g for g in groups if g.name.lower() == self.proj_group.lower()]
-        return _return_one(found)
+        """
+        The group named by ``proj_group``. It is looked up by its full path,
+        falling back to a server side search by name, and memoized.
+        """
+        if self._group is None:
+            group = self._get_or_none(self.gitlab.groups, self.proj_group)
+            if group is None:
+                key = self.proj_group.lower()
+                found = [
+                    g
+                    for g in self.gitlab.groups.list(
+                        search=self.proj_group, iterator=True
+                    )
+                    if key in {g.name.lower(), g.full_path.lower()}
+                ]
+                group = _return_one(found)
+            self._group = group
+        return self._group
+
+    @property
+    def group_id(self):
+        return self.group.id
 
     @property
     def project(self):
-        group = self.group
-        found = [
-            p
-            for p in group.projects.list(iterator=True)
-            if p.path.lower() == self.proj_path.lower()
-        ]
-        group_project = _return_one(found)
-        project = self.gitlab.projects.get(group_project.id)
-        return project
+        """
+        The project at ``<group full path>/<proj_path>``, looked up by path and
+        memoized once it exists.
+        """
+        if self._project is None:
+            full_path = f'{self.group.full_path}/{self.proj_path}'
+            project = self._get_or_none(self.gitlab.projects, full_path)
+            if project is None:
+                raise NotFound(full_path)
+            self._project = project
+        return self._project
+
+    @property
+    def project_id(self):
+        return self.project.id
 
     def new_project(self):
         """
@@ -101,6 +142,13 @@ class GitlabRemote:
         else:
             raise Exception('project already exist')
 
+        new_proj = self._create_project(group)
+        print(new_proj)
+
+        # Setup protected branches
+        self.set_protected_branches()
+
+    def _create_project(self, group):
         new_proj_data = {
             'name': self.proj_name,
             'path': self.proj_path,
@@ -109,13 +157,39 @@ class GitlabRemote:
             'visibility': self.visibility,
         }
         new_proj = self.gitlab.projects.create(new_proj_data)
+        self._project = new_proj
+        return new_proj
 
-        print(new_proj)
+    def ensure_project(self):
+        """
+        Create the project and its protected branches unless they exist.
+        Safe to call again after a partial failure.
 
-        # Setup protected branches
-        self.set_protected_branches()
+        Returns:
+            str: 'created' or 'exists'
+        """
+        import gitlab  # type: ignore
+
+        group = self.group
+        status = 'exists'
+        try:
+            self.project
+        except NotFound:
+            try:
+                self._create_project(group)
+            except gitlab.exceptions.GitlabCreateError as ex:
+                # An earlier attempt may have gone through before its
+                # response was lost.
+                if ex.response_code != 400 or 'taken' not in str(ex):
+                    raise
+            else:
+                status = 'created'
+        self.set_protected_branches(verbose=0)
+        return status
+
+    def set_protected_branches(self, verbose=1):
+        import gitlab  # type: ignore
 
-    def set_protected_branches(self):
         project = self.project
 
         existing_protected_branches = project.protectedbranches.list()
@@ -130,18 +204,25 @@ class GitlabRemote:
 
         for name in missing:
             # https://docs.gitlab.com/ee/api/protected_branches.html#protect-repository-branches
-            project.protectedbranches.create(
-                {
-                    'name': name,
-                    'allow_force_push': False,
-                }
-            )
+            try:
+                project.protectedbranches.create(
+                    {
+                        'name': name,
+                        'allow_force_push': False,
+                    }
+                )
+            except gitlab.exceptions.GitlabCreateError as ex:
+                if ex.response_code != 409:
+                    raise
         # if hasattr(gitlab.const, 'AccessLevel'):
         #     maintainer = gitlab.const.AccessLevel.MAINTAINER
         # else:
         #     maintainer = gitlab.const.MAINTAINER_ACCESS
         # perm = [{'access_level': maintainer}]
 
+        if not verbose:
+            return
+
         if not missing:
             protected_branches = existing_protected_branches
         else:
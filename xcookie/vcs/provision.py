@@ -0,0 +1,238 @@
+r"""
+Create many remote repositories at once.
+
+:meth:`TemplateApplier.vcs_checks` creates one remote per xcookie run. When a
+suite of related repos is started together this module creates them
+concurrently: each repo is provisioned by :meth:`GitlabRemote.ensure_project`
+or :meth:`GithubRemote.ensure_project` on a bounded thread pool, every API
+request goes through a shared client-side :class:`RateLimiter`, and transient
+failures (connection errors, HTTP 429 and 5xx) are retried with exponential
+backoff. ``ensure_project`` treats an existing project as done, so retrying a
+request that already went through is harmless.
+
+CommandLine:
+    load_secrets
+    export PRIVATE_GITLAB_TOKEN=$(git_token_for "https://gitlab.kitware.com")
+    xcookie provision whodat whatdat whendat whydat howdat \
+        --remote_host=https://gitlab.kitware.com --remote_group=computer-vision
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+
+import kwconf
+
+
+class RateLimiter:
+    """
+    Allow at most ``rate`` calls per second across threads, spacing them
+    evenly. A ``rate`` of None disables the limit.
+
+    Example:
+        >>> limiter = RateLimiter(rate=100)
+        >>> start = time.monotonic()
+        >>> for _ in range(5):
+        >>>     limiter.wait()
+        >>> assert time.monotonic() - start >= 0.03
+    """
+
+    def __init__(self, rate=None):
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + 1.0 / self.rate
+        if start > now:
+            time.sleep(start - now)
+
+    def requests_session(self):
+        """A :class:`requests.Session` that waits on this limiter per request."""
+        import requests
+
+        limiter = self
+
+        class RateLimitedSession(requests.Session):
+            def request(self, *args, **kwargs):
+                limiter.wait()
+                return super().request(*args, **kwargs)
+
+        return RateLimitedSession()
+
+
+@dataclass
+class ProvisionResult:
+    """Outcome of provisioning one remote repository."""
+
+    name: str
+    status: str = 'pending'
+    attempts: int = 0
+    seconds: float = 0.0
+    error: str | None = None
+
+
+def _is_transient(ex):
+    code = getattr(ex, 'response_code', None)
+    if code is not None:
+        return code == 429 or code >= 500
+    # requests connection errors and timeouts are OSErrors
+    return isinstance(ex, OSError)
+
+
+def provision_one(remote, retries=3, backoff=1.0):
+    """
+    Run ``remote.ensure_project()`` until it succeeds, it fails with a
+    non-transient error, or ``retries`` retries were spent.
+    """
+    result = ProvisionResult(name=remote.proj_name)
+    start = time.monotonic()
+    while True:
+        result.attempts += 1
+        try:
+            result.status = remote.ensure_project()
+        except Exception as ex:
+            if result.attempts > retries or not _is_transient(ex):
+                result.status = 'failed'
+                result.error = f'{type(ex).__name__}: {ex}'
+                break
+            time.sleep(backoff * 2 ** (result.attempts - 1))
+        else:
+            result.error = None
+            break
+    result.seconds = time.monotonic() - start
+    return result
+
+
+def provision_remotes(remotes, workers=4, retries=3, backoff=1.0):
+    """
+    Provision ``remotes`` on a pool of ``workers`` threads.
+
+    Returns:
+        List[ProvisionResult]: one result per remote, in input order.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max(1, workers)) as executor:
+        futures = [
+            executor.submit(provision_one, remote, retries, backoff)
+            for remote in remotes
+        ]
+    return [future.result() for future in futures]
+
+
+def format_status_table(results):
+    """
+    Example:
+        >>> results = [ProvisionResult('whodat', 'created', 1, 0.52),
+        >>>            ProvisionResult('whatdat', 'failed', 4, 7.1, 'boom')]
+        >>> print(format_status_table(results))
+        name     status   attempts  seconds  error
+        whodat   created         1     0.52
+        whatdat  failed          4     7.10  boom
+    """
+    name_width = max([len('name')] + [len(r.name) for r in results])
+    lines = [f'{"name":<{name_width}}  status   attempts  seconds  error']
+    for r in results:
+        line = (
+            f'{r.name:<{name_width}}  {r.status:<7}  {r.attempts:>8}'
+            f'  {r.seconds:>7.2f}  {r.error or ""}'
+        )
+        lines.append(line.rstrip())
+    return '\n'.join(lines)
+
+
+class ProvisionConfig(kwconf.Config):
+    """
+    Create remote repositories (and protect their branches) in bulk.
+    """
+
+    names = kwconf.Value(
+        [], nargs='*', position=1, help='names of the repositories to create'
+    )
+    remote_host = kwconf.Value(
+        'https://github.com',
+        help='gitlab server url, or a github url to use the gh CLI',
+    )
+    remote_group = kwconf.Value(
+        None, help='gitlab group or github owner of the new repositories'
+    )
+    visibility = kwconf.Value('public', help='or private')
+    private_token = kwconf.Value(
+        'env:PRIVATE_GITLAB_TOKEN', help='gitlab token or env:<VARNAME>'
+    )
+    workers = kwconf.Value(4, type=int, help='repositories created at once')
+    rate = kwconf.Value(
+        5.0, type=float, help='maximum API requests per second, 0 for no limit'
+    )
+    retries = kwconf.Value(
+        3, type=int, help='retries of a repository after transient errors'
+    )
+    backoff = kwconf.Value(
+        1.0, type=float, help='seconds before the first retry, doubled after'
+    )
+    yes = kwconf.Value(False, isflag=True, help='do not ask for confirmation')
+
+    @classmethod
+    def main(cls, argv=True, **kwargs):
+        config = cls.cli(argv=argv, data=kwargs, strict=True)
+        remotes = config.make_remotes()
+        print(f'Provision {len(remotes)} repositories on {config.remote_host}:')
+        for remote in remotes:
+            print(f'  {remote.proj_name}')
+        if not config.yes:
+            from rich import prompt
+
+            if not prompt.Confirm.ask('Create them?'):
+                return []
+        results = provision_remotes(
+            remotes,
+            workers=config.workers,
+            retries=config.retries,
+            backoff=config.backoff,
+        )
+        print(format_status_table(results))
+        return results
+
+    def make_remotes(self):
+        rate_limiter = RateLimiter(self.rate)
+        if 'github' in self.remote_host:
+            from xcookie.vcs.github import GithubRemote
+
+            owner = f'{self.remote_group}/' if self.remote_group else ''
+            return [
+                GithubRemote(
+                    owner + name,
+                    visibility=self.visibility,
+                    rate_limiter=rate_limiter,
+                )
+                for name in self.names
+            ]
+        from xcookie.vcs.gitlab import GitlabRemote
+
+        if self.remote_group is None:
+            raise ValueError('A gitlab remote needs --remote_group')
+        return [
+            GitlabRemote(
+                name,
+                self.remote_group,
+                self.remote_host,
+                visibility=self.visibility,
+                private_token=self.private_token,
+                rate_limiter=rate_limiter,
+            )
+            for name in self.names
+        ]
+
+
+def main(argv=True):
+    results = ProvisionConfig.main(argv=argv)
+    if any(r.status == 'failed' for r in results):
+        raise SystemExit(1)